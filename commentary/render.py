@@ -1,4 +1,4 @@
-import json
+import sys
 from pathlib import Path
 import pandas as pd, matplotlib.pyplot as plt
 from jinja2 import Environment, FileSystemLoader
@@ -6,6 +6,13 @@ from analysis import analyze
 from summarise import to_paragraphs, SYSTEM_STYLE, PROMPT_TEMPLATE
 import subprocess, os
 
+# Share the facts serializer with the src pipeline.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.llm.facts import Fact, build_payloads, token_counter
+
+MODEL_PATH = "commentary/models/model.gguf"
+FACTS_BUDGET = 120
+
 def charts(data):
     out = Path("commentary/out/charts")
     out.mkdir(parents=True, exist_ok=True)
@@ -63,10 +70,26 @@ def write_excel(data):
             "au10y_mom_pct": data['bonds']['au10y']['mom_pct']
         }]).to_excel(xw, sheet_name="Summary", index=False)
 
+def facts_sections(data):
+    b, c, e, f, p = data['bonds'], data['cpi'], data['equities'], data['fx'], data['policy']
+    com = data['commodities']
+    return {
+        'bonds': [Fact("US 10y", b['us10y']['last']), Fact("US 10y m/m", b['us10y']['mom_pct']),
+                  Fact("AU 10y", b['au10y']['last']), Fact("AU 10y m/m", b['au10y']['mom_pct'])],
+        'cpi': [Fact("US CPI YoY", c['us']), Fact("AU CPI YoY", c['au'])],
+        'policy': [Fact("Fed funds", p['fed']), Fact("RBA cash", p['rba'])],
+        'equities': [Fact("S&P 500 m/m", e['spx_mom']), Fact("ASX 200 m/m", e['asx_mom'])],
+        'fx': [Fact("AUDUSD m/m", f['audusd_mom']), Fact("DXY m/m", f['dxy_mom'])],
+        'commodities': [Fact("Gold m/m", com.get('gold_mom')), Fact("WTI m/m", com.get('wti_mom')),
+                        Fact("Brent m/m", com.get('brent_mom')), Fact("Iron ore m/m", com.get('iron_ore_mom'), priority=1)],
+    }
+
 def llm_prose(data, month):
-    user = PROMPT_TEMPLATE.format(month=month, json=json.dumps(data))
+    payloads = build_payloads(facts_sections(data), FACTS_BUDGET, token_counter(MODEL_PATH))
+    facts = "\n".join(f"{section}: {text}" for section, text in payloads.items())
+    user = PROMPT_TEMPLATE.format(month=month, facts=facts)
     system = SYSTEM_STYLE
-    model_path = "commentary/models/model.gguf"
+    model_path = MODEL_PATH
     res = subprocess.check_output([
         "python","commentary/scripts/run_llm.py",
         system, user, model_path
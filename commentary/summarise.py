@@ -37,9 +37,9 @@ For each section write 2–4 sentences: 1) Key move 2) Drivers 3) Why it matters
 If any metric missing, state 'Data not available this month and will be updated next release.' Avoid bullet points.
 """
 
-PROMPT_TEMPLATE = """Write the Monthly Commentary for {month} using ONLY this JSON:
+PROMPT_TEMPLATE = """Write the Monthly Commentary for {month} using ONLY these facts (percentages, m/m = month on month):
 
-{json}
+{facts}
 
 Sections and order (exact headings): 
 - Government Bond Yields (10-Year), Inflation (CPI YoY), Policy, Equities, FX, Commodities.
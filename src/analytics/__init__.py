@@ -0,0 +1 @@
+"""Cross-series analytics for the monthly commentary."""
@@ -0,0 +1,120 @@
+"""Rolling cross-asset correlations, betas and realised volatility.
+
+All pairs are computed together: the aligned monthly return panel is viewed as
+``(windows, series, obs)`` with ``sliding_window_view`` and reduced with
+``einsum``, so adding a market grows array sizes rather than Python loops.
+Missing observations are masked per pair, and each pair is centred on its
+means over the observations both series have, which lets short histories
+(e.g. a late-starting iron ore series) sit alongside full ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..utils.series import monthly_last
+
+DEFAULT_WINDOW = 12
+DEFAULT_MIN_PERIODS = 6
+MONTHS_PER_YEAR = 12
+
+
+@dataclass
+class CrossAssetPanel:
+    dates: pd.DatetimeIndex
+    names: list[str]
+    corr: np.ndarray  # (windows, n, n)
+    beta: np.ndarray  # (windows, n, n); beta[t, i, j] = beta of i on j
+    vol: np.ndarray  # (windows, n), annualised %
+    window: int
+
+    @property
+    def empty(self) -> bool:
+        return len(self.dates) == 0
+
+    def latest_corr(self) -> pd.DataFrame:
+        if self.empty:
+            return pd.DataFrame(index=self.names, columns=self.names, dtype=float)
+        return pd.DataFrame(self.corr[-1], index=self.names, columns=self.names)
+
+    def latest_beta(self) -> pd.DataFrame:
+        if self.empty:
+            return pd.DataFrame(index=self.names, columns=self.names, dtype=float)
+        return pd.DataFrame(self.beta[-1], index=self.names, columns=self.names)
+
+    def vol_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.vol, index=self.dates, columns=self.names)
+
+    def pair(self, a: str, b: str) -> tuple[float | None, float | None]:
+        """Latest (correlation, beta of ``a`` on ``b``) or ``(None, None)``."""
+
+        if self.empty or a not in self.names or b not in self.names:
+            return None, None
+        i, j = self.names.index(a), self.names.index(b)
+        corr, beta = self.corr[-1, i, j], self.beta[-1, i, j]
+        return (None if np.isnan(corr) else float(corr)), (None if np.isnan(beta) else float(beta))
+
+
+def monthly_returns(series_map: dict[str, pd.Series | None], end: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Align series to month-end and return MoM % changes, one column per series."""
+
+    columns = []
+    for name, series in series_map.items():
+        if series is None or series.dropna().empty:
+            continue
+        columns.append(monthly_last(series).rename(name))
+    if not columns:
+        return pd.DataFrame()
+    panel = pd.concat(columns, axis=1).sort_index()
+    if end is not None:
+        panel = panel.loc[:end]
+    return panel.pct_change(fill_method=None) * 100.0
+
+
+def rolling_panel(returns: pd.DataFrame, window: int = DEFAULT_WINDOW, min_periods: int = DEFAULT_MIN_PERIODS) -> CrossAssetPanel:
+    names = [str(c) for c in returns.columns]
+    n = len(names)
+    if returns.shape[0] < window or n == 0:
+        empty = np.empty((0, n, n))
+        return CrossAssetPanel(pd.DatetimeIndex([]), names, empty, empty.copy(), np.empty((0, n)), window)
+
+    x = returns.to_numpy(dtype=np.float64).T  # (n, T)
+    windows = sliding_window_view(x, window, axis=1).transpose(1, 0, 2)  # (W, n, w)
+    mask = ~np.isnan(windows)
+    m = mask.astype(np.float64)
+    count = m.sum(axis=2)
+    mean = np.where(count > 0, np.nansum(windows, axis=2) / np.maximum(count, 1), 0.0)
+    centred = np.where(mask, windows - mean[..., None], 0.0)
+
+    pair_n = np.einsum("wik,wjk->wij", m, m)
+    # Moments over the observations both i and j have, re-centred on that
+    # overlap's means (centring on each series' own mean first keeps this stable).
+    sum_i = np.einsum("wik,wjk->wij", centred, m)
+    sum_j = sum_i.transpose(0, 2, 1)
+    overlap = np.maximum(pair_n, 1)
+    cov = np.einsum("wik,wjk->wij", centred, centred) - sum_i * sum_j / overlap
+    var_i = np.einsum("wik,wjk->wij", centred ** 2, m) - sum_i ** 2 / overlap
+    var_j = var_i.transpose(0, 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var_i * var_j)
+        beta = cov / var_j
+        vol = np.sqrt(np.einsum("wik->wi", centred ** 2) / (count - 1)) * np.sqrt(MONTHS_PER_YEAR)
+    invalid = pair_n < min_periods
+    corr[invalid] = np.nan
+    beta[invalid] = np.nan
+    vol[count < min_periods] = np.nan
+    dates = returns.index[window - 1:]
+    return CrossAssetPanel(pd.DatetimeIndex(dates), names, corr, beta, vol, window)
+
+
+def cross_asset_panel(
+    series_map: dict[str, pd.Series | None],
+    end: pd.Timestamp | None = None,
+    window: int = DEFAULT_WINDOW,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+) -> CrossAssetPanel:
+    return rolling_panel(monthly_returns(series_map, end), window, min_periods)
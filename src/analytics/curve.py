@@ -0,0 +1,107 @@
+"""Government bond curves as a (month-end x tenor) matrix.
+
+:class:`YieldCurve` aligns one series per tenor at month ends. Every metric is
+computed for all dates in one pass over the matrix: slopes and butterflies
+index its columns with the tenor positions of each spread, and month-on-month
+shifts are a ``diff`` along the date axis of the level (mean yield), slope and
+butterfly columns. A tenor a market does not publish (the RBA table has no
+30-year) maps to an all-NaN column, so metrics that need it are NaN rather
+than errors.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ..utils.series import monthly_last, to_series
+
+BP = 100.0
+SLOPES = ((2, 10), (2, 5), (5, 30))
+BUTTERFLIES = ((2, 5, 10), (5, 10, 30))
+
+
+def tenor_label(tenor: float) -> str:
+    return f"{tenor:g}y"
+
+
+def spread_name(*tenors: float) -> str:
+    """``2s10s`` for a slope, ``2s5s10s`` for a butterfly."""
+
+    return "".join(f"{tenor:g}s" for tenor in tenors)
+
+
+METRICS = ("level", *(spread_name(*pair) for pair in SLOPES), *(spread_name(*fly) for fly in BUTTERFLIES))
+
+
+@dataclass
+class YieldCurve:
+    dates: pd.DatetimeIndex
+    tenors: np.ndarray  # years, ascending
+    yields: np.ndarray  # (dates, tenors), %
+    _metrics: pd.DataFrame | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_series(cls, series: dict[float, pd.Series | None]) -> YieldCurve:
+        columns = {float(tenor): monthly_last(s) for tenor, s in series.items() if not to_series(s).empty}
+        if not columns:
+            return cls(pd.DatetimeIndex([]), np.array([], dtype=float), np.empty((0, 0)))
+        frame = pd.concat(columns, axis=1).sort_index(axis=1).dropna(how="all")
+        return cls(pd.DatetimeIndex(frame.index), frame.columns.to_numpy(dtype=float), frame.to_numpy(dtype=float))
+
+    @property
+    def empty(self) -> bool:
+        return len(self.dates) == 0
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.yields, index=self.dates, columns=[tenor_label(t) for t in self.tenors])
+
+    def _columns(self, tenors) -> np.ndarray:
+        # Missing tenors point one past the last column, at the NaN padding.
+        lookup = {float(t): i for i, t in enumerate(self.tenors)}
+        return np.array([lookup.get(float(t), len(self.tenors)) for t in tenors], dtype=int)
+
+    def metrics(self) -> pd.DataFrame:
+        """Level (%) and slopes/butterflies (bp) per date, plus their MoM changes in bp."""
+
+        if self._metrics is None:
+            padded = np.hstack([self.yields, np.full((len(self.dates), 1), np.nan)])
+            observed = ~np.isnan(self.yields)
+            counts = observed.sum(axis=1)
+            level = np.where(counts > 0, np.where(observed, self.yields, 0.0).sum(axis=1) / np.maximum(counts, 1), np.nan)
+            short, long = (self._columns(tenors) for tenors in zip(*SLOPES))
+            wing, belly, far = (self._columns(tenors) for tenors in zip(*BUTTERFLIES))
+            values = np.column_stack([
+                level,
+                (padded[:, long] - padded[:, short]) * BP,
+                (2.0 * padded[:, belly] - padded[:, wing] - padded[:, far]) * BP,
+            ])
+            scale = np.array([BP] + [1.0] * (len(METRICS) - 1))
+            changes = np.full_like(values, np.nan)
+            changes[1:] = np.diff(values, axis=0) * scale
+            self._metrics = pd.DataFrame(
+                np.hstack([values, changes]), index=self.dates, columns=[*METRICS, *(f"{name} MoM" for name in METRICS)]
+            )
+        return self._metrics
+
+    def _position(self, timestamp: pd.Timestamp) -> int:
+        return int(np.searchsorted(self.dates.values, pd.Timestamp(timestamp).to_datetime64(), side="right")) - 1
+
+    def at(self, timestamp: pd.Timestamp) -> dict[str, float | None]:
+        """Metrics as of ``timestamp``; ``None`` where unavailable."""
+
+        position = self._position(timestamp)
+        if position < 0:
+            return {name: None for name in self.metrics().columns}
+        row = self.metrics().iloc[position]
+        return {name: None if np.isnan(value) else float(value) for name, value in row.items()}
+
+    def curve_at(self, timestamp: pd.Timestamp) -> pd.Series:
+        """Yield per tenor (years) as of ``timestamp``, dropping missing tenors."""
+
+        position = self._position(timestamp)
+        if position < 0:
+            return pd.Series(dtype=float)
+        return pd.Series(self.yields[position], index=self.tenors).dropna()
@@ -0,0 +1,204 @@
+"""Historical context for monthly moves ("is that a big move?").
+
+Monthly closes per series accumulate in ``data/history/<key>.csv`` across
+runs, so context can reach further back than a run's lookback window.
+:class:`HistoryIndex` precomputes, once per series and in one pass each:
+
+* the percentile of every month's absolute move within the trailing
+  ``window`` months (a sliding sorted window maintained with ``bisect``);
+* the previous month with an absolute move at least as large (a monotonic
+  stack), which answers "largest move since";
+* the previous month with a higher and with a lower close, which answer
+  "n-month high/low".
+
+Each query is then a ``searchsorted`` on the dates plus array lookups, so the
+context stays O(log n) per series per month, including during backfills,
+and never looks past the queried month.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..utils.io import ROOT, file_lock, write_atomic
+from ..utils.series import monthly_last
+
+LOGGER = logging.getLogger(__name__)
+HISTORY_DIR = ROOT / "data" / "history"
+DEFAULT_WINDOW = 120
+# A move in at least this percentile, or a high/low at least this many months long, is notable.
+NOTABLE_PERCENTILE = 90.0
+NOTABLE_MONTHS = 12
+
+
+@dataclass(frozen=True)
+class MoveContext:
+    date: pd.Timestamp
+    move: float | None
+    percentile: float | None
+    # Month of the last move at least as large; ``None`` with ``record`` set means largest on file.
+    largest_since: pd.Timestamp | None
+    record: bool
+    # Months the close has been the highest (lowest); 0 when it is not a high (low).
+    high_months: int
+    low_months: int
+    history_months: int
+
+    @property
+    def notable(self) -> bool:
+        big = self.percentile is not None and self.percentile >= NOTABLE_PERCENTILE
+        return big or max(self.high_months, self.low_months) >= NOTABLE_MONTHS
+
+
+def _previous_at_least(values: np.ndarray) -> np.ndarray:
+    """Index of the nearest earlier element ``>= values[i]`` (``-1`` if none)."""
+
+    result = np.full(len(values), -1, dtype=np.int64)
+    stack: list[int] = []
+    for i, value in enumerate(values):
+        while stack and values[stack[-1]] < value:
+            stack.pop()
+        result[i] = stack[-1] if stack else -1
+        stack.append(i)
+    return result
+
+
+def _trailing_percentiles(values: np.ndarray, window: int) -> np.ndarray:
+    """Percentile of each value among the ``window`` values ending at it (NaN-aware)."""
+
+    result = np.full(len(values), np.nan)
+    ordered: list[float] = []
+    for i, value in enumerate(values):
+        if not np.isnan(value):
+            bisect.insort(ordered, value)
+        if i >= window and not np.isnan(values[i - window]):
+            del ordered[bisect.bisect_left(ordered, values[i - window])]
+        if not np.isnan(value) and len(ordered) > 1:
+            result[i] = 100.0 * bisect.bisect_right(ordered, value) / len(ordered)
+    return result
+
+
+class HistoryIndex:
+    def __init__(self, levels: pd.Series, window: int = DEFAULT_WINDOW):
+        levels = levels.dropna()
+        self.dates = pd.DatetimeIndex(levels.index)
+        self.levels = levels.to_numpy(dtype=float)
+        self.moves = levels.pct_change().to_numpy(dtype=float) * 100.0
+        size = np.abs(self.moves)
+        self.percentiles = _trailing_percentiles(size, window)
+        self.prev_larger_move = _previous_at_least(np.nan_to_num(size, nan=-1.0))
+        self.prev_higher = _previous_at_least(self.levels)
+        self.prev_lower = _previous_at_least(-self.levels)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _position(self, date: pd.Timestamp) -> int:
+        return int(self.dates.searchsorted(pd.Timestamp(date), side="right")) - 1
+
+    @staticmethod
+    def _streak(previous: np.ndarray, i: int) -> int:
+        # Months covered by the high/low including this one; 1 (or none) is not a high/low.
+        months = i - int(previous[i]) if previous[i] >= 0 else i + 1
+        return months if months > 1 else 0
+
+    def context(self, date: pd.Timestamp) -> MoveContext | None:
+        i = self._position(date)
+        if i < 0:
+            return None
+        move = None if np.isnan(self.moves[i]) else float(self.moves[i])
+        pct = None if np.isnan(self.percentiles[i]) else float(self.percentiles[i])
+        larger = int(self.prev_larger_move[i])
+        high, low = self._streak(self.prev_higher, i), self._streak(self.prev_lower, i)
+        return MoveContext(
+            date=self.dates[i],
+            move=move,
+            percentile=pct,
+            largest_since=self.dates[larger] if larger >= 0 and move is not None else None,
+            record=move is not None and larger < 0 and i > 1,
+            high_months=high,
+            low_months=low,
+            history_months=i + 1,
+        )
+
+
+class HistoryStore:
+    """Month-end closes per series, merged across runs."""
+
+    def __init__(self, root: Path = HISTORY_DIR, window: int = DEFAULT_WINDOW, read_only: bool = False):
+        self.root = root
+        self.window = window
+        # Merge in memory only (reports rebuilt ``--as-of`` must not rewrite history).
+        self.read_only = read_only
+        # Built indexes keyed by the history file's mtime, reused while it is unchanged.
+        self._indexes: dict[str, tuple[int, HistoryIndex]] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.csv"
+
+    def load(self, key: str) -> pd.Series:
+        path = self._path(key)
+        if not path.exists():
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([]), name=key)
+        frame = pd.read_csv(path, index_col=0, parse_dates=True)
+        return frame.iloc[:, 0].rename(key)
+
+    def update(self, key: str, series: pd.Series | None) -> pd.Series:
+        """Merge ``series``' month-end closes into the stored history and return it."""
+
+        monthly = monthly_last(series).dropna()
+        if monthly.empty:
+            return self.load(key)
+        if self.read_only:
+            return monthly.rename(key).combine_first(self.load(key)).sort_index()
+        # Concurrent runs (job workers) merge into the same file one at a time.
+        with file_lock(self._path(key)):
+            stored = self.load(key)
+            merged = monthly.rename(key).combine_first(stored).sort_index()
+            if not merged.equals(stored):
+                write_atomic(self._path(key), merged.to_frame(key).to_csv())
+        return merged
+
+    def index(self, key: str, series: pd.Series | None = None) -> HistoryIndex:
+        history = self.update(key, series) if series is not None else self.load(key)
+        if self.read_only:
+            return HistoryIndex(history, self.window)
+        path = self._path(key)
+        stamp = path.stat().st_mtime_ns if path.exists() else -1
+        cached = self._indexes.get(key)
+        if cached is None or cached[0] != stamp or stamp < 0:
+            cached = (stamp, HistoryIndex(history, self.window))
+            self._indexes[key] = cached
+        return cached[1]
+
+
+_STORE: HistoryStore | None = None
+
+
+def get_store() -> HistoryStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = HistoryStore()
+    return _STORE
+
+
+def history_contexts(series_map: dict[str, pd.Series | None], end: pd.Timestamp, store: HistoryStore | None = None) -> dict[str, MoveContext]:
+    """Update the store with ``series_map`` and return each series' context at ``end``."""
+
+    store = store or get_store()
+    contexts = {}
+    for key, series in series_map.items():
+        try:
+            context = store.index(key, series).context(end)
+        except Exception as exc:
+            LOGGER.warning("History context unavailable for %s: %s", key, exc)
+            continue
+        if context is not None:
+            contexts[key] = context
+    return contexts
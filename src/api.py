@@ -0,0 +1,328 @@
+"""Read-only local query API over published series and report artefacts.
+
+Snapshot JSON under ``reports/<YYYY-MM>/snapshots/`` is parsed once into
+sorted date/value arrays (plus a month-end view) and kept in memory; files
+are re-read only when their size or mtime changes, checked at most every
+``RESCAN_SECONDS``. Requests slice the arrays with ``searchsorted``::
+
+    GET /series                                   ids with their latest report month
+    GET /series/<id>?start=&end=&freq=M&month=    {"id", "month", "freq", "d": [...], "v": [...]}
+    GET /reports                                  report months
+    GET /reports/latest                           latest report's files and run metrics
+    GET /reports/<month>/<path>                   a report artefact (markdown, chart, workbook)
+
+Every response carries an ``ETag`` and ``Last-Modified`` derived from the
+source files, so an unchanged refresh gets ``304 Not Modified``; bodies are
+gzipped when the client accepts it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .site import DEFAULT_REPORTS, MONTH_PATTERN
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+RESCAN_SECONDS = 5.0
+GZIP_MIN_BYTES = 1024
+FREQUENCIES = ("D", "M")
+
+
+@dataclass
+class SeriesEntry:
+    month: str
+    dates: np.ndarray  # datetime64[ns], sorted
+    values: np.ndarray
+    monthly_dates: np.ndarray
+    monthly_values: np.ndarray
+    etag: str
+    mtime: float
+
+    def slice(self, start: str | None, end: str | None, freq: str) -> tuple[np.ndarray, np.ndarray]:
+        dates, values = (self.monthly_dates, self.monthly_values) if freq == "M" else (self.dates, self.values)
+        lo = 0 if not start else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left"))
+        hi = len(dates) if not end else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right"))
+        return dates[lo:hi], values[lo:hi]
+
+
+def _load_entry(month: str, path: Path, stat) -> SeriesEntry:
+    raw = path.read_bytes()
+    records = json.loads(raw or b"[]")
+    series = pd.Series(
+        [np.nan if row.get("value") is None else float(row["value"]) for row in records],
+        index=pd.to_datetime([str(row.get("date", ""))[:10] for row in records]),
+        dtype=float,
+    ).sort_index()
+    monthly = series.resample("ME").last().dropna() if not series.empty else series
+    return SeriesEntry(
+        month=month,
+        dates=series.index.to_numpy(dtype="datetime64[ns]"),
+        values=series.to_numpy(),
+        monthly_dates=monthly.index.to_numpy(dtype="datetime64[ns]"),
+        monthly_values=monthly.to_numpy(),
+        etag=hashlib.sha1(raw).hexdigest()[:16],
+        mtime=stat.st_mtime,
+    )
+
+
+class SeriesIndex:
+    """In-memory series store over every report's snapshots."""
+
+    def __init__(self, reports_dir: Path = DEFAULT_REPORTS):
+        self.reports_dir = reports_dir
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], SeriesEntry] = {}
+        self._stats: dict[tuple[str, str], tuple[int, int]] = {}
+        self._scanned = 0.0
+
+    def months(self) -> list[str]:
+        if not self.reports_dir.exists():
+            return []
+        return sorted(p.name for p in self.reports_dir.iterdir() if p.is_dir() and MONTH_PATTERN.match(p.name))
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            if not force and time.monotonic() - self._scanned < RESCAN_SECONDS:
+                return
+            seen = set()
+            for month in self.months():
+                for path in (self.reports_dir / month / "snapshots").glob("*.json"):
+                    key = (month, path.stem)
+                    seen.add(key)
+                    stat = path.stat()
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    if self._stats.get(key) == signature:
+                        continue
+                    try:
+                        self._entries[key] = _load_entry(month, path, stat)
+                        self._stats[key] = signature
+                    except Exception as exc:
+                        LOGGER.warning("Skipping unreadable snapshot %s: %s", path, exc)
+            for key in set(self._entries) - seen:
+                self._entries.pop(key, None)
+                self._stats.pop(key, None)
+            self._scanned = time.monotonic()
+
+    def ids(self) -> dict[str, str]:
+        """Series id -> latest month that publishes it."""
+
+        self.refresh()
+        # Another handler thread may be refreshing; read a snapshot taken under the lock.
+        with self._lock:
+            keys = sorted(self._entries)
+        latest: dict[str, str] = {}
+        for month, series_id in keys:
+            latest[series_id] = month
+        return latest
+
+    def get(self, series_id: str, month: str | None = None) -> SeriesEntry | None:
+        self.refresh()
+        with self._lock:
+            if month is None:
+                month = max((m for m, sid in self._entries if sid == series_id), default=None)
+            return self._entries.get((month, series_id)) if month else None
+
+
+def _http_date(timestamp: float) -> str:
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_APIServer"
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        match = self.headers.get("If-None-Match")
+        if match is not None:
+            return etag in [tag.strip() for tag in match.split(",")] or match.strip() == "*"
+        since = self.headers.get("If-Modified-Since")
+        if since:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, etag: str | None = None, mtime: float | None = None) -> None:
+        if etag is not None and mtime is not None and self._not_modified(etag, mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", _http_date(mtime))
+            self.end_headers()
+            return
+        compress = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body, compresslevel=6)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        if etag is not None and mtime is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", _http_date(mtime))
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, payload, etag: str | None = None, mtime: float | None = None, status: HTTPStatus = HTTPStatus.OK) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self._send(status, body, "application/json", etag, mtime)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._json({"error": message}, status=status)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if parts == ["series"]:
+                self._series_list()
+            elif len(parts) == 2 and parts[0] == "series":
+                self._series(parts[1], query)
+            elif parts == ["reports"]:
+                self._json({"months": self.server.index.months()})
+            elif parts == ["reports", "latest"]:
+                self._latest_report()
+            elif len(parts) >= 3 and parts[0] == "reports":
+                self._artefact(parts[1], parts[2:])
+            else:
+                self._error(HTTPStatus.NOT_FOUND, "not found")
+        except ValueError as exc:
+            self._error(HTTPStatus.BAD_REQUEST, str(exc))
+
+    def _series_list(self) -> None:
+        index = self.server.index
+        ids = index.ids()
+        entries = [index.get(series_id, month) for series_id, month in sorted(ids.items())]
+        etag = '"' + hashlib.sha1("".join(e.etag for e in entries).encode()).hexdigest()[:16] + '"'
+        mtime = max((e.mtime for e in entries), default=0.0)
+        payload = [
+            {
+                "id": series_id,
+                "month": entry.month,
+                "start": str(entry.dates[0])[:10] if len(entry.dates) else None,
+                "end": str(entry.dates[-1])[:10] if len(entry.dates) else None,
+                "points": int(len(entry.dates)),
+            }
+            for series_id, entry in zip(sorted(ids), entries)
+        ]
+        self._json(payload, etag, mtime)
+
+    def _series(self, series_id: str, query: dict) -> None:
+        freq = query.get("freq", "D").upper()
+        if freq not in FREQUENCIES:
+            raise ValueError(f"freq must be one of {', '.join(FREQUENCIES)}")
+        month = query.get("month")
+        if month is not None and not MONTH_PATTERN.match(month):
+            raise ValueError("month must be YYYY-MM")
+        entry = self.server.index.get(series_id, month)
+        if entry is None:
+            self._error(HTTPStatus.NOT_FOUND, f"unknown series {series_id!r}")
+            return
+        start, end = query.get("start"), query.get("end")
+        # The response is a pure function of the source file and the query.
+        etag = '"' + hashlib.sha1(f"{entry.etag}|{start}|{end}|{freq}".encode()).hexdigest()[:16] + '"'
+        if self._not_modified(etag, entry.mtime):
+            self._send(HTTPStatus.OK, b"", "application/json", etag, entry.mtime)
+            return
+        dates, values = entry.slice(start, end, freq)
+        payload = {
+            "id": series_id,
+            "month": entry.month,
+            "freq": freq,
+            "d": [str(d)[:10] for d in dates],
+            "v": [None if np.isnan(v) else round(float(v), 6) for v in values],
+        }
+        self._json(payload, etag, entry.mtime)
+
+    def _latest_report(self) -> None:
+        months = self.server.index.months()
+        if not months:
+            self._error(HTTPStatus.NOT_FOUND, "no reports")
+            return
+        month = months[-1]
+        month_dir = self.server.index.reports_dir / month
+        files = sorted(p for p in month_dir.rglob("*") if p.is_file() and "snapshots" not in p.parts)
+        mtime = max((p.stat().st_mtime for p in files), default=0.0)
+        signature = "|".join(f"{p.relative_to(month_dir)}:{p.stat().st_size}:{p.stat().st_mtime_ns}" for p in files)
+        etag = '"' + hashlib.sha1(signature.encode()).hexdigest()[:16] + '"'
+        metrics_path = month_dir / "run_metrics.json"
+        payload = {
+            "month": month,
+            "files": [f"/reports/{month}/{p.relative_to(month_dir).as_posix()}" for p in files],
+            "series": sorted(series_id for series_id, m in self.server.index.ids().items() if m == month),
+            "metrics": json.loads(metrics_path.read_text()) if metrics_path.exists() else None,
+        }
+        self._json(payload, etag, mtime)
+
+    def _artefact(self, month: str, parts: list[str]) -> None:
+        if not MONTH_PATTERN.match(month) or any(part in ("..", "") for part in parts):
+            raise ValueError("invalid report path")
+        month_dir = (self.server.index.reports_dir / month).resolve()
+        path = month_dir.joinpath(*parts).resolve()
+        if month_dir not in path.parents or not path.is_file():
+            self._error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        stat = path.stat()
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        if self._not_modified(etag, stat.st_mtime):
+            self._send(HTTPStatus.OK, b"", "", etag, stat.st_mtime)
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if path.suffix == ".md":
+            content_type = "text/markdown; charset=utf-8"
+        self._send(HTTPStatus.OK, path.read_bytes(), content_type, etag, stat.st_mtime)
+
+    def log_message(self, format: str, *args) -> None:
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+class _APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], index: SeriesIndex):
+        super().__init__(address, _Handler)
+        self.index = index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read-only query API over report series and artefacts")
+    parser.add_argument("--reports", default=str(DEFAULT_REPORTS), help="Reports archive directory")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind (local only by default)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    index = SeriesIndex(Path(args.reports))
+    index.refresh(force=True)
+    httpd = _APIServer((args.host, args.port), index)
+    LOGGER.info("Query API listening on http://%s:%d (%d series)", args.host, args.port, len(index.ids()))
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+"""Audit every month of the ``reports/`` archive.
+
+Each ``reports/<YYYY-MM>/`` folder is checked for:
+
+- markdown: title, the template's section headings (those outside
+  ``{% if %}``/``{% for %}`` blocks, which every report has), unrendered template
+  syntax, HTML-escaped text, ``n/a`` placeholders and broken image links;
+- snapshots: valid JSON records, not empty, ordered unique dates, finite
+  values, and a last observation close to the report month;
+- charts: non-empty files whose bytes match their format;
+- workbook: opens, no empty data sheets, and every column that has a
+  snapshot agrees with it, as does the Commentary sheet with the markdown;
+- ``run_metrics.json``: the right month and no failed stages.
+
+Months are audited in parallel worker processes. Results are cached in
+``data/cache/audit_cache.json`` per artefact content hash: a month whose
+files all have their cached size and mtime is skipped without being read,
+and in a changed month only artefacts with a new hash are re-checked (the
+cross-artefact consistency checks always re-run). The summary is written to
+``reports/audit.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from jinja2 import Environment, nodes
+
+from .utils.hashing import tree_hashes, unchanged
+from .utils.io import load_yaml, write_json
+
+LOGGER = logging.getLogger(__name__)
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_REPORTS = ROOT / "reports"
+CACHE_PATH = ROOT / "data" / "cache" / "audit_cache.json"
+SUMMARY_NAME = "audit.json"
+TEMPLATE_PATH = ROOT / "templates" / "commentary.md.j2"
+MARKETS_PATH = ROOT / "config" / "markets.yml"
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+# Bump when checks change so cached results are discarded.
+AUDIT_VERSION = 1
+
+ERROR = "error"
+WARNING = "warning"
+
+MARKDOWN = "monthly_commentary.md"
+WORKBOOK = "dashboard.xlsx"
+RUN_METRICS = "run_metrics.json"
+# Quarterly series (AU CPI) can lag the report month by two quarters.
+STALE_DAYS = 190
+# Snapshots of float32 (--low-memory) runs keep about seven significant digits.
+VALUE_RTOL = 1e-5
+CHART_MAGIC = {
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".webp": (b"RIFF",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".svg": (b"<?xml", b"<svg"),
+}
+IMAGE_LINK = re.compile(r"!\[[^\]]*\]\(([^)\s]+)\)")
+HTML_ENTITY = re.compile(r"&(?:amp|lt|gt|quot|#\d+);")
+TEMPLATE_SYNTAX = re.compile(r"\{\{|\{%|%\}|\}\}")
+NOT_AVAILABLE = re.compile(r"\bn/a\b")
+# Sheets that hold text rather than series.
+TEXT_SHEETS = {"Commentary"}
+
+
+@dataclass(frozen=True)
+class Finding:
+    month: str
+    artefact: str
+    severity: str
+    check: str
+    message: str
+
+
+@dataclass(frozen=True)
+class AuditContext:
+    """What the checks compare against, built once per audit and shipped to every worker."""
+
+    key: str
+    headings: tuple[str, ...]
+    aliases: dict[str, str]  # workbook column header -> snapshot name
+
+
+def template_headings(path: Path = TEMPLATE_PATH) -> tuple[str, ...]:
+    """Headings the template always renders; those inside ``{% if %}`` or ``{% for %}`` blocks are optional."""
+
+    def walk(node: nodes.Node, optional: bool):
+        for child in node.iter_child_nodes():
+            if isinstance(child, nodes.TemplateData):
+                if not optional:
+                    yield from (line.strip() for line in child.data.splitlines() if line.startswith("## "))
+            else:
+                yield from walk(child, optional or isinstance(child, (nodes.If, nodes.For)))
+
+    return tuple(walk(Environment().parse(path.read_text(encoding="utf-8")), False))
+
+
+def context_key() -> str:
+    """Changes whenever cached results may be out of date: new checks, headings or markets."""
+
+    digest = hashlib.sha256(json.dumps([AUDIT_VERSION, template_headings()]).encode())
+    digest.update(MARKETS_PATH.read_bytes())
+    return digest.hexdigest()
+
+
+def workbook_aliases(config: dict) -> dict[str, str]:
+    """Workbook column headers of every configured market and shared series, mapped to their snapshot."""
+
+    from .cli import equity_label, ten_year_label
+
+    aliases = {
+        "US CPI YoY %": "us_cpi_yoy",
+        "AU CPI YoY %": "au_cpi_yoy",
+        "Fed Funds %": "fed_funds",
+        "RBA Cash %": "rba_cash",
+        "AUDUSD": "audusd",
+        "UUP": "uup",
+        "Gold": "gold",
+        "WTI": "wti",
+        "Brent": "brent",
+        "Iron Ore": "ironore",
+    }
+    for market in config.get("markets") or []:
+        aliases[ten_year_label(market)] = f"{market['code']}_10y"
+        aliases[equity_label(market)] = market.get("equity_snapshot", f"{market['code']}_equity")
+    return aliases
+
+
+def build_context(key: str) -> AuditContext:
+    # Only needed when a month is re-checked; importing the CLI for the labels is the slow part.
+    return AuditContext(key, template_headings(), workbook_aliases(load_yaml(MARKETS_PATH)))
+
+
+def _finding(month: str, artefact: str, severity: str, check: str, message: str) -> dict:
+    return asdict(Finding(month, artefact, severity, check, message))
+
+
+def check_markdown(month: str, path: Path, context: AuditContext) -> list[dict]:
+    text = path.read_text(encoding="utf-8")
+    found = []
+
+    def add(severity: str, check: str, message: str) -> None:
+        found.append(_finding(month, MARKDOWN, severity, check, message))
+
+    if not text.strip():
+        add(ERROR, "empty", "markdown is empty")
+        return found
+    first = text.lstrip().splitlines()[0]
+    if not first.startswith("# ") or month not in first:
+        add(ERROR, "title", f"first line {first[:60]!r} is not the title for {month}")
+    present = {line.strip() for line in text.splitlines()}
+    missing = [heading for heading in context.headings if heading not in present]
+    if missing:
+        add(ERROR, "headings", "missing " + ", ".join(missing))
+    if TEMPLATE_SYNTAX.search(text):
+        add(ERROR, "template", "unrendered template syntax")
+    entities = sorted(set(HTML_ENTITY.findall(text)))
+    if entities:
+        add(ERROR, "escaping", "HTML-escaped text: " + ", ".join(entities))
+    placeholders = len(NOT_AVAILABLE.findall(text))
+    if placeholders:
+        add(WARNING, "n/a", f"{placeholders} n/a placeholder(s)")
+    for target in IMAGE_LINK.findall(text):
+        if not (path.parent / target).is_file():
+            add(ERROR, "image", f"image link {target} has no file")
+    return found
+
+
+def read_snapshot(path: Path) -> pd.Series:
+    """Snapshot records as a float series by date; raises ``ValueError`` when malformed."""
+
+    records = json.loads(path.read_text(encoding="utf-8") or "null")
+    if not isinstance(records, list) or not all(isinstance(row, dict) and {"date", "value"} <= row.keys() for row in records):
+        raise ValueError("not a list of {date, value} records")
+    return pd.Series(
+        [math.nan if row["value"] is None else float(row["value"]) for row in records],
+        index=pd.to_datetime([row["date"] for row in records]),
+        dtype=float,
+    )
+
+
+def read_workbook(path: Path) -> dict[str, list[tuple]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {sheet.title: list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets}
+    finally:
+        workbook.close()
+
+
+class MonthReader:
+    """Parses each artefact of a month at most once across the per-artefact and consistency checks."""
+
+    def __init__(self, month_dir: Path):
+        self.month_dir = month_dir
+        self._parsed: dict[str, object] = {}
+
+    def _get(self, rel: str, parse):
+        if rel not in self._parsed:
+            try:
+                self._parsed[rel] = parse(self.month_dir / rel)
+            except Exception as exc:
+                self._parsed[rel] = exc
+        value = self._parsed[rel]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def workbook(self) -> dict[str, list[tuple]]:
+        return self._get(WORKBOOK, read_workbook)
+
+    def snapshot(self, rel: str) -> pd.Series:
+        return self._get(rel, read_snapshot)
+
+
+def check_snapshot(month: str, rel: str, reader: MonthReader) -> list[dict]:
+    found = []
+
+    def add(severity: str, check: str, message: str) -> None:
+        found.append(_finding(month, rel, severity, check, message))
+
+    try:
+        series = reader.snapshot(rel)
+    except (ValueError, TypeError) as exc:
+        add(ERROR, "format", f"unreadable snapshot: {exc}")
+        return found
+    if series.empty:
+        add(ERROR, "empty", f"no observations ({(reader.month_dir / rel).stat().st_size} bytes)")
+        return found
+    values = series.to_numpy()
+    if not (~pd.isna(values)).any():
+        add(ERROR, "empty", "every value is null")
+        return found
+    if pd.Series(values).abs().eq(math.inf).any():
+        add(ERROR, "values", "non-finite values")
+    if not series.index.is_monotonic_increasing:
+        add(ERROR, "dates", "dates are not in order")
+    if series.index.has_duplicates:
+        add(ERROR, "dates", f"{int(series.index.duplicated().sum())} duplicate date(s)")
+    period = pd.Period(month, "M")
+    last = series.dropna().index.max()
+    if last > period.end_time:
+        add(WARNING, "dates", f"observations after {month} (last {last.date()})")
+    elif (period.end_time - last).days > STALE_DAYS:
+        add(WARNING, "stale", f"last observation {last.date()} is {(period.end_time - last).days} days before month end")
+    return found
+
+
+def check_chart(month: str, rel: str, path: Path) -> list[dict]:
+    data = path.read_bytes()[:32]
+    if not data:
+        return [_finding(month, rel, ERROR, "empty", "chart file is empty")]
+    magic = CHART_MAGIC.get(path.suffix.lower())
+    if magic is None:
+        return [_finding(month, rel, WARNING, "format", f"unexpected chart format {path.suffix}")]
+    if not data.startswith(magic):
+        return [_finding(month, rel, ERROR, "format", f"bytes are not a {path.suffix[1:]} image")]
+    if path.suffix.lower() == ".png" and (int.from_bytes(data[16:20], "big") == 0 or int.from_bytes(data[20:24], "big") == 0):
+        return [_finding(month, rel, ERROR, "format", "PNG has zero width or height")]
+    return []
+
+
+def check_workbook(month: str, reader: MonthReader) -> list[dict]:
+    try:
+        sheets = reader.workbook()
+    except Exception as exc:
+        return [_finding(month, WORKBOOK, ERROR, "format", f"workbook does not open: {exc}")]
+    found = []
+    for title, rows in sheets.items():
+        if title in TEXT_SHEETS:
+            continue
+        if len(rows) < 2:
+            found.append(_finding(month, WORKBOOK, ERROR, "empty", f"sheet {title} has no data rows"))
+            continue
+        for position, header in enumerate(rows[0][1:], start=1):
+            if not any(len(row) > position and isinstance(row[position], (int, float)) for row in rows[1:]):
+                found.append(_finding(month, WORKBOOK, WARNING, "empty", f"{title}/{header} has no values"))
+    return found
+
+
+def _workbook_columns(rows: list[tuple]) -> dict[str, pd.Series]:
+    columns = {}
+    for position, header in enumerate(rows[0][1:], start=1):
+        points = [
+            (row[0], row[position])
+            for row in rows[1:]
+            if len(row) > position and isinstance(row[position], (int, float)) and row[0] is not None
+        ]
+        if header is not None:
+            columns[str(header)] = pd.Series(
+                [value for _, value in points], index=pd.to_datetime([date for date, _ in points]), dtype=float
+            )
+    return columns
+
+
+def check_consistency(month: str, reader: MonthReader, context: AuditContext) -> list[dict]:
+    """Checks that read more than one artefact, re-run whenever anything in the month changed."""
+
+    found = []
+    month_dir = reader.month_dir
+    markdown = month_dir / MARKDOWN
+    try:
+        sheets = reader.workbook() if (month_dir / WORKBOOK).is_file() else {}
+    except Exception:
+        sheets = {}  # reported by check_workbook
+    snapshots: dict[str, pd.Series | None] = {}
+    for title, rows in sheets.items():
+        if title in TEXT_SHEETS or len(rows) < 1:
+            continue
+        for header, column in _workbook_columns(rows).items():
+            name = context.aliases.get(header)
+            rel = f"snapshots/{name}.json"
+            if name is None or not (month_dir / rel).is_file():
+                continue
+            if name not in snapshots:
+                try:
+                    series = reader.snapshot(rel).dropna()
+                    snapshots[name] = series[~series.index.duplicated(keep="last")].sort_index()
+                except (ValueError, TypeError):
+                    snapshots[name] = None
+            snapshot = snapshots[name]
+            if snapshot is None or column.empty:
+                continue
+            if snapshot.empty:
+                found.append(_finding(month, WORKBOOK, ERROR, "consistency", f"{title}/{header} has data but {name}.json is empty"))
+                continue
+            # Workbook rows are month ends or release dates; compare with the snapshot as of each.
+            as_of = snapshot.reindex(column.index, method="ffill")
+            compared = as_of.notna()
+            mismatched = ~pd.Series(
+                [math.isclose(a, b, rel_tol=VALUE_RTOL, abs_tol=1e-9) for a, b in zip(column[compared], as_of[compared])],
+                dtype=bool,
+            )
+            if mismatched.any():
+                first = column[compared].index[mismatched.to_numpy()][0]
+                found.append(_finding(
+                    month, WORKBOOK, ERROR, "consistency",
+                    f"{title}/{header} differs from {name}.json on {int(mismatched.sum())} date(s), first {first.date()}",
+                ))
+    commentary = sheets.get("Commentary")
+    if commentary and markdown.is_file():
+        text = markdown.read_text(encoding="utf-8")
+        missing = [str(row[0]) for row in commentary[1:] if row and row[0] and str(row[0]) not in text]
+        if missing:
+            found.append(_finding(
+                month, WORKBOOK, WARNING, "consistency",
+                f"{len(missing)} Commentary line(s) not in the markdown, first {missing[0][:60]!r}",
+            ))
+    metrics = month_dir / RUN_METRICS
+    if metrics.is_file():
+        try:
+            payload = json.loads(metrics.read_text(encoding="utf-8"))
+        except ValueError:
+            return found + [_finding(month, RUN_METRICS, ERROR, "format", "run metrics are not JSON")]
+        if payload.get("month") not in (None, month):
+            found.append(_finding(month, RUN_METRICS, ERROR, "month", f"metrics are for {payload['month']}"))
+        stages = (payload.get("pipeline") or {}).get("stages") or {}
+        failed = sorted(name for name, stage in stages.items() if stage.get("status") == "failed")
+        if failed:
+            found.append(_finding(month, RUN_METRICS, WARNING, "stages", "failed stages: " + ", ".join(failed)))
+    return found
+
+
+def check_artefact(month: str, rel: str, reader: MonthReader, context: AuditContext) -> list[dict]:
+    if rel == MARKDOWN:
+        return check_markdown(month, reader.month_dir / rel, context)
+    if rel == WORKBOOK:
+        return check_workbook(month, reader)
+    if rel.startswith("snapshots/") and rel.endswith(".json"):
+        return check_snapshot(month, rel, reader)
+    if rel.startswith("charts/"):
+        return check_chart(month, rel, reader.month_dir / rel)
+    return []
+
+
+def _fingerprint(files: dict[str, dict], context: AuditContext) -> str:
+    digest = hashlib.sha256(context.key.encode())
+    for rel, meta in sorted(files.items()):
+        digest.update(rel.encode())
+        digest.update(meta["sha256"].encode())
+    return digest.hexdigest()
+
+
+def audit_month(month_dir: Path, previous: dict, context: AuditContext) -> dict:
+    """Cache entry for one month: file hashes, per-artefact findings and consistency findings."""
+
+    month = month_dir.name
+    files = tree_hashes(month_dir, previous.get("files", {}))
+    fingerprint = _fingerprint(files, context)
+    if previous.get("fingerprint") == fingerprint:
+        return {**previous, "files": files, "checked": []}
+    old = previous.get("artefacts", {}) if previous.get("context") == context.key else {}
+    artefacts, checked = {}, []
+    reader = MonthReader(month_dir)
+    for rel, meta in files.items():
+        cached = old.get(rel)
+        if cached and cached.get("sha256") == meta["sha256"]:
+            artefacts[rel] = cached
+            continue
+        try:
+            findings = check_artefact(month, rel, reader, context)
+        except Exception as exc:
+            findings = [_finding(month, rel, ERROR, "audit", f"check failed: {exc}")]
+        artefacts[rel] = {"sha256": meta["sha256"], "findings": findings}
+        checked.append(rel)
+    if MARKDOWN not in files:
+        artefacts[MARKDOWN] = {"sha256": None, "findings": [_finding(month, MARKDOWN, ERROR, "missing", "no markdown")]}
+    return {
+        "fingerprint": fingerprint,
+        "context": context.key,
+        "files": files,
+        "artefacts": artefacts,
+        "consistency": check_consistency(month, reader, context),
+        "checked": checked,
+    }
+
+
+def month_findings(entry: dict) -> list[dict]:
+    return [f for artefact in entry["artefacts"].values() for f in artefact["findings"]] + entry["consistency"]
+
+
+def audit_archive(
+    reports_dir: Path = DEFAULT_REPORTS,
+    cache_path: Path = CACHE_PATH,
+    workers: int | None = None,
+    force: bool = False,
+) -> dict:
+    """Audit every month under ``reports_dir``; returns the summary."""
+
+    start = time.perf_counter()
+    key = context_key()
+    cache = {}
+    if cache_path.exists() and not force:
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable audit cache %s", cache_path)
+    previous_months = cache.get("months", {}) if cache.get("version") == AUDIT_VERSION else {}
+    month_dirs = sorted(p for p in reports_dir.iterdir() if p.is_dir() and MONTH_PATTERN.match(p.name))
+
+    months: dict[str, dict] = {}
+    stale = []
+    for month_dir in month_dirs:
+        previous = previous_months.get(month_dir.name, {})
+        if previous.get("context") == key and unchanged(month_dir, previous.get("files", {})):
+            months[month_dir.name] = previous
+        else:
+            stale.append(month_dir)
+    rechecked: dict[str, list[str]] = {}
+    if stale:
+        context = build_context(key)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(stale)))
+        LOGGER.info("Auditing %d of %d month(s) with %d worker(s)", len(stale), len(month_dirs), workers)
+        if workers == 1:
+            entries = [audit_month(d, previous_months.get(d.name, {}), context) for d in stale]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                entries = list(pool.map(audit_month, stale, [previous_months.get(d.name, {}) for d in stale], [context] * len(stale)))
+        for month_dir, entry in zip(stale, entries):
+            rechecked[month_dir.name] = entry.pop("checked")
+            months[month_dir.name] = entry
+    write_json(cache_path, {"version": AUDIT_VERSION, "months": months})
+
+    findings = [f for label in sorted(months) for f in month_findings(months[label])]
+    summary = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "months": len(months),
+        "rechecked": {label: len(rels) for label, rels in rechecked.items()},
+        "seconds": round(time.perf_counter() - start, 3),
+        "errors": sum(f["severity"] == ERROR for f in findings),
+        "warnings": sum(f["severity"] == WARNING for f in findings),
+        "by_month": {
+            label: {
+                "errors": sum(f["severity"] == ERROR for f in month_findings(months[label])),
+                "warnings": sum(f["severity"] == WARNING for f in month_findings(months[label])),
+            }
+            for label in sorted(months)
+        },
+        "findings": findings,
+    }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Audit every month of the reports archive")
+    parser.add_argument("--reports", default=str(DEFAULT_REPORTS), help="Reports archive directory")
+    parser.add_argument("--out", default=None, help=f"Summary JSON (default <reports>/{SUMMARY_NAME})")
+    parser.add_argument("--workers", type=int, default=None, help="Months audited in parallel (default: CPUs)")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results and re-check everything")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 when any error is found")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    reports_dir = Path(args.reports)
+    summary = audit_archive(reports_dir, workers=args.workers, force=args.force)
+    write_json(Path(args.out) if args.out else reports_dir / SUMMARY_NAME, summary)
+    for label, counts in summary["by_month"].items():
+        print(f"{label}: {counts['errors']} error(s), {counts['warnings']} warning(s)")
+    for finding in summary["findings"]:
+        if finding["severity"] == ERROR:
+            print(f"  {finding['month']} {finding['artefact']} [{finding['check']}] {finding['message']}")
+    LOGGER.info(
+        "Audited %d month(s), re-checked %d, in %.2fs: %d error(s), %d warning(s)",
+        summary["months"], len(summary["rechecked"]), summary["seconds"], summary["errors"], summary["warnings"],
+    )
+    if args.strict and summary["errors"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
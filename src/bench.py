@@ -0,0 +1,131 @@
+"""Synthetic multi-market benchmark for the report build.
+
+    python -m src.bench --markets 1,2,5,10,20 --latency 0.25
+
+Each run builds a report for N synthetic markets (``m01``..``mNN``) through
+the real pipeline: per-market stages, workbook, charts and snapshots. Loading
+is replaced by random-walk series that each take ``latency`` seconds, standing
+in for one provider round trip, and run on a pool sized like ``load_all``'s.
+Reports and history files go to a temporary directory. The LLM stage is
+skipped (rule-based paragraphs).
+
+The summary gives wall time per market count and the fitted scaling exponent
+``k`` in ``time ~ markets**k``; ``k < 1`` means adding markets costs less
+than linear time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from . import cli
+from .analytics import history
+from .loaders.budget import FRESH, LoadResult
+
+DEFAULT_MARKETS = (1, 2, 5, 10, 20)
+DEFAULT_LATENCY = 0.25
+DEFAULT_MONTH = "2025-09"
+HISTORY_YEARS = 12
+
+
+def synthetic_markets(count: int) -> list[dict]:
+    return [
+        {"code": f"m{index:02d}", "name": f"Market {index}", "adjective": f"M{index:02d}", "equity_name": f"M{index:02d} index"}
+        for index in range(1, count + 1)
+    ]
+
+
+def _random_walk(key: str, end: pd.Timestamp, start_level: float) -> pd.Series:
+    rng = np.random.default_rng(zlib.crc32(key.encode()))
+    index = pd.bdate_range(end - pd.DateOffset(years=HISTORY_YEARS), end)
+    return pd.Series(start_level * np.exp(np.cumsum(rng.normal(0.0, 0.01, len(index)))), index=index, name=key)
+
+
+def _synthetic_load(latency: float):
+    def load_all(market_configs, window, lookback_months, deadline=None, memo=None, refresh="all", as_of=None):
+        keys = cli.series_keys(market_configs)
+
+        def fetch(key: str) -> LoadResult:
+            started = time.monotonic()
+            time.sleep(latency)
+            series = _random_walk(key, window.end, 3.0 if "ten_year" in key or "cpi" in key else 1000.0)
+            return LoadResult(key, series, FRESH, time.monotonic() - started)
+
+        workers = min(cli.MAX_LOAD_WORKERS, max(cli.DEFAULT_LOAD_WORKERS, len(keys)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bench-load") as executor:
+            return dict(zip(keys, executor.map(fetch, keys)))
+
+    return load_all
+
+
+def run_once(count: int, latency: float, root: Path, month: str = DEFAULT_MONTH) -> float:
+    markets = synthetic_markets(count)
+    started = time.monotonic()
+    with mock.patch.object(cli, "load_all", _synthetic_load(latency)), mock.patch.object(
+        history, "_STORE", history.HistoryStore(root / f"history-{count}")
+    ), contextlib.redirect_stdout(io.StringIO()):
+        cli.run(month, "", "md,xlsx", skip=["llm"], reports_root=root / f"reports-{count}", market_configs=markets)
+    return time.monotonic() - started
+
+
+def scaling_exponent(points: list[tuple[int, float]]) -> float | None:
+    """Least-squares slope of log(seconds) on log(markets)."""
+
+    if len(points) < 2:
+        return None
+    xs = [math.log(count) for count, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / denominator if denominator else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic multi-market benchmark")
+    parser.add_argument("--markets", default=",".join(map(str, DEFAULT_MARKETS)), help="Comma separated market counts")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Seconds per synthetic series load")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per market count (the fastest is kept)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    counts = [int(item) for item in args.markets.split(",") if item.strip()]
+    points = []
+    with tempfile.TemporaryDirectory(prefix="bench-markets-") as tmp:
+        # Warm-up run: imports, the matplotlib font cache and first-use costs.
+        run_once(1, 0.0, Path(tmp) / "warm-up")
+        for count in counts:
+            seconds = min(run_once(count, args.latency, Path(tmp) / f"run-{count}-{attempt}") for attempt in range(args.repeat))
+            points.append((count, seconds))
+    exponent = scaling_exponent(points)
+    results = {
+        "latency_seconds": args.latency,
+        "runs": [{"markets": count, "seconds": round(seconds, 3), "seconds_per_market": round(seconds / count, 3)} for count, seconds in points],
+        "scaling_exponent": None if exponent is None else round(exponent, 3),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'markets':>8} {'seconds':>9} {'per market':>11}")
+    for run in results["runs"]:
+        print(f"{run['markets']:>8} {run['seconds']:>9.3f} {run['seconds_per_market']:>11.3f}")
+    if exponent is not None:
+        print(f"time ~ markets^{exponent:.2f} ({'sub-linear' if exponent < 1 else 'linear or worse'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,23 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from .output import save_figure
+from .reduce import reduce_frame
 
-def plot(audusd_mom: pd.Series, us10y_mom: pd.Series, path: str, width: int = 900, height: int = 500):
+
+def plot(audusd_mom: pd.Series, yield_mom: pd.Series, path: str, yield_label: str = "US 10y", width: int = 900, height: int = 500):
     df = pd.concat([
         audusd_mom.rename("AUDUSD MoM %"),
-        us10y_mom.rename("US 10y MoM %"),
+        yield_mom.rename(f"{yield_label} MoM %"),
     ], axis=1)
     df = df.dropna(how="all")
     plt.figure(figsize=(width / 100, height / 100))
     if not df.empty:
-        df.plot(ax=plt.gca())
-    plt.title("AUDUSD vs US 10y (MoM %)")
+        reduce_frame(df, width).plot(ax=plt.gca())
+    plt.title(f"AUDUSD vs {yield_label} (MoM %)")
     plt.ylabel("%")
     plt.xlabel("")
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig(path)
+    save_figure(path)
     plt.close()
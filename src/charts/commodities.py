@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from .output import save_figure
+from .reduce import reduce_frame
+
 
 def _rebase(df, base_periods=12):
     if df.empty:
@@ -23,11 +26,12 @@ def plot(gold, wti, brent, iron, path: str, width=900, height=500):
     plt.figure(figsize=(width / 100, height / 100))
     if not df.empty:
         rb = _rebase(df, 12)
-        rb.plot(ax=plt.gca())
+        if not rb.empty:
+            reduce_frame(rb, width).plot(ax=plt.gca())
     plt.title("Commodities (Indexed = 100, T-12)")
     plt.ylabel("Index")
     plt.xlabel("")
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig(path)
+    save_figure(path)
     plt.close()
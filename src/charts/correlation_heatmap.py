@@ -0,0 +1,23 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from .output import save_figure
+
+
+def plot(corr: pd.DataFrame, path: str, width: int = 900, height: int = 700, title: str = "Cross-asset correlation (12m, MoM %)"):
+    plt.figure(figsize=(width / 100, height / 100))
+    ax = plt.gca()
+    if not corr.empty:
+        values = corr.to_numpy(dtype=float)
+        image = ax.imshow(np.ma.masked_invalid(values), cmap="RdBu_r", vmin=-1.0, vmax=1.0)
+        ax.set_xticks(range(len(corr.columns)), labels=corr.columns, rotation=45, ha="right")
+        ax.set_yticks(range(len(corr.index)), labels=corr.index)
+        for (i, j), value in np.ndenumerate(values):
+            if not np.isnan(value):
+                ax.text(j, i, f"{value:.2f}", ha="center", va="center", fontsize=8)
+        plt.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+    plt.title(title)
+    plt.tight_layout()
+    save_figure(path)
+    plt.close()
@@ -0,0 +1,93 @@
+"""Figure output with format selection and optional size budgets."""
+
+from __future__ import annotations
+
+import io
+import logging
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+LOGGER = logging.getLogger(__name__)
+SUPPORTED_FORMATS = ("png", "svg", "webp")
+
+_DEFAULTS = {"format": "png", "dpi": 100, "max_bytes": None, "optimize": True}
+_settings = dict(_DEFAULTS)
+
+
+def configure(fmt: str | None = None, dpi: int | None = None, max_bytes: int | None = None, optimize: bool | None = None) -> None:
+    """Set chart output options for a run (normally from the CLI).
+
+    Options not given revert to their defaults, so a long-lived process never
+    carries one run's settings (a size budget, say) into the next.
+    """
+
+    if fmt is not None and fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"chart format must be one of {', '.join(SUPPORTED_FORMATS)}")
+    _settings.update(_DEFAULTS)
+    if fmt is not None:
+        _settings["format"] = fmt
+    if dpi is not None:
+        _settings["dpi"] = dpi
+    if max_bytes is not None:
+        _settings["max_bytes"] = max_bytes or None
+    if optimize is not None:
+        _settings["optimize"] = optimize
+
+
+def chart_format() -> str:
+    return _settings["format"]
+
+
+def chart_path(directory: Path, stem: str) -> Path:
+    return directory / f"{stem}.{_settings['format']}"
+
+
+def _render_raster(fmt: str, dpi: int, colors: int | None, quality: int) -> bytes:
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png", dpi=dpi)
+    if fmt == "png" and not _settings["optimize"]:
+        return buf.getvalue()
+    from PIL import Image
+
+    buf.seek(0)
+    image = Image.open(buf)
+    out = io.BytesIO()
+    if fmt == "webp":
+        image.convert("RGB").save(out, format="WEBP", quality=quality, method=6)
+    else:
+        # Line charts use few colours; an adaptive palette shrinks them several-fold.
+        image.convert("RGB").quantize(colors=colors or 256).save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def save_figure(path: str | Path) -> None:
+    """Save the current figure to ``path`` honouring format and size budget.
+
+    Raster output is retried at lower DPI, fewer palette colours or lower
+    WebP quality until it fits ``max_bytes``; the smallest attempt is kept.
+    """
+
+    path = Path(path)
+    fmt = path.suffix.lstrip(".").lower() or _settings["format"]
+    budget = _settings["max_bytes"]
+    if fmt == "svg":
+        with plt.rc_context({"svg.fonttype": "none"}):
+            plt.savefig(path, format="svg")
+        if budget and path.stat().st_size > budget:
+            LOGGER.warning("Chart %s is %d bytes, over the %d byte budget", path.name, path.stat().st_size, budget)
+        return
+
+    dpi = _settings["dpi"]
+    attempts = [(dpi, 256, 80), (dpi, 64, 65), (int(dpi * 0.8), 32, 50), (int(dpi * 0.6), 16, 40)]
+    best: bytes | None = None
+    for attempt_dpi, colors, quality in attempts:
+        data = _render_raster(fmt, attempt_dpi, colors, quality)
+        if best is None or len(data) < len(best):
+            best = data
+        if not budget or len(data) <= budget:
+            break
+    assert best is not None
+    if budget and len(best) > budget:
+        LOGGER.warning("Chart %s is %d bytes, over the %d byte budget", path.name, len(best), budget)
+    path.write_bytes(best)
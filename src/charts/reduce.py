@@ -0,0 +1,111 @@
+"""Shape-preserving downsampling of chart inputs.
+
+Charts are drawn at a fixed pixel width, so there is no point handing
+matplotlib much more than one point per pixel. ``reduce_frame`` trims each
+column to a target count derived from the chart width using either
+Largest-Triangle-Three-Buckets (keeps visual shape of smooth lines) or min/max
+buckets (keeps every spike of noisy daily data).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+POINTS_PER_PIXEL = 1.0
+DEFAULT_METHOD = "lttb"
+
+
+def target_points(width: int, points_per_pixel: float = POINTS_PER_PIXEL) -> int:
+    return max(int(width * points_per_pixel), 3)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Return indices of the points kept by Largest-Triangle-Three-Buckets."""
+
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        keep[i + 1] = prev
+    return keep
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Return indices of the min and max of each of ``n_out // 2`` buckets."""
+
+    n = y.shape[0]
+    buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    lo = np.minimum.reduceat(y, edges)
+    hi = np.maximum.reduceat(y, edges)
+    # Recover the positions of the bucket extremes without a Python loop.
+    bucket_id = np.repeat(np.arange(buckets), np.diff(np.append(edges, n)))
+    positions = np.arange(n)
+    is_lo = y == lo[bucket_id]
+    is_hi = y == hi[bucket_id]
+    first_lo = np.full(buckets, n, dtype=np.int64)
+    first_hi = np.full(buckets, n, dtype=np.int64)
+    np.minimum.at(first_lo, bucket_id[is_lo], positions[is_lo])
+    np.minimum.at(first_hi, bucket_id[is_hi], positions[is_hi])
+    keep = np.unique(np.concatenate([first_lo, first_hi, [0, n - 1]]))
+    return keep[keep < n]
+
+
+def _keep_positions(values: np.ndarray, x: np.ndarray, n_out: int, method: str) -> np.ndarray:
+    if method == "minmax":
+        return minmax_indices(values, n_out)
+    if method == "lttb":
+        return lttb_indices(x, values, n_out)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def reduce_series(series: pd.Series | None, n_out: int, method: str = DEFAULT_METHOD) -> pd.Series | None:
+    if series is None:
+        return None
+    s = series.dropna()
+    if s.shape[0] <= n_out:
+        return s
+    keep = _keep_positions(s.to_numpy(dtype=np.float64), _x_values(s.index), n_out, method)
+    return s.iloc[keep]
+
+
+def reduce_frame(df: pd.DataFrame, width: int, method: str = DEFAULT_METHOD) -> pd.DataFrame:
+    """Downsample ``df`` to the point budget for a chart ``width`` pixels wide.
+
+    Rows kept for any column are kept for all columns, so lines that were
+    continuous in the input stay continuous in the output.
+    """
+
+    n_out = target_points(width)
+    if df.empty or df.shape[0] <= n_out:
+        return df
+    x = _x_values(df.index)
+    keep: list[np.ndarray] = []
+    for col in df.columns:
+        values = df[col].to_numpy(dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(values))
+        if valid.size <= n_out:
+            keep.append(valid)
+            continue
+        keep.append(valid[_keep_positions(values[valid], x[valid], n_out, method)])
+    return df.iloc[np.unique(np.concatenate(keep))]
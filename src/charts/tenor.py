@@ -1,22 +1,24 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from .output import save_figure
+from .reduce import reduce_frame
+
+
+def plot(yields: dict[str, pd.Series | None], path: str, width: int = 900, height: int = 500):
+    """One line per market; ``yields`` maps the legend label to its 10y series."""
 
-def plot(us_10y: pd.Series, au_10y: pd.Series, path: str, width: int = 900, height: int = 500):
     plt.figure(figsize=(width / 100, height / 100))
-    df = pd.concat([
-        us_10y.rename("US 10y"),
-        au_10y.rename("AU 10y") if au_10y is not None else None,
-    ], axis=1)
+    df = pd.concat([series.rename(label) for label, series in yields.items() if series is not None], axis=1)
     df = df.dropna(how="all")
     if df.empty:
         plt.title("10-Year Government Bond Yields")
     else:
-        df.resample("M").last().plot(ax=plt.gca())
+        reduce_frame(df.resample("M").last(), width).plot(ax=plt.gca())
         plt.title("10-Year Government Bond Yields")
         plt.ylabel("%")
         plt.xlabel("")
         plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.savefig(path)
+    save_figure(path)
     plt.close()
@@ -0,0 +1,26 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from .output import save_figure
+
+
+def plot(curves: dict[str, tuple[pd.Series, pd.Series]], path: str, width: int = 900, height: int = 500):
+    """Month-end curve per market; ``curves`` maps the label to (latest, prior month) yields by tenor."""
+
+    plt.figure(figsize=(width / 100, height / 100))
+    ax = plt.gca()
+    for label, (latest, prior) in curves.items():
+        if latest.empty:
+            continue
+        line = ax.plot(latest.index, latest.values, marker="o", label=label)[0]
+        if not prior.empty:
+            ax.plot(prior.index, prior.values, marker="o", linestyle="--", alpha=0.5, color=line.get_color(), label=f"{label} (prior month)")
+    plt.title("Government Bond Yield Curves")
+    if ax.lines:
+        ax.legend()
+        plt.ylabel("%")
+        plt.xlabel("Tenor (years)")
+        plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    save_figure(path)
+    plt.close()
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import time
+from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Iterable
 
@@ -12,15 +16,38 @@ matplotlib.use("Agg")
 import pandas as pd
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from .analytics.correlation import cross_asset_panel
+from .analytics.curve import BUTTERFLIES, SLOPES, YieldCurve, spread_name
+from .analytics.history import NOTABLE_MONTHS, NOTABLE_PERCENTILE, HistoryStore, MoveContext, history_contexts
 from .charts import audusd_vs_10y, commodities as commodities_chart, cpi_yoy as cpi_chart
 from .charts import equities_vs_10y, policy_rates as policy_chart, tenor as tenor_chart
-from .llm import generator as llm_generator, prompts, rules
+from . import mailer
+from .charts import correlation_heatmap, output as chart_output, yield_curve as yield_curve_chart
+from .llm import generator as llm_generator, models as llm_models, prompts, rules
+from .llm.scheduler import (
+    LLM as LLM_SOURCE,
+    RULES as RULES_SOURCE,
+    DEFAULT_REPORT_SECONDS,
+    DEFAULT_SECTION_SECONDS,
+    SectionJob,
+    SectionResult,
+    default_workers,
+    generate_sections,
+)
+from .llm.facts import DEFAULT_SECTION_BUDGET, Fact, build_payloads, token_counter
 from .loaders import commods
+from .loaders.asx_manual import asx200_manual_series
+from .loaders.budget import FRESH, MISSING, STALE, VINTAGE, DeadlineLoader, LoadResult, SeriesMemo
+from .loaders.health import first_available
 from .loaders.cpi_au import au_cpi_yoy
-from .loaders.fred import fred_series, yoy
+from .loaders.fred import fred_prefetch, fred_series
 from .loaders.policy import fed_funds, rba_cash
-from .loaders.rba import au_government_10y_series
-from .loaders.yahoo import fetch_series
+from .loaders.rba import au_government_10y_series, rba_curve_frame
+from .loaders.releases import ReleaseCalendar, RefreshState, due_series
+from .loaders.vintage import format_time, get_store as get_vintage_store, parse_as_of
+from .loaders.yahoo import WINDOW_TAIL, fetch_series
+from .pipeline import DEFAULT_MAX_WORKERS, RAN, Pipeline, PipelineError, PipelineReport, Stage
+from .transforms.derived import DerivedSeries
 from .utils.dates import MonthWindow, parse_month
 from .utils.io import (
     build_snapshot,
@@ -30,9 +57,12 @@ from .utils.io import (
     load_yaml,
     percent_change,
     write_excel,
+    write_json,
     write_text,
 )
-from .utils.series import last_value, monthly_last, to_series
+from .utils.memory import peak_rss_mb, record_stage_memory, start_stage_memory
+from .utils.asof import asof_index
+from .utils.series import compact, last_value, monthly_last, to_series
 
 LOGGER = logging.getLogger("monthly_commentary")
 ROOT = Path(__file__).resolve().parents[1]
@@ -41,6 +71,7 @@ PROJECT_ROOT = ROOT
 TEMPLATES = ROOT / "templates"
 CONFIG_PATH = PROJECT_ROOT / "config" / "markets.yml"
 DEFAULT_LOOKBACK_MONTHS = 24
+DEFAULT_POLL_SECONDS = 900.0
 
 
 class SectionMetrics(dict):
@@ -75,9 +106,8 @@ def load_market_config(selected: Iterable[str]) -> list[dict]:
 def _monthly_stats(series: pd.Series, window: MonthWindow) -> tuple[float | None, float | None, float | None]:
     if series is None or series.empty:
         return None, None, None
-    monthly = monthly_last(series)
-    end_val = last_value(monthly, window.end)
-    prev_val = last_value(monthly, window.prev_end)
+    # The daily series' own index answers the month ends, as monthly_last would.
+    prev_val, end_val = asof_index(series).lookup([window.prev_end, window.end])
     change = percent_change(end_val, prev_val)
     return prev_val, end_val, change
 
@@ -97,11 +127,8 @@ def _render_template(context: dict) -> str:
     return template.render(**context)
 
 
-def _try_llm(prompt: str, fallback: str) -> str:
-    generated = llm_generator.run_prompt(prompt)
-    if generated:
-        return generated.strip()
-    return fallback
+def _split_stages(values: list[str]) -> list[str]:
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
 
 
 def _format_return(value: float | None) -> str:
@@ -110,348 +137,1007 @@ def _format_return(value: float | None) -> str:
     return f"{value:.2f}"
 
 
-def run(month: str, markets: str, outputs: str, lookback: int = DEFAULT_LOOKBACK_MONTHS, verbose: bool = False) -> None:
-    _setup_logging(verbose)
-    window = parse_month(month)
-    LOGGER.info("Running monthly commentary for %s", window.label)
-    output_set = {opt.strip() for opt in outputs.split(",") if opt.strip()}
-    selected_markets = list(_get_markets(markets))
-    market_configs = load_market_config(selected_markets)
-    if not market_configs:
-        raise ValueError("No markets selected")
+def _with_fred_fallback(primary, fred_id: str, label: str, provider: str, key: str) -> pd.Series:
+    """Return ``primary()`` or, if that is empty, the FRED ``fred_id`` series."""
 
-    lookback_months = lookback
+    series = first_available(key, [(provider, primary), (f"fred:{fred_id}", partial(fred_series, fred_id))])
+    if series is None:
+        LOGGER.warning("%s unavailable from all sources; marking as None", label)
+        return pd.Series(dtype=float)
+    return to_series(series)
 
-    # Load rates and equities
-    market_data: dict[str, dict[str, pd.Series]] = {}
-    from src.loaders.yahoo import LoaderEmptyError
-    from src.loaders.asx_manual import asx200_manual_series
-    for market in market_configs:
-        code = market["code"]
-        ten_year_ticker = market.get("ten_year_ticker")
-        equity_ticker = market.get("equity_ticker")
-        ten_year_series = None
-        try:
-            ten_year_series = fetch_series(ten_year_ticker, window, lookback_months)
-            if code == "us":
-                ten_year_series = ten_year_series / 10.0
-                ten_year_series.name = "US10Y"
-            elif code == "au" and ten_year_series.dropna().empty:
-                raise LoaderEmptyError("Yahoo AU 10y empty, try RBA fallback")
-        except LoaderEmptyError:
-            if code == "au":
-                LOGGER.info("Yahoo AU 10y unavailable; attempting RBA fallback")
-                ten_year_series = to_series(au_government_10y_series())
-                if ten_year_series is None or ten_year_series.dropna().empty:
-                    LOGGER.warning("RBA AU 10y fallback failed; marking AU 10y as None")
-                    ten_year_series = pd.Series(dtype=float)
-            elif code == "us":
-                LOGGER.info("Yahoo US 10y unavailable; attempting FRED fallback")
-                try:
-                    ten_year_series = to_series(fred_series("GS10"))
-                    ten_year_series = ten_year_series / 10.0
-                    ten_year_series.name = "US10Y"
-                except Exception as exc:
-                    LOGGER.warning(f"FRED US 10y fallback failed: {exc}; marking US 10y as None")
-                    ten_year_series = pd.Series(dtype=float)
-        equity_series = None
-        try:
-            equity_series = fetch_series(equity_ticker, window, lookback_months)
-            if code == "au" and equity_series.dropna().empty:
-                raise LoaderEmptyError("Yahoo ASX 200 empty, try manual fallback")
-        except LoaderEmptyError:
-            if code == "au":
-                LOGGER.info("Yahoo ASX 200 unavailable; attempting manual CSV fallback")
-                equity_series = to_series(asx200_manual_series())
-                if equity_series is None or equity_series.dropna().empty:
-                    LOGGER.warning("Manual ASX 200 fallback failed; marking ASX 200 as None")
-                    equity_series = pd.Series(dtype=float)
-            else:
-                LOGGER.warning(f"Equity series {equity_ticker} failed; marking as None")
-                equity_series = pd.Series(dtype=float)
-        market_data[code] = {
-            "ten_year": to_series(ten_year_series),
-            "equity": to_series(equity_series),
-        }
 
-    # FX and commodities
+# Non-Yahoo sources a market's ten_year_fallback / equity_fallback may name,
+# besides "fred:<series id>".
+FALLBACK_LOADERS = {
+    "rba:f16.1": au_government_10y_series,
+    "manual:asx200": asx200_manual_series,
+}
+
+
+def _fallback(source: str | None) -> list:
+    if not source:
+        return []
+    if source.startswith("fred:"):
+        return [(source, partial(fred_series, source[len("fred:"):]))]
+    if source not in FALLBACK_LOADERS:
+        LOGGER.warning("Unknown fallback source %s; ignoring", source)
+        return []
+    return [(source, FALLBACK_LOADERS[source])]
+
+
+# Table sources a market's ``curve`` may name besides "fred"; each returns
+# every tenor as a (date x tenor years) frame from one download.
+CURVE_SOURCES = {
+    "rba:f16.1": rba_curve_frame,
+}
+
+
+def curve_tenors(market: dict) -> dict[float, str | None]:
+    """Tenor (years) -> FRED id, or ``None`` for table sources, of ``market``'s curve."""
+
+    tenors = (market.get("curve") or {}).get("tenors") or {}
+    if isinstance(tenors, dict):
+        return {float(tenor): str(series_id) for tenor, series_id in tenors.items()}
+    return {float(tenor): None for tenor in tenors}
+
+
+def curve_keys(market: dict) -> dict[str, float]:
+    return {f"{market['code']}_curve_{tenor:g}y": tenor for tenor in curve_tenors(market)}
+
+
+def _curve_column(source: str, tenor: float) -> pd.Series | None:
+    frame = CURVE_SOURCES[source]()
+    if frame is None or tenor not in frame.columns:
+        return None
+    return frame[tenor].dropna()
+
+
+def _load_curve_tenor(market: dict, tenor: float) -> pd.Series:
+    code, source = market["code"], market["curve"].get("source")
+    if source == "fred":
+        series_id = curve_tenors(market)[tenor]
+        candidates = [(f"fred:{series_id}", partial(fred_series, series_id))]
+    elif source in CURVE_SOURCES:
+        candidates = [(source, partial(_curve_column, source, tenor))]
+    else:
+        LOGGER.warning("Unknown curve source %s for %s; ignoring", source, code.upper())
+        candidates = []
+    series = to_series(first_available(f"{code}_curve_{tenor:g}y", candidates))
+    if series.empty:
+        LOGGER.warning("%s %gy yield unavailable; curve metrics will skip that tenor", code.upper(), tenor)
+    return series.rename(f"{code.upper()}{tenor:g}Y")
+
+
+def _candidates(market: dict, kind: str, window: MonthWindow, lookback_months: int) -> list:
+    ticker = market.get(f"{kind}_ticker")
+    candidates = [(f"yahoo:{ticker}", partial(fetch_series, ticker, window, lookback_months))] if ticker else []
+    return candidates + _fallback(market.get(f"{kind}_fallback"))
+
+
+def _load_ten_year(market: dict, window: MonthWindow, lookback_months: int) -> pd.Series:
+    code = market["code"]
+    ten_year_series = to_series(first_available(f"{code}_ten_year", _candidates(market, "ten_year", window, lookback_months)))
+    if ten_year_series.empty:
+        LOGGER.warning("%s 10y unavailable from all sources; marking as None", code.upper())
+    elif market.get("ten_year_divisor"):
+        ten_year_series = ten_year_series / float(market["ten_year_divisor"])
+        ten_year_series.name = f"{code.upper()}10Y"
+    return ten_year_series
+
+
+def _load_equity(market: dict, window: MonthWindow, lookback_months: int) -> pd.Series:
+    code = market["code"]
+    equity_series = to_series(first_available(f"{code}_equity", _candidates(market, "equity", window, lookback_months)))
+    if equity_series.empty:
+        LOGGER.warning(f"Equity series {market.get('equity_ticker')} failed; marking as None")
+    return equity_series
+
+
+def _load_iron_ore(window: MonthWindow, lookback_months: int, commodities_cfg: dict) -> pd.Series | None:
+    iron_series = commods.load_iron_ore(
+        window,
+        lookback_months,
+        commodities_cfg.get("iron_ore_candidates", []),
+        commodities_cfg.get("iron_ore_tradingeconomics_series"),
+    )
+    if iron_series is None or iron_series.dropna().empty:
+        LOGGER.warning("Iron ore series failed; marking as None")
+        return None
+    return to_series(iron_series)
+
+
+def _load_au_cpi() -> pd.Series:
+    au_cpi_yoy_series = au_cpi_yoy()
+    return to_series(au_cpi_yoy_series) if au_cpi_yoy_series is not None else pd.Series(dtype=float)
+
+
+def _newest_loadable(window: MonthWindow) -> datetime:
+    """Latest observation date a load for ``window`` can return (Yahoo stops just past the end)."""
+
+    return (window.end + WINDOW_TAIL - timedelta(days=1)).to_pydatetime()
+
+
+def load_all(
+    market_configs: list[dict],
+    window: MonthWindow,
+    lookback_months: int,
+    deadline: float | None = None,
+    memo: SeriesMemo | None = None,
+    refresh: str = "all",
+    as_of: float | None = None,
+) -> dict[str, LoadResult]:
+    """Load every series for the run, bounded by ``deadline`` seconds if given.
+
+    With ``refresh="due"`` only series with a release since their last fetch
+    (per the ``refresh`` calendar in the config) are downloaded. With
+    ``as_of`` (unix time) nothing is downloaded: every series is rebuilt from
+    the vintage store as it was known then.
+    """
+
+    if as_of is not None:
+        return load_as_of(series_keys(market_configs), as_of)
     config = load_yaml(CONFIG_PATH)
     fx_cfg = config.get("fx", {})
     commodities_cfg = config.get("commodities", {})
-
-    from src.loaders.fred import fred_series
-    # FX
-    try:
-        audusd_series = to_series(fetch_series(fx_cfg.get("audusd"), window, lookback_months))
-        if audusd_series.empty:
-            raise LoaderEmptyError()
-        LOGGER.info("AUDUSD loaded from Yahoo")
-    except LoaderEmptyError:
-        try:
-            # FRED AUD/USD: DEXUSAL (daily)
-            audusd_series = to_series(fred_series("DEXUSAL"))
-            LOGGER.info("AUDUSD loaded from FRED (DEXUSAL)")
-        except Exception as exc:
-            LOGGER.warning(f"AUDUSD FRED fallback failed: {exc}; marking as None")
-            audusd_series = pd.Series(dtype=float)
-    try:
-        dxy_series = to_series(fetch_series(fx_cfg.get("dxy_proxy"), window, lookback_months))
-        if dxy_series.empty:
-            raise LoaderEmptyError()
-        LOGGER.info("UUP/DXY loaded from Yahoo")
-    except LoaderEmptyError:
-        try:
-            # FRED DXY: DTWEXBGS (Broad Dollar Index)
-            dxy_series = to_series(fred_series("DTWEXBGS"))
-            LOGGER.info("DXY loaded from FRED (DTWEXBGS)")
-        except Exception as exc:
-            LOGGER.warning(f"DXY FRED fallback failed: {exc}; marking as None")
-            dxy_series = pd.Series(dtype=float)
-
-    # Commodities
-    try:
-        gold_series = to_series(commods.load_gold(window, lookback_months))
-        if gold_series.empty:
-            raise LoaderEmptyError()
-        LOGGER.info("Gold loaded from Yahoo")
-    except LoaderEmptyError:
-        try:
-            # FRED Gold: GOLDAMGBD228NLBM (London Bullion Market, USD/oz)
-            gold_series = to_series(fred_series("GOLDAMGBD228NLBM"))
-            LOGGER.info("Gold loaded from FRED (GOLDAMGBD228NLBM)")
-        except Exception as exc:
-            LOGGER.warning(f"Gold FRED fallback failed: {exc}; marking as None")
-            gold_series = pd.Series(dtype=float)
-    try:
-        wti_series = to_series(commods.load_wti(window, lookback_months))
-        if wti_series.empty:
-            raise LoaderEmptyError()
-        LOGGER.info("WTI loaded from Yahoo")
-    except LoaderEmptyError:
-        try:
-            # FRED WTI: DCOILWTICO (USD/barrel)
-            wti_series = to_series(fred_series("DCOILWTICO"))
-            LOGGER.info("WTI loaded from FRED (DCOILWTICO)")
-        except Exception as exc:
-            LOGGER.warning(f"WTI FRED fallback failed: {exc}; marking as None")
-            wti_series = pd.Series(dtype=float)
-    try:
-        brent_series = to_series(commods.load_brent(window, lookback_months))
-        if brent_series.empty:
-            raise LoaderEmptyError()
-        LOGGER.info("Brent loaded from Yahoo")
-    except LoaderEmptyError:
-        try:
-            # FRED Brent: DCOILBRENTEU (USD/barrel)
-            brent_series = to_series(fred_series("DCOILBRENTEU"))
-            LOGGER.info("Brent loaded from FRED (DCOILBRENTEU)")
-        except Exception as exc:
-            LOGGER.warning(f"Brent FRED fallback failed: {exc}; marking as None")
-            brent_series = pd.Series(dtype=float)
-    try:
-        iron_series_raw = commods.load_iron_ore(
-            window,
-            lookback_months,
-            commodities_cfg.get("iron_ore_candidates", []),
-            commodities_cfg.get("iron_ore_tradingeconomics_series"),
+    scope = f"{window.label}:{lookback_months}"
+    state = RefreshState()
+    due = None
+    if refresh == "due":
+        due = due_series(
+            series_keys(market_configs),
+            scope,
+            ReleaseCalendar(config.get("refresh")),
+            state,
+            newest=_newest_loadable(window),
         )
-        iron_series = to_series(iron_series_raw) if iron_series_raw is not None else None
-        if iron_series is not None and iron_series.empty:
-            iron_series = None
-    except LoaderEmptyError:
-        LOGGER.warning("Iron ore series failed; marking as None")
-        iron_series = None
+        LOGGER.info("Series due for refresh: %s", ", ".join(sorted(due)) or "none")
 
-    # CPI
-    us_cpi = to_series(fred_series("CPIAUCSL"))
-    us_cpi_yoy = yoy(us_cpi)
-    au_cpi_yoy_series = au_cpi_yoy()
-    au_cpi_series = to_series(au_cpi_yoy_series) if au_cpi_yoy_series is not None else pd.Series(dtype=float)
-
-    # Policy
-    fed_series = to_series(fed_funds())
-    rba_series = to_series(rba_cash())
-
-    # Compute metrics
-    us_rates = market_data.get("us", {})
-    au_rates = market_data.get("au", {})
-    # S&P 500 fallback: FRED 'SP500' (daily close)
-    spx_series = us_rates.get("equity")
-    if spx_series is not None and spx_series.dropna().empty:
-        try:
-            spx_series = to_series(fred_series("SP500"))
-            LOGGER.info("S&P 500 loaded from FRED (SP500)")
-        except Exception as exc:
-            LOGGER.warning(f"S&P 500 FRED fallback failed: {exc}; marking as None")
-            spx_series = pd.Series(dtype=float)
-    us_10y_prev, us_10y_end, us_10y_mom = _monthly_stats(us_rates.get("ten_year"), window)
-    au_10y_prev, au_10y_end, au_10y_mom = _monthly_stats(au_rates.get("ten_year"), window)
-    spx_prev, spx_end, spx_mom = _monthly_stats(spx_series, window)
-    axjo_prev, axjo_end, axjo_mom = _monthly_stats(au_rates.get("equity"), window)
-    audusd_prev, audusd_end, audusd_mom = _monthly_stats(audusd_series, window)
-    dxy_prev, dxy_end, dxy_mom = _monthly_stats(dxy_series, window)
-    gold_prev, gold_end, gold_mom = _monthly_stats(gold_series, window)
-    wti_prev, wti_end, wti_mom = _monthly_stats(wti_series, window)
-    brent_prev, brent_end, brent_mom = _monthly_stats(brent_series, window)
-    iron_prev, iron_end, iron_mom = _monthly_stats(iron_series, window) if iron_series is not None else (None, None, None)
-
-    us_cpi_val = last_value(us_cpi_yoy, window.end)
-    au_cpi_val = last_value(au_cpi_series, window.end)
-    fed_last = last_value(fed_series, window.end)
-    rba_last = last_value(rba_series, window.end)
-
-    # Build paragraphs
-    bond_facts = f"US 10y {format_percent(us_10y_prev)} → {format_percent(us_10y_end)} ({format_percent(us_10y_mom)} MoM); AU 10y {format_percent(au_10y_prev)} → {format_percent(au_10y_end)} ({format_percent(au_10y_mom)} MoM)."
-    equity_facts = f"S&P 500 {format_percent(spx_mom)} MoM; ASX 200 {format_percent(axjo_mom)} MoM."
-    fx_facts = f"AUDUSD {format_percent(audusd_mom)} MoM; UUP {format_percent(dxy_mom)} MoM."
-    cpi_facts = f"US CPI YoY {format_percent(us_cpi_val)}; AU CPI YoY {format_percent(au_cpi_val)}."
-    policy_facts = f"Fed funds {format_percent(fed_last)}; RBA cash {format_percent(rba_last)}."
-    cmdty_facts = f"Gold {format_percent(gold_mom)}; WTI {format_percent(wti_mom)}; Brent {format_percent(brent_mom)}" + (f"; Iron ore {format_percent(iron_mom)}." if iron_mom is not None else ". Iron ore: n/a.")
-
-    bond_para = _try_llm(prompts.BOND_PROMPT.format(facts=bond_facts), rules.bond_summary(us_10y_end, us_10y_mom, au_10y_end, au_10y_mom))
-    equity_para = _try_llm(prompts.EQUITY_PROMPT.format(facts=equity_facts), rules.equity_summary(spx_mom, axjo_mom))
-    fx_para = _try_llm(prompts.FX_PROMPT.format(facts=fx_facts), rules.fx_summary(audusd_mom, dxy_mom))
-    cpi_para = _try_llm(prompts.CPI_PROMPT.format(facts=cpi_facts), rules.cpi_summary(us_cpi_val, au_cpi_val))
-    policy_para = _try_llm(prompts.POLICY_PROMPT.format(facts=policy_facts), rules.policy_summary(fed_last, rba_last))
-    cmdty_para = _try_llm(prompts.CMDTY_PROMPT.format(facts=cmdty_facts), rules.commodity_summary(gold_mom, wti_mom, brent_mom, iron_mom))
+    keys = series_keys(market_configs)
+    # Loads are network-bound, so the pool grows with the market count.
+    workers = min(MAX_LOAD_WORKERS, max(DEFAULT_LOAD_WORKERS, len(keys)))
+    loader = DeadlineLoader(
+        deadline,
+        max_workers=workers,
+        memo=memo,
+        scope=scope,
+        until=pd.Timestamp(_newest_loadable(window)),
+    )
+    # One batched FRED request up front; primaries and fallbacks share its result.
+    fred_keys = fred_ids(market_configs)
+    fred_prefetch([fred_keys[key] for key in keys if key in fred_keys and (due is None or key in due)])
 
-    context = {
-        "month": window.label,
-        "us_10y": SectionMetrics(us_10y_prev, us_10y_end, us_10y_mom),
-        "au_10y": SectionMetrics(au_10y_prev, au_10y_end, au_10y_mom),
-        "us_cpi_yoy": format_percent(us_cpi_val) if us_cpi_val is not None else "n/a",
-        "au_cpi_yoy": format_percent(au_cpi_val) if au_cpi_val is not None else "n/a",
-        "fed_last": format_percent(fed_last) if fed_last is not None else "n/a",
-        "rba_last": format_percent(rba_last) if rba_last is not None else "n/a",
-        "spx_ret": format_percent(spx_mom) if spx_mom is not None else "n/a",
-        "axjo_ret": format_percent(axjo_mom) if axjo_mom is not None else "n/a",
-        "audusd_ret": format_percent(audusd_mom) if audusd_mom is not None else "n/a",
-        "dxy_ret": format_percent(dxy_mom) if dxy_mom is not None else "n/a",
-        "gold_ret": format_percent(gold_mom) if gold_mom is not None else "n/a",
-        "wti_ret": format_percent(wti_mom) if wti_mom is not None else "n/a",
-        "brent_ret": format_percent(brent_mom) if brent_mom is not None else "n/a",
-        "iron_ret": format_percent(iron_mom) if iron_mom is not None else "n/a",
-        "para_bond": bond_para,
-        "para_equities": equity_para,
-        "para_fx": fx_para,
-        "para_cpi": cpi_para,
-        "para_policy": policy_para,
-        "para_cmdty": cmdty_para,
+    def submit(key: str, fn, *args) -> None:
+        if due is not None and key not in due and loader.reuse(key):
+            return
+        loader.submit(key, fn, *args)
+
+    for market in market_configs:
+        code = market["code"]
+        submit(f"{code}_ten_year", _load_ten_year, market, window, lookback_months)
+        submit(f"{code}_equity", _load_equity, market, window, lookback_months)
+        for key, tenor in curve_keys(market).items():
+            submit(key, _load_curve_tenor, market, tenor)
+    for key, ticker, label in [
+        ("audusd", fx_cfg.get("audusd"), "AUDUSD"),
+        ("dxy", fx_cfg.get("dxy_proxy"), "UUP/DXY"),
+    ]:
+        primary = partial(fetch_series, ticker, window, lookback_months)
+        submit(key, _with_fred_fallback, primary, FRED_SERIES[key], label, f"yahoo:{ticker}", key)
+    for key, load, label in [
+        ("gold", commods.load_gold, "Gold"),
+        ("wti", commods.load_wti, "WTI"),
+        ("brent", commods.load_brent, "Brent"),
+    ]:
+        primary = partial(load, window, lookback_months)
+        submit(key, _with_fred_fallback, primary, FRED_SERIES[key], label, f"yahoo:{commodities_cfg.get(key)}", key)
+    submit("iron_ore", _load_iron_ore, window, lookback_months, commodities_cfg)
+    submit("us_cpi", fred_series, FRED_SERIES["us_cpi"])
+    submit("au_cpi_yoy", _load_au_cpi)
+    submit("fed_funds", fed_funds)
+    submit("rba_cash", rba_cash)
+    results = loader.collect()
+    state.record(
+        {
+            key: result.series.index.max().to_pydatetime()
+            for key, result in results.items()
+            if result.status == FRESH and result.reason != "memory"
+        },
+        scope,
+    )
+    return results
+
+
+def load_as_of(keys: list[str], as_of: float) -> dict[str, LoadResult]:
+    store = get_vintage_store()
+    results = {}
+    for key in keys:
+        started = time.monotonic()
+        series, fetched = store.as_of(key, as_of)
+        if series is None or series.empty:
+            LOGGER.warning("%s has no vintage at or before %s", key, format_time(as_of))
+            results[key] = LoadResult(key, None, MISSING, time.monotonic() - started, reason="no vintage")
+        else:
+            results[key] = LoadResult(key, series, VINTAGE, time.monotonic() - started, cached_at=format_time(fetched))
+    return results
+
+
+DEFAULT_LOAD_WORKERS = 8
+MAX_LOAD_WORKERS = 32
+# FRED id for every non-market series that is loaded from, or falls back to,
+# FRED. AUD/USD: DEXUSAL (daily); DXY: DTWEXBGS (Broad Dollar Index);
+# Gold: GOLDAMGBD228NLBM (USD/oz); WTI: DCOILWTICO; Brent: DCOILBRENTEU (USD/barrel).
+FRED_SERIES = {
+    "audusd": "DEXUSAL",
+    "dxy": "DTWEXBGS",
+    "gold": "GOLDAMGBD228NLBM",
+    "wti": "DCOILWTICO",
+    "brent": "DCOILBRENTEU",
+    "us_cpi": "CPIAUCSL",
+    "fed_funds": "FEDFUNDS",
+}
+
+
+def fred_ids(market_configs: list[dict]) -> dict[str, str]:
+    """FRED id per series key, including markets with a ``fred:`` fallback or FRED curve."""
+
+    ids = dict(FRED_SERIES)
+    for market in market_configs:
+        for kind in ("ten_year", "equity"):
+            source = market.get(f"{kind}_fallback") or ""
+            if source.startswith("fred:"):
+                ids[f"{market['code']}_{kind}"] = source[len("fred:"):]
+        if (market.get("curve") or {}).get("source") == "fred":
+            ids.update({key: curve_tenors(market)[tenor] for key, tenor in curve_keys(market).items()})
+    return ids
+
+
+def market_keys(market_configs: list[dict]) -> list[str]:
+    return [f"{m['code']}_{kind}" for m in market_configs for kind in ("ten_year", "equity")]
+
+
+def series_keys(market_configs: list[dict]) -> list[str]:
+    return market_keys(market_configs) + [key for m in market_configs for key in curve_keys(m)] + ["audusd", "dxy", "gold", "wti", "brent", "iron_ore", "us_cpi", "au_cpi_yoy", "fed_funds", "rba_cash"]
+
+
+def mom_series(market_configs: list[dict]) -> list[str]:
+    return market_keys(market_configs) + list(GLOBAL_MOM_SERIES)
+
+
+def ten_year_label(market: dict) -> str:
+    return market.get("ten_year_label", f"{market['code'].upper()} 10y")
+
+
+def equity_label(market: dict) -> str:
+    return market.get("equity_name", f"{market['code'].upper()} equities")
+
+
+def reference_market(market_configs: list[dict]) -> dict:
+    """The market whose 10y the FX and equity charts compare against."""
+
+    code = load_yaml(CONFIG_PATH).get("reference_market")
+    return next((m for m in market_configs if m["code"] == code), market_configs[0])
+
+
+GLOBAL_MOM_SERIES = ("audusd", "dxy", "gold", "wti", "brent", "iron_ore")
+LEVEL_SERIES = ("us_cpi_yoy", "au_cpi_yoy", "fed_funds", "rba_cash")
+SECTIONS = (
+    ("bond", prompts.BOND_PROMPT),
+    ("equities", prompts.EQUITY_PROMPT),
+    ("fx", prompts.FX_PROMPT),
+    ("cpi", prompts.CPI_PROMPT),
+    ("policy", prompts.POLICY_PROMPT),
+    ("cmdty", prompts.CMDTY_PROMPT),
+)
+# (history key, label) per commentary section for historical-context facts and
+# notes; bond and equity entries come from the selected markets.
+HISTORY_SECTIONS = {
+    "fx": (("audusd", "AUD/USD"), ("dxy", "UUP")),
+    "cpi": (("us_cpi_yoy", "US CPI YoY"), ("au_cpi_yoy", "AU CPI YoY")),
+    "policy": (("fed_funds", "Fed funds"), ("rba_cash", "RBA cash rate")),
+    "cmdty": (("gold", "Gold"), ("wti", "WTI"), ("brent", "Brent"), ("iron_ore", "Iron ore")),
+}
+CHART_STAGES = ("tenor", "yield_curve", "equities_vs_10y", "audusd_vs_10y", "cpi_yoy", "policy_rates", "commodities", "correlation_heatmap")
+
+
+def history_sections(market_configs: list[dict]) -> dict[str, tuple[tuple[str, str], ...]]:
+    return {
+        "bond": tuple((f"{m['code']}_ten_year", ten_year_label(m)) for m in market_configs),
+        "equities": tuple((f"{m['code']}_equity", equity_label(m)) for m in market_configs),
+        **HISTORY_SECTIONS,
     }
 
-    report_dir = PROJECT_ROOT / "reports" / window.label
-    charts_dir = report_dir / "charts"
-    snapshots_dir = report_dir / "snapshots"
-    ensure_directory(report_dir)
-    ensure_directory(charts_dir)
-    ensure_directory(snapshots_dir)
 
-    # Render markdown
+def chart_series(market_configs: list[dict]) -> dict[str, tuple[str, ...]]:
+    """Series each chart draws, so watch mode only redraws charts whose data changed."""
+
+    reference = reference_market(market_configs)["code"]
+    return {
+        "tenor": tuple(f"{m['code']}_ten_year" for m in market_configs),
+        "yield_curve": tuple(key for m in market_configs for key in curve_keys(m)),
+        "equities_vs_10y": (f"{reference}_equity", f"{reference}_ten_year"),
+        "audusd_vs_10y": ("audusd", f"{reference}_ten_year"),
+        "cpi_yoy": ("us_cpi", "au_cpi_yoy"),
+        "policy_rates": ("fed_funds", "rba_cash"),
+        "commodities": ("gold", "wti", "brent", "iron_ore"),
+        "correlation_heatmap": tuple(mom_series(market_configs)),
+    }
+
+
+def _empty_series() -> pd.Series:
+    return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+
+
+def _stage_load(ctx: dict) -> dict:
+    # Load every series concurrently, serving cached copies past the deadline
+    loaded = load_all(
+        ctx["market_configs"],
+        ctx["window"],
+        ctx["lookback"],
+        ctx["deadline"],
+        ctx.get("memo"),
+        ctx.get("refresh", "all"),
+        as_of=ctx.get("as_of"),
+    )
+    if ctx.get("low_memory"):
+        # Every later stage works from month-end values; drop the daily data now.
+        for result in loaded.values():
+            result.series = compact(result.series)
+    data = {key: result.series if result.series is not None else _empty_series() for key, result in loaded.items()}
+    data["iron_ore"] = loaded["iron_ore"].series
+    # Derived expressions may name markets not selected for this run; those read as empty.
+    base = {key: _empty_series() for key in series_keys(load_market_config([]))}
+    derived = DerivedSeries(load_yaml(CONFIG_PATH).get("derived"), {**base, **data})
+    data.pop("us_cpi")
+    data["us_cpi_yoy"] = derived["us_cpi_yoy"]
+    return {"loaded": loaded, "data": data, "derived": derived}
+
+
+def _market_stage(market: dict):
+    """Stats and historical context for one market's series."""
+
+    code = market["code"]
+    keys = (f"{code}_ten_year", f"{code}_equity")
+
+    def _stage(ctx: dict) -> dict:
+        data, window = ctx["data"], ctx["window"]
+        return {
+            f"market:{code}": {
+                "stats": {key: _monthly_stats(data.get(key), window) for key in keys},
+                "history": history_contexts({key: data.get(key) for key in keys}, window.end, ctx.get("history_store")),
+            }
+        }
+
+    return _stage
+
+
+def _market_results(ctx: dict, part: str) -> dict:
+    return {key: value for m in ctx["market_configs"] for key, value in ctx[f"market:{m['code']}"][part].items()}
+
+
+def _stage_curves(ctx: dict) -> dict:
+    data = ctx["data"]
+    curves = {}
+    for m in ctx["market_configs"]:
+        if curve_tenors(m):
+            curve = YieldCurve.from_series({tenor: data.get(key) for key, tenor in curve_keys(m).items()})
+            curve.metrics()
+            curves[m["code"]] = curve
+    return {"curves": curves}
+
+
+def _curve_at(ctx: dict) -> list[tuple[dict, dict[str, float | None]]]:
+    """(market, metrics at the window end) for each market with curve data."""
+
+    curves = ctx["curves"]
+    return [
+        (m, curves[m["code"]].at(ctx["window"].end))
+        for m in ctx["market_configs"]
+        if m["code"] in curves and not curves[m["code"]].empty
+    ]
+
+
+def _curve_facts(label: str, metrics: dict[str, float | None]) -> list[Fact]:
+    facts = []
+    for name, priority in (("2s10s", 0), ("2s10s MoM", 0), ("2s5s10s", 1), ("5s30s", 1), ("level MoM", 2)):
+        if metrics[name] is not None:
+            facts.append(Fact(f"{label} {name}", round(metrics[name]), unit=" bp", priority=priority))
+    return facts
+
+
+def _stage_stats(ctx: dict) -> dict:
+    data, window = ctx["data"], ctx["window"]
+    stats = {**_market_results(ctx, "stats"), **{key: _monthly_stats(data.get(key), window) for key in GLOBAL_MOM_SERIES}}
+    levels = {key: last_value(data.get(key), window.end) for key in LEVEL_SERIES}
+    return {"stats": stats, "levels": levels}
+
+
+def _stage_panel(ctx: dict) -> dict:
+    data = ctx["data"]
+    markets = ctx["market_configs"]
+    panel = cross_asset_panel(
+        {
+            **{ten_year_label(m): data.get(f"{m['code']}_ten_year") for m in markets},
+            **{equity_label(m): data.get(f"{m['code']}_equity") for m in markets},
+            "AUDUSD": data.get("audusd"),
+            "UUP": data.get("dxy"),
+            "Gold": data.get("gold"),
+            "WTI": data.get("wti"),
+            "Brent": data.get("brent"),
+            "Iron Ore": data.get("iron_ore"),
+        },
+        end=ctx["window"].end,
+    )
+    return {"panel": panel}
+
+
+def _stage_history(ctx: dict) -> dict:
+    data = ctx["data"]
+    contexts = history_contexts({key: data.get(key) for key in GLOBAL_MOM_SERIES + LEVEL_SERIES}, ctx["window"].end, ctx.get("history_store"))
+    return {"history": {**_market_results(ctx, "history"), **contexts}}
+
+
+def _history_facts(context: MoveContext | None, label: str, moves: bool) -> list[Fact]:
+    if context is None:
+        return []
+    facts = []
+    if moves and context.percentile is not None and context.percentile >= NOTABLE_PERCENTILE:
+        facts.append(Fact(f"{label} move percentile (10y)", round(context.percentile), unit="", priority=2))
+        if context.largest_since is not None:
+            months = (context.date.to_period("M") - context.largest_since.to_period("M")).n
+            facts.append(Fact(f"{label} largest move in", months, unit=" months", priority=2))
+    if context.high_months >= NOTABLE_MONTHS:
+        facts.append(Fact(f"{label} high in", context.high_months, unit=" months", priority=2))
+    elif context.low_months >= NOTABLE_MONTHS:
+        facts.append(Fact(f"{label} low in", context.low_months, unit=" months", priority=2))
+    return facts
+
+
+def _history_note(context: MoveContext | None, label: str, moves: bool) -> str:
+    if context is None:
+        return ""
+    return rules.history_note(
+        label,
+        percentile=context.percentile if moves else None,
+        largest_since=context.largest_since.strftime("%B %Y") if moves and context.largest_since is not None else None,
+        record=moves and context.record,
+        high_months=context.high_months,
+        low_months=context.low_months,
+    )
+
+
+def _pair_facts(panel, pairs: list[tuple[str, str]]) -> list[Fact]:
+    facts = []
+    for a, b in pairs:
+        corr, _ = panel.pair(a, b)
+        if corr is not None:
+            facts.append(Fact(f"{panel.window}m corr {a}/{b}", corr, unit="", priority=2))
+    return facts
+
+
+def _stage_facts(ctx: dict) -> dict:
+    stats, levels, panel = ctx["stats"], ctx["levels"], ctx["panel"]
+    markets = ctx["market_configs"]
+    reference = reference_market(markets)
+    bond_facts, equity_facts, equity_pairs = [], [], []
+    for m in markets:
+        prev, end, mom = stats[f"{m['code']}_ten_year"]
+        label = ten_year_label(m)
+        bond_facts += [Fact(label, end), Fact(f"{label} MoM", mom), Fact(f"{label} prior", prev, priority=1)]
+        equity_facts.append(Fact(f"{equity_label(m)} MoM", stats[f"{m['code']}_equity"][2]))
+        equity_pairs.append((equity_label(m), label))
+    equity_pairs += [(equity_label(m), equity_label(markets[0])) for m in markets[1:]]
+    curve_metrics = _curve_at(ctx)
+    for m, metrics in curve_metrics:
+        bond_facts += _curve_facts(f"{m['code'].upper()} curve", metrics)
+    audusd_mom, dxy_mom = stats["audusd"][2], stats["dxy"][2]
+    gold_mom, wti_mom, brent_mom, iron_mom = (stats[key][2] for key in ("gold", "wti", "brent", "iron_ore"))
+    us_cpi_val, au_cpi_val = levels["us_cpi_yoy"], levels["au_cpi_yoy"]
+    fed_last, rba_last = levels["fed_funds"], levels["rba_cash"]
+
+    sections = {
+        "bond": bond_facts,
+        "equities": equity_facts + _pair_facts(panel, equity_pairs),
+        "fx": [Fact("AUDUSD MoM", audusd_mom), Fact("UUP MoM", dxy_mom)]
+        + _pair_facts(panel, [("AUDUSD", ten_year_label(reference)), ("AUDUSD", "Iron Ore"), ("AUDUSD", "UUP")]),
+        "cpi": [Fact("US CPI YoY", us_cpi_val), Fact("AU CPI YoY", au_cpi_val)],
+        "policy": [Fact("Fed funds", fed_last), Fact("RBA cash", rba_last)],
+        "cmdty": [
+            Fact("Gold MoM", gold_mom),
+            Fact("WTI MoM", wti_mom),
+            Fact("Brent MoM", brent_mom),
+            Fact("Iron ore MoM", iron_mom, priority=1),
+        ],
+    }
+    history = ctx["history"]
+    notes: dict[str, list[str]] = {}
+    for section, entries in history_sections(markets).items():
+        for key, label in entries:
+            moves = key not in LEVEL_SERIES
+            sections[section] += _history_facts(history.get(key), label, moves)
+            note = _history_note(history.get(key), label, moves)
+            if note:
+                notes.setdefault(section, []).append(note)
+    model_path = llm_generator.default_model_path()
+    count_tokens = token_counter(str(model_path) if model_path else None)
+    facts = build_payloads(sections, DEFAULT_SECTION_BUDGET, count_tokens)
+    rule_paragraphs = {
+        "bond": rules.bond_summary(
+            [(m.get("adjective", m["code"].upper()), *stats[f"{m['code']}_ten_year"][1:]) for m in markets]
+        ),
+        "equities": rules.equity_summary([(equity_label(m), stats[f"{m['code']}_equity"][2]) for m in markets]),
+        "fx": rules.fx_summary(audusd_mom, dxy_mom),
+        "cpi": rules.cpi_summary(us_cpi_val, au_cpi_val),
+        "policy": rules.policy_summary(fed_last, rba_last),
+        "cmdty": rules.commodity_summary(gold_mom, wti_mom, brent_mom, iron_mom),
+    }
+    curve_text = rules.curve_summary(
+        [(m.get("adjective", m["code"].upper()), metrics["2s10s"], metrics["2s10s MoM"]) for m, metrics in curve_metrics]
+    )
+    if curve_text:
+        rule_paragraphs["bond"] = " ".join([rule_paragraphs["bond"], curve_text])
+    for section, section_notes in notes.items():
+        rule_paragraphs[section] = " ".join([rule_paragraphs[section], *section_notes])
+    history_notes = [note for section, _ in SECTIONS for note in notes.get(section, [])]
+    return {"facts": facts, "fact_items": sections, "rule_paragraphs": rule_paragraphs, "history_notes": history_notes}
+
+
+def _stage_llm(ctx: dict) -> dict:
+    start = time.monotonic()
+    facts, fallbacks = ctx["facts"], ctx["rule_paragraphs"]
+    store = ctx["report_dir"] / "paragraphs.json"
+    previous = {}
+    if ctx.get("refresh") == "due" and store.exists():
+        # Incremental runs keep LLM paragraphs whose facts have not changed.
+        previous = {
+            name: SectionResult(name, item["text"], item["source"], reason="unchanged facts")
+            for name, item in json.loads(store.read_text()).items()
+            if item.get("facts") == facts.get(name) and item.get("source") == LLM_SOURCE
+        }
+    budget_s = ctx.get("llm_budget") or DEFAULT_SECTION_SECONDS
+    jobs = [
+        SectionJob(
+            name,
+            template.format(facts=facts[name]),
+            fallbacks[name],
+            max_tokens=prompts.SECTION_MAX_TOKENS.get(name, prompts.DEFAULT_MAX_TOKENS),
+            budget_s=budget_s,
+        )
+        for name, template in SECTIONS
+        if name not in previous
+    ]
+    # The report cap includes model selection (a first run on a new machine benchmarks).
+    cap = ctx.get("llm_deadline") or DEFAULT_REPORT_SECONDS
+    selection = None
+    if jobs:
+        # The largest section cap bounds every section's decode time.
+        workers = ctx.get("llm_workers") or default_workers(len(jobs))
+        selection = llm_models.get_registry().select(
+            budget_s,
+            max(job.max_tokens for job in jobs),
+            workers,
+            name=ctx.get("llm_model"),
+            deadline_s=cap - (time.monotonic() - start),
+        )
+    remaining = cap - (time.monotonic() - start)
+    if selection is not None and selection.candidate is None:
+        generated = {job.name: SectionResult(job.name, job.fallback, RULES_SOURCE, reason=selection.reason) for job in jobs}
+    elif remaining <= 0:
+        generated = {job.name: SectionResult(job.name, job.fallback, RULES_SOURCE, reason="report LLM time cap reached") for job in jobs}
+    else:
+        generated = generate_sections(
+            jobs, workers=ctx.get("llm_workers"), model_path=selection and selection.path, deadline_s=remaining
+        )
+    results = {**previous, **generated}
+    results = {name: results[name] for name, _ in SECTIONS}
+    write_json(store, {name: {"facts": facts[name], "text": r.text, "source": r.source} for name, r in results.items()})
+    return {
+        "paragraphs": {name: result.text for name, result in results.items()},
+        "llm_sections": {
+            name: {
+                "source": r.source,
+                "seconds": None if r.seconds is None else round(r.seconds, 3),
+                "attempts": r.attempts,
+                "reason": r.reason,
+            }
+            for name, r in results.items()
+        },
+        "llm_model": None if selection is None else selection.as_metrics(),
+    }
+
+
+def _stage_rules_only(ctx: dict) -> dict:
+    return {"paragraphs": dict(ctx["rule_paragraphs"])}
+
+
+def _stage_markdown(ctx: dict) -> dict:
+    stats, levels, paragraphs = ctx["stats"], ctx["levels"], ctx["paragraphs"]
+    stale = {key: result for key, result in ctx["loaded"].items() if result.status == STALE}
+
+    def _ret(key: str) -> str:
+        mom = stats[key][2]
+        return format_percent(mom) if mom is not None else "n/a"
+
+    def _level(key: str) -> str:
+        value = levels[key]
+        return format_percent(value) if value is not None else "n/a"
+
+    def _bp(value: float | None, signed: bool = False) -> str:
+        if value is None:
+            return "n/a"
+        return f"{value:+.0f}" if signed else f"{value:.0f}"
+
+    context = {
+        "month": ctx["window"].label,
+        "bonds": [(ten_year_label(m), SectionMetrics(*stats[f"{m['code']}_ten_year"])) for m in ctx["market_configs"]],
+        "curves": [
+            (
+                m.get("adjective", m["code"].upper()),
+                {"slope": _bp(metrics["2s10s"]), "slope_change": _bp(metrics["2s10s MoM"], signed=True), "fly": _bp(metrics["2s5s10s"])},
+            )
+            for m, metrics in _curve_at(ctx)
+        ],
+        "equities": [(equity_label(m), _ret(f"{m['code']}_equity")) for m in ctx["market_configs"]],
+        "us_cpi_yoy": _level("us_cpi_yoy"),
+        "au_cpi_yoy": _level("au_cpi_yoy"),
+        "fed_last": _level("fed_funds"),
+        "rba_last": _level("rba_cash"),
+        "audusd_ret": _ret("audusd"),
+        "dxy_ret": _ret("dxy"),
+        "gold_ret": _ret("gold"),
+        "wti_ret": _ret("wti"),
+        "brent_ret": _ret("brent"),
+        "iron_ret": _ret("iron_ore"),
+        "stale_series": [
+            f"{key} (cached {result.cached_at[:10]})" if result.cached_at else key
+            for key, result in sorted(stale.items())
+        ],
+        "history_notes": ctx["history_notes"],
+    }
+    context.update({f"para_{name}": text for name, text in paragraphs.items()})
     md_content = _render_template(context)
-    if "md" in output_set:
-        write_text(report_dir / "monthly_commentary.md", md_content)
+    write_text(ctx["report_dir"] / "monthly_commentary.md", md_content)
+    return {"markdown": md_content}
+
 
-    # Excel workbook
+def _df_diag(name, df):
+    print(f"[DIAG] {name}: shape={df.shape}")
+    print(df.head())
+    print(df.tail())
+    if df.empty or df.isna().all().all():
+        print(f"[WARNING] {name} is empty or all-NaN!")
 
-    def _df_diag(name, df):
-        print(f"[DIAG] {name}: shape={df.shape}")
-        print(df.head())
-        print(df.tail())
-        if df.empty or df.isna().all().all():
-            print(f"[WARNING] {name} is empty or all-NaN!")
 
+def _stage_excel(ctx: dict) -> dict:
+    data, panel, paragraphs = ctx["data"], ctx["panel"], ctx["paragraphs"]
+    iron_series = data.get("iron_ore")
     sheets: dict[str, pd.DataFrame] = {}
-    rates_df = pd.concat([
-        monthly_last(market_data["us"]["ten_year"]).rename("US 10y"),
-        monthly_last(market_data["au"].get("ten_year")).rename("AU 10y") if "au" in market_data else None,
-    ], axis=1)
+    markets = ctx["market_configs"]
+    rates_df = pd.concat([monthly_last(data[f"{m['code']}_ten_year"]).rename(ten_year_label(m)) for m in markets], axis=1)
     _df_diag("Rates", rates_df)
     sheets["Rates"] = rates_df
 
+    au_cpi_series = data["au_cpi_yoy"]
     cpi_df = pd.concat([
-        us_cpi_yoy.rename("US CPI YoY %"),
+        data["us_cpi_yoy"].rename("US CPI YoY %"),
         au_cpi_series.rename("AU CPI YoY %") if not au_cpi_series.empty else None,
     ], axis=1)
     _df_diag("CPI", cpi_df)
     sheets["CPI"] = cpi_df
 
     policy_df = pd.concat([
-        fed_series.rename("Fed Funds %"),
-        rba_series.rename("RBA Cash %"),
+        data["fed_funds"].rename("Fed Funds %"),
+        data["rba_cash"].rename("RBA Cash %"),
     ], axis=1)
     _df_diag("Policy", policy_df)
     sheets["Policy"] = policy_df
 
-    equities_df = pd.concat([
-        monthly_last(market_data["us"]["equity"]).rename("S&P 500"),
-        monthly_last(market_data["au"].get("equity")).rename("ASX 200") if "au" in market_data else None,
-    ], axis=1)
+    equities_df = pd.concat([monthly_last(data[f"{m['code']}_equity"]).rename(equity_label(m)) for m in markets], axis=1)
     _df_diag("Equities", equities_df)
     sheets["Equities"] = equities_df
 
     fx_df = pd.concat([
-        monthly_last(audusd_series).rename("AUDUSD"),
-        monthly_last(dxy_series).rename("UUP"),
+        monthly_last(data["audusd"]).rename("AUDUSD"),
+        monthly_last(data["dxy"]).rename("UUP"),
     ], axis=1)
     _df_diag("FX", fx_df)
     sheets["FX"] = fx_df
 
     commodities_df = pd.concat([
-        monthly_last(gold_series).rename("Gold"),
-        monthly_last(wti_series).rename("WTI"),
-        monthly_last(brent_series).rename("Brent"),
+        monthly_last(data["gold"]).rename("Gold"),
+        monthly_last(data["wti"]).rename("WTI"),
+        monthly_last(data["brent"]).rename("Brent"),
         monthly_last(iron_series).rename("Iron Ore") if iron_series is not None else None,
     ], axis=1)
     _df_diag("Commodities", commodities_df)
     sheets["Commodities"] = commodities_df
 
-    workbook_commentary = "\n".join([
-        context["para_bond"],
-        context["para_cpi"],
-        context["para_policy"],
-        context["para_equities"],
-        context["para_fx"],
-        context["para_cmdty"],
-    ])
-    if "xlsx" in output_set:
-        write_excel(report_dir / "dashboard.xlsx", sheets, workbook_commentary)
-
-    # Charts
-    tenor_chart.plot(market_data["us"]["ten_year"], market_data.get("au", {}).get("ten_year"), str(charts_dir / "tenor_10y_trend.png"))
-    equities_vs_10y.plot(
-        monthly_last(market_data["us"]["equity"]).pct_change() * 100.0,
-        monthly_last(market_data["us"]["ten_year"]).pct_change() * 100.0,
-        str(charts_dir / "equities_vs_10y.png"),
-    )
-    audusd_vs_10y.plot(
-        monthly_last(audusd_series).pct_change() * 100.0,
-        monthly_last(market_data["us"]["ten_year"]).pct_change() * 100.0,
-        str(charts_dir / "audusd_vs_10y.png"),
-    )
-    cpi_chart.plot(us_cpi_yoy, au_cpi_series, str(charts_dir / "cpi_yoy.png"))
-    policy_chart.plot(fed_series, rba_series, str(charts_dir / "policy_rates.png"))
-    commodities_chart.plot(gold_series, wti_series, brent_series, iron_series, str(charts_dir / "commodities.png"))
-
-    # Snapshots
-    snapshot_series = {
-        "us_10y": market_data["us"]["ten_year"],
-        "au_10y": market_data.get("au", {}).get("ten_year"),
-        "spx": market_data["us"]["equity"],
-        "axjo": market_data.get("au", {}).get("equity"),
-        "audusd": audusd_series,
-        "uup": dxy_series,
-        "gold": gold_series,
-        "wti": wti_series,
-        "brent": brent_series,
-        "ironore": iron_series,
-        "us_cpi_yoy": us_cpi_yoy,
-        "au_cpi_yoy": au_cpi_series,
-        "fed_funds": fed_series,
-        "rba_cash": rba_series,
+    curves = ctx["curves"]
+    curve_frames = [curves[m["code"]].frame().add_prefix(f"{m['code'].upper()} ") for m in markets if m["code"] in curves]
+    curves_df = pd.concat(curve_frames, axis=1) if curve_frames else pd.DataFrame()
+    if not curves_df.empty:
+        _df_diag("Curves", curves_df)
+        sheets["Curves"] = curves_df
+        metric_frames = [curves[m["code"]].metrics().add_prefix(f"{m['code'].upper()} ") for m in markets if m["code"] in curves]
+        sheets["Curve Metrics"] = pd.concat(metric_frames, axis=1).dropna(axis=1, how="all")
+
+    published = _published(ctx["derived"], data)
+    derived_df = pd.concat([monthly_last(series) for series in published.values()], axis=1) if published else pd.DataFrame()
+    if not derived_df.empty:
+        _df_diag("Derived", derived_df)
+        sheets["Derived"] = derived_df
+
+    sheets["Correlations"] = panel.latest_corr()
+    sheets["Betas"] = panel.latest_beta()
+    sheets["Realised Vol"] = panel.vol_frame()
+
+    workbook_commentary = "\n".join(paragraphs[name] for name in ("bond", "cpi", "policy", "equities", "fx", "cmdty"))
+    path = ctx["report_dir"] / "dashboard.xlsx"
+    write_excel(path, sheets, workbook_commentary, streaming=bool(ctx.get("low_memory")))
+    return {"workbook": path}
+
+
+def _chart_stage(name: str):
+    def _stage(ctx: dict) -> dict:
+        data, derived, charts_dir = ctx["data"], ctx["derived"], ctx["charts_dir"]
+        reference = ctx["reference_market"]
+        ref_10y_mom = derived.expression(f"mom({reference['code']}_ten_year)")
+        if name == "tenor":
+            path = chart_output.chart_path(charts_dir, "tenor_10y_trend")
+            tenor_chart.plot({ten_year_label(m): data[f"{m['code']}_ten_year"] for m in ctx["market_configs"]}, str(path))
+        elif name == "yield_curve":
+            path = chart_output.chart_path(charts_dir, "yield_curve")
+            window, curves = ctx["window"], ctx["curves"]
+            yield_curve_chart.plot(
+                {
+                    m.get("adjective", m["code"].upper()): (curves[m["code"]].curve_at(window.end), curves[m["code"]].curve_at(window.prev_end))
+                    for m in ctx["market_configs"]
+                    if m["code"] in curves
+                },
+                str(path),
+            )
+        elif name == "equities_vs_10y":
+            path = chart_output.chart_path(charts_dir, "equities_vs_10y")
+            equity_mom = derived.expression(f"mom({reference['code']}_equity)")
+            equities_vs_10y.plot(equity_mom, ref_10y_mom, str(path), equity_label(reference), ten_year_label(reference))
+        elif name == "audusd_vs_10y":
+            path = chart_output.chart_path(charts_dir, "audusd_vs_10y")
+            audusd_vs_10y.plot(derived["audusd_mom"], ref_10y_mom, str(path), ten_year_label(reference))
+        elif name == "cpi_yoy":
+            path = chart_output.chart_path(charts_dir, "cpi_yoy")
+            cpi_chart.plot(data["us_cpi_yoy"], data["au_cpi_yoy"], str(path))
+        elif name == "policy_rates":
+            path = chart_output.chart_path(charts_dir, "policy_rates")
+            policy_chart.plot(data["fed_funds"], data["rba_cash"], str(path))
+        elif name == "commodities":
+            path = chart_output.chart_path(charts_dir, "commodities")
+            commodities_chart.plot(data["gold"], data["wti"], data["brent"], data.get("iron_ore"), str(path))
+        else:
+            path = chart_output.chart_path(charts_dir, "correlation_heatmap")
+            correlation_heatmap.plot(ctx["panel"].latest_corr(), str(path))
+        return {f"chart:{name}": path}
+
+    return _stage
+
+
+def _published(derived: DerivedSeries, data: dict) -> dict[str, pd.Series]:
+    """Derived series not already part of ``data`` (snapshots and the Derived sheet)."""
+
+    return {name: derived[name] for name in derived.order() if name not in data}
+
+
+def _stage_snapshots(ctx: dict) -> dict:
+    data = ctx["data"]
+    snapshot_series = {}
+    for m in ctx["market_configs"]:
+        code = m["code"]
+        snapshot_series[f"{code}_10y"] = data[f"{code}_ten_year"]
+        snapshot_series[m.get("equity_snapshot", f"{code}_equity")] = data[f"{code}_equity"]
+    snapshot_series |= {
+        "audusd": data["audusd"],
+        "uup": data["dxy"],
+        "gold": data["gold"],
+        "wti": data["wti"],
+        "brent": data["brent"],
+        "ironore": data.get("iron_ore"),
+        "us_cpi_yoy": data["us_cpi_yoy"],
+        "au_cpi_yoy": data["au_cpi_yoy"],
+        "fed_funds": data["fed_funds"],
+        "rba_cash": data["rba_cash"],
     }
-    build_snapshot(_series_to_snapshot_map(snapshot_series), snapshots_dir)
+    for code, curve in ctx["curves"].items():
+        metrics = curve.metrics()
+        for name in [spread_name(*pair) for pair in SLOPES] + [spread_name(*fly) for fly in BUTTERFLIES]:
+            if metrics[name].notna().any():
+                snapshot_series[f"{code}_curve_{name}"] = metrics[name].dropna()
+    snapshot_series.update(_published(ctx["derived"], data))
+    build_snapshot(_series_to_snapshot_map(snapshot_series), ctx["snapshots_dir"])
+    return {"snapshots": ctx["snapshots_dir"]}
+
+
+def _stage_email(ctx: dict) -> dict:
+    return {"distribution": mailer.distribute(ctx["report_dir"], ctx["window"].label).as_metrics()}
+
+
+def build_pipeline(market_configs: list[dict], outputs: Iterable[str] = ("md", "xlsx")) -> Pipeline:
+    # One stage per market, so per-market stats and history run concurrently.
+    market_outputs = tuple(f"market:{m['code']}" for m in market_configs)
+    stages = [
+        Stage("load", _stage_load, ("market_configs", "window"), ("loaded", "data", "derived")),
+        *(Stage(f"market.{m['code']}", _market_stage(m), ("data",), (f"market:{m['code']}",)) for m in market_configs),
+        Stage("curves", _stage_curves, ("data",), ("curves",)),
+        Stage("stats", _stage_stats, ("data", *market_outputs), ("stats", "levels")),
+        Stage("panel", _stage_panel, ("data",), ("panel",)),
+        Stage("history", _stage_history, ("data", *market_outputs), ("history",)),
+        Stage("facts", _stage_facts, ("stats", "levels", "panel", "history", "curves"), ("facts", "fact_items", "rule_paragraphs", "history_notes")),
+        Stage("llm", _stage_llm, ("facts", "rule_paragraphs"), ("paragraphs", "llm_sections", "llm_model"), fallback=_stage_rules_only),
+        Stage("md", _stage_markdown, ("stats", "levels", "curves", "paragraphs", "loaded", "history_notes"), ("markdown",)),
+        Stage("xlsx", _stage_excel, ("data", "derived", "curves", "panel", "paragraphs"), ("workbook",)),
+        Stage("snapshots", _stage_snapshots, ("data", "derived", "curves"), ("snapshots",)),
+    ]
+    for name in CHART_STAGES:
+        inputs = {"correlation_heatmap": ("data", "panel"), "yield_curve": ("data", "curves")}.get(name, ("data", "derived"))
+        # pyplot keeps global figure state, so charts share one resource slot.
+        stages.append(Stage(f"charts.{name}", _chart_stage(name), inputs, (f"chart:{name}",), resource="pyplot"))
+    # Distribution waits for the outputs selected for this run and the charts; it only runs with --email.
+    documents = {"md": "markdown", "xlsx": "workbook"}
+    pack = (*(documents[name] for name in documents if name in outputs), *(f"chart:{name}" for name in CHART_STAGES))
+    stages.append(Stage("email", _stage_email, pack, ("distribution",)))
+    return Pipeline(stages)
+
+
+def run(
+    month: str,
+    markets: str,
+    outputs: str,
+    lookback: int = DEFAULT_LOOKBACK_MONTHS,
+    verbose: bool = False,
+    chart_format: str = "png",
+    chart_max_kb: int | None = None,
+    deadline: float | None = None,
+    only: Iterable[str] = (),
+    skip: Iterable[str] = (),
+    workers: int = DEFAULT_MAX_WORKERS,
+    llm_workers: int | None = None,
+    llm_budget: float | None = None,
+    llm_model: str | None = None,
+    llm_deadline: float | None = None,
+    memo: SeriesMemo | None = None,
+    refresh: str = "all",
+    reports_root: Path | None = None,
+    low_memory: bool = False,
+    market_configs: list[dict] | None = None,
+    as_of: str | None = None,
+    email: bool = False,
+) -> PipelineReport:
+    """Build the report for ``month``.
+
+    ``market_configs`` replaces the configured markets named by ``markets``
+    (the synthetic benchmark passes its own). ``as_of`` (a date, a time or
+    ``published``) rebuilds the report from the vintage store as the data was
+    known then, into ``reports/as-of/<time>/<month>/`` unless ``reports_root``
+    is given.
+    """
+
+    _setup_logging(verbose)
+    chart_output.configure(fmt=chart_format, max_bytes=chart_max_kb * 1024 if chart_max_kb else None)
+    window = parse_month(month)
+    LOGGER.info("Running monthly commentary for %s", window.label)
+    output_set = {opt.strip() for opt in outputs.split(",") if opt.strip()}
+    if market_configs is None:
+        market_configs = load_market_config(list(_get_markets(markets)))
+    if not market_configs:
+        raise ValueError("No markets selected")
+
+    cutoff = None
+    if as_of:
+        cutoff = resolve_as_of(as_of, (reports_root or PROJECT_ROOT / "reports") / window.label)
+        LOGGER.info("Rebuilding from data as known at %s", format_time(cutoff))
+        reports_root = reports_root or PROJECT_ROOT / "reports" / "as-of" / time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(cutoff))
+    report_dir = (reports_root or PROJECT_ROOT / "reports") / window.label
+    charts_dir = report_dir / "charts"
+    snapshots_dir = report_dir / "snapshots"
+    ensure_directory(report_dir)
+    ensure_directory(charts_dir)
+    ensure_directory(snapshots_dir)
+
+    context = {
+        "window": window,
+        "market_configs": market_configs,
+        "reference_market": reference_market(market_configs),
+        "lookback": lookback,
+        "deadline": deadline,
+        "report_dir": report_dir,
+        "charts_dir": charts_dir,
+        "snapshots_dir": snapshots_dir,
+        "llm_workers": llm_workers,
+        "llm_budget": llm_budget,
+        "llm_model": llm_model,
+        "llm_deadline": llm_deadline,
+        "memo": memo,
+        "refresh": refresh,
+        "low_memory": low_memory,
+        "as_of": cutoff,
+    }
+    if cutoff is not None:
+        # History stays as on disk; the vintage data is merged in memory only.
+        context["history_store"] = HistoryStore(read_only=True)
+    skip = list(skip) + [name for name in ("md", "xlsx") if name not in output_set] + ([] if email else ["email"])
+    pipeline = build_pipeline(market_configs, output_set)
+    pipeline.before_stage.append(start_stage_memory)
+    pipeline.after_stage.append(record_stage_memory)
+    try:
+        report = pipeline.run(context, only=only, skip=skip, max_workers=workers)
+    except PipelineError as exc:
+        if email:
+            raise PipelineError(f"{exc}; the pack was not emailed") from exc
+        raise
+
+    loaded = context.get("loaded", {})
+    write_json(report_dir / "run_metrics.json", {
+        "month": window.label,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "as_of": None if cutoff is None else format_time(cutoff),
+        "deadline_seconds": deadline,
+        "low_memory": low_memory,
+        "peak_rss_mb": peak_rss_mb(),
+        "series": {key: result.as_metrics() for key, result in sorted(loaded.items())},
+        "llm_sections": context.get("llm_sections", {}),
+        "llm_model": context.get("llm_model"),
+        "distribution": context.get("distribution"),
+        "pipeline": report.as_metrics(),
+    })
 
     LOGGER.info("Report generated at %s", report_dir)
+    sent = report.results.get("email")
+    if email and (sent is None or sent.status != RAN):
+        reason = "stage not selected" if sent is None else sent.error or sent.status
+        raise PipelineError(f"--email was requested but the pack was not emailed ({reason})")
+    return report
+
+
+def resolve_as_of(value: str, published_dir: Path) -> float:
+    """Unix time for ``--as-of``: a date or time, or ``published`` (when ``published_dir`` was generated)."""
+
+    if value != "published":
+        return parse_as_of(value)
+    metrics_path = published_dir / "run_metrics.json"
+    generated = json.loads(metrics_path.read_text()).get("generated_at") if metrics_path.exists() else None
+    if not generated:
+        raise ValueError(f"{metrics_path} has no generated_at; pass --as-of a date or time instead")
+    return parse_as_of(generated)
+
+
+def affected_stages(due: set[str], market_configs: list[dict]) -> list[str]:
+    """Stages to rebuild when ``due`` series have new releases."""
+
+    charts = [f"charts.{name}" for name, keys in chart_series(market_configs).items() if due & set(keys)]
+    return ["md", "xlsx", "snapshots"] + charts
+
+
+def watch(month: str, markets: str, poll: float = DEFAULT_POLL_SECONDS, **run_kwargs) -> None:
+    """Rebuild the affected parts of the report whenever a series is due."""
+
+    _setup_logging(run_kwargs.get("verbose", False))
+    release_calendar = ReleaseCalendar(load_yaml(CONFIG_PATH).get("refresh"))
+    lookback = run_kwargs.get("lookback", DEFAULT_LOOKBACK_MONTHS)
+    while True:
+        window = parse_month(month)
+        market_configs = load_market_config(list(_get_markets(markets)))
+        keys = series_keys(market_configs)
+        scope = f"{window.label}:{lookback}"
+        due = due_series(keys, scope, release_calendar, RefreshState(), newest=_newest_loadable(window))
+        if due:
+            LOGGER.info("New releases for %s: %s", window.label, ", ".join(sorted(due)))
+            try:
+                run(window.label, markets, only=affected_stages(due, market_configs), refresh="due", **run_kwargs)
+            except Exception:
+                LOGGER.exception("Watch rebuild failed; retrying after the next poll")
+        now = datetime.utcnow()
+        upcoming = release_calendar.next_release(keys, now)
+        wait = poll if upcoming is None else min(poll, max(1.0, (upcoming - now).total_seconds()))
+        LOGGER.info("Next check in %.0fs", wait)
+        time.sleep(wait)
 
 
 def main() -> None:
@@ -461,8 +1147,64 @@ def main() -> None:
     parser.add_argument("--outputs", default="md,xlsx", help="Comma separated outputs (md,xlsx)")
     parser.add_argument("--lookback", type=int, default=DEFAULT_LOOKBACK_MONTHS, help="Months of history to load")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    parser.add_argument("--chart-format", default="png", choices=chart_output.SUPPORTED_FORMATS, help="Chart file format")
+    parser.add_argument("--chart-max-kb", type=int, default=None, help="Size budget per raster chart in KiB")
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds allowed for the load phase before cached data is used")
+    parser.add_argument("--only", action="append", default=[], help="Run only these stages (and what they need), e.g. charts")
+    parser.add_argument("--skip", action="append", default=[], help="Skip stages, e.g. llm (rule-based text is used instead)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Stages to run concurrently")
+    parser.add_argument("--llm-workers", type=int, default=None, help="LLM worker processes (default: CPUs / 2, capped at sections)")
+    parser.add_argument("--llm-budget", type=float, default=None, help=f"Seconds per section before rule-based text is used (default {DEFAULT_SECTION_SECONDS:.0f})")
+    parser.add_argument("--llm-deadline", type=float, default=None, help=f"Seconds for all LLM paragraphs of a report (default {DEFAULT_REPORT_SECONDS:.0f})")
+    parser.add_argument("--llm-model", default=None, help="Model from config/models.yml (default: the best one that fits --llm-budget here)")
+    parser.add_argument("--low-memory", action="store_true", help="Keep month-end float32 data only and stream outputs")
+    parser.add_argument("--refresh", default="all", choices=("all", "due"), help="Refetch every series, or only those with a release since their last fetch")
+    parser.add_argument("--watch", action="store_true", help="Keep running and rebuild affected outputs when new releases land")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS, help="Longest wait between watch checks in seconds")
+    parser.add_argument("--email", action="store_true", help="Email the finished pack to the recipients in config/distribution.yml")
+    parser.add_argument("--as-of", default=None, help="Rebuild from data as known at this date/time (UTC), or 'published'")
     args = parser.parse_args()
-    run(args.month, args.markets, args.outputs, args.lookback, args.verbose)
+    if args.watch:
+        watch(
+            args.month,
+            args.markets,
+            args.poll,
+            outputs=args.outputs,
+            lookback=args.lookback,
+            verbose=args.verbose,
+            chart_format=args.chart_format,
+            chart_max_kb=args.chart_max_kb,
+            deadline=args.deadline,
+            skip=_split_stages(args.skip),
+            workers=args.workers,
+            llm_workers=args.llm_workers,
+            llm_budget=args.llm_budget,
+            llm_model=args.llm_model,
+            llm_deadline=args.llm_deadline,
+            low_memory=args.low_memory,
+        )
+        return
+    run(
+        args.month,
+        args.markets,
+        args.outputs,
+        args.lookback,
+        args.verbose,
+        args.chart_format,
+        args.chart_max_kb,
+        args.deadline,
+        _split_stages(args.only),
+        _split_stages(args.skip),
+        args.workers,
+        args.llm_workers,
+        args.llm_budget,
+        llm_model=args.llm_model,
+        llm_deadline=args.llm_deadline,
+        refresh=args.refresh,
+        low_memory=args.low_memory,
+        as_of=args.as_of,
+        email=args.email,
+    )
 
 
 if __name__ == "__main__":
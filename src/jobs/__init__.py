@@ -0,0 +1 @@
+"""Batch report jobs: spec expansion, brokers and worker processes."""
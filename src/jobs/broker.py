@@ -0,0 +1,322 @@
+"""Job brokers and the series cache shared by workers.
+
+:class:`Broker` is the interface workers talk to; :class:`SQLiteBroker` is the
+local implementation. Several worker processes on one machine can claim from
+one database (SQLite's locking is not safe over a network filesystem): a
+claim is a single ``BEGIN IMMEDIATE`` transaction, and a claimed job carries a
+lease so a job whose worker died is handed out again once the lease expires
+(or marked failed, if that was its last attempt).
+A running worker renews its lease (:class:`LeaseKeeper`), and ``complete`` and
+``fail`` only apply while the caller still holds the lease, so a worker whose
+job was re-claimed cannot overwrite the new owner's result.
+
+:class:`SQLiteSeriesMemo` stores freshly loaded series in the same database,
+so a series fetched by one worker is reused by every other job with the same
+load scope instead of being downloaded again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Protocol
+
+import pandas as pd
+
+from ..loaders.budget import DEFAULT_MEMO_TTL
+from ..utils.io import ensure_directory
+from .spec import JobSpec
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_LEASE_SECONDS = 1800.0
+# Leases are renewed this many times per lease period.
+RENEWALS_PER_LEASE = 3
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    submitted REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at, scope);
+CREATE TABLE IF NOT EXISTS series_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    stored REAL NOT NULL
+);
+"""
+
+
+class Broker(Protocol):
+    def enqueue(self, jobs: list[JobSpec], force: bool = False) -> int: ...
+
+    def claim(self, worker: str) -> "ClaimedJob | None": ...
+
+    def renew(self, job_id: str, worker: str) -> bool: ...
+
+    def complete(self, job_id: str, worker: str, metrics: dict) -> bool: ...
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool: ...
+
+    def jobs(self) -> list[dict]: ...
+
+
+class ClaimedJob:
+    def __init__(self, job_id: str, spec: JobSpec, attempts: int):
+        self.id = job_id
+        self.spec = spec
+        self.attempts = attempts
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    ensure_directory(path.parent)
+    conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteBroker:
+    def __init__(self, path: Path, lease: float = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not cross threads (or forked processes).
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def enqueue(self, jobs: list[JobSpec], force: bool = False) -> int:
+        """Add ``jobs``; existing ids are left alone unless ``force`` requeues them."""
+
+        now = time.time()
+        conn = self._conn()
+        added = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for job in jobs:
+                if force:
+                    conn.execute("DELETE FROM jobs WHERE id = ? AND status != ?", (job.id, RUNNING))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (id, scope, payload, status, max_attempts, available_at, submitted)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job.id, job.scope, job.to_json(), QUEUED, self.max_attempts, now, now),
+                )
+                added += cursor.rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def claim(self, worker: str) -> ClaimedJob | None:
+        """Lease the next runnable job; jobs sharing a load scope are handed out together."""
+
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A worker that died (OOM, segfault) leaves its lease to expire; stop
+            # handing such a job out once it has used up its attempts.
+            expired = conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, lease_until = NULL, error = ?"
+                " WHERE status = ? AND lease_until < ? AND attempts >= max_attempts",
+                (FAILED, now, "lease expired", RUNNING, now),
+            )
+            if expired.rowcount:
+                LOGGER.warning("Failed %d job(s) whose lease expired on their last attempt", expired.rowcount)
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs"
+                " WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?)"
+                " ORDER BY scope, submitted LIMIT 1",
+                (QUEUED, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job_id, payload, attempts = row
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, worker = ?, started = ?, lease_until = ? WHERE id = ?",
+                (RUNNING, attempts + 1, worker, now, now + self.lease, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return ClaimedJob(job_id, JobSpec.from_json(payload), attempts + 1)
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend ``worker``'s lease on a running job; ``False`` if the lease was lost."""
+
+        cursor = self._conn().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+            (time.time() + self.lease, job_id, worker, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, metrics: dict) -> bool:
+        """Mark done; ``False`` (and no change) if ``worker`` no longer holds the lease."""
+
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished = ?, lease_until = NULL, error = NULL, metrics = ?"
+            " WHERE id = ? AND worker = ? AND status = ?",
+            (DONE, time.time(), json.dumps(metrics), job_id, worker, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Requeue with backoff while attempts remain, otherwise mark failed.
+
+        Returns ``False`` (and changes nothing) if ``worker`` no longer holds the lease.
+        """
+
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            attempts, max_attempts = row
+            if attempts < max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, available_at = ?, lease_until = NULL, error = ? WHERE id = ?",
+                    (QUEUED, now + RETRY_BACKOFF_SECONDS * attempts, error, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished = ?, lease_until = NULL, error = ? WHERE id = ?",
+                    (FAILED, now, error, job_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def pending(self) -> int:
+        row = self._conn().execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()
+        return int(row[0])
+
+    def jobs(self) -> list[dict]:
+        cursor = self._conn().execute(
+            "SELECT id, payload, status, attempts, worker, submitted, started, finished, error, metrics FROM jobs ORDER BY scope, submitted"
+        )
+        columns = [item[0] for item in cursor.description]
+        rows = []
+        for values in cursor.fetchall():
+            row = dict(zip(columns, values))
+            row["spec"] = json.loads(row.pop("payload"))
+            row["metrics"] = json.loads(row["metrics"]) if row["metrics"] else None
+            rows.append(row)
+        return rows
+
+
+class LeaseKeeper:
+    """Renews a claimed job's lease from a background thread while the job runs."""
+
+    def __init__(self, broker: Broker, job_id: str, worker: str, interval: float):
+        self.broker = broker
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.broker.renew(self.job_id, self.worker):
+                    LOGGER.warning("Lost the lease on job %s; its result will be discarded", self.job_id)
+                    self.lost = True
+                    return
+            except sqlite3.Error as exc:
+                # A busy database is retried at the next interval, well inside the lease.
+                LOGGER.warning("Could not renew the lease on job %s: %s", self.job_id, exc)
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class SQLiteSeriesMemo:
+    """:class:`~src.loaders.budget.SeriesMemo` backed by the broker database."""
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_MEMO_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def get(self, key: str) -> pd.Series | None:
+        row = self._conn().execute("SELECT payload, stored FROM series_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        series = pd.read_json(StringIO(row[0]), typ="series", orient="split")
+        series.index = pd.to_datetime(series.index)
+        return series
+
+    def put(self, key: str, series: pd.Series) -> None:
+        payload = series.to_json(orient="split", date_format="iso")
+        self._conn().execute(
+            "INSERT OR REPLACE INTO series_cache (key, payload, stored) VALUES (?, ?, ?)", (key, payload, time.time())
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM series_cache")
+
+    def __len__(self) -> int:
+        return int(self._conn().execute("SELECT COUNT(*) FROM series_cache").fetchone()[0])
+
+
+def get_broker(url: str) -> SQLiteBroker:
+    """Broker for ``url``; only ``sqlite:///<path>`` (or a bare path) is built in."""
+
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(Path(url[len("sqlite:///"):]))
+    if "://" in url:
+        raise ValueError(f"Unsupported broker {url!r}; expected sqlite:///<path>")
+    return SQLiteBroker(Path(url))
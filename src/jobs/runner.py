@@ -0,0 +1,170 @@
+"""Run batches of report jobs on worker processes.
+
+    python -m src.jobs.runner submit jobs.yml [--force]
+    python -m src.jobs.runner work --workers 4 [--drain]
+    python -m src.jobs.runner run jobs.yml --workers 4     # submit, then work until drained
+    python -m src.jobs.runner status [--json]
+
+Worker processes on this machine can point ``--broker`` at the same
+database; each renews its job's lease while the job runs. Each job
+rewrites its own report directory in full, so a retried or re-claimed job
+is idempotent. Job metrics (wall time, critical path, series freshness) are
+stored with the job and aggregated by ``status``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+from pathlib import Path
+
+from .. import cli
+from ..loaders.budget import DEFAULT_MEMO_TTL
+from ..utils.io import ROOT
+from .broker import DONE, FAILED, QUEUED, RENEWALS_PER_LEASE, RUNNING, LeaseKeeper, SQLiteSeriesMemo, get_broker
+from .spec import load_spec
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_BROKER = f"sqlite:///{ROOT / 'data' / 'jobs.db'}"
+POLL_SECONDS = 2.0
+
+
+def _job_metrics(report, seconds: float, context_metrics: dict) -> dict:
+    series = context_metrics.get("series", {})
+    statuses: dict[str, int] = {}
+    for item in series.values():
+        statuses[item["status"]] = statuses.get(item["status"], 0) + 1
+    return {
+        "seconds": round(seconds, 3),
+        "critical_seconds": round(report.critical_seconds, 3),
+        "critical_path": report.critical_path,
+        "series": statuses,
+    }
+
+
+def work(broker_url: str, name: str, drain: bool, deadline: float | None, memo_ttl: float, verbose: bool) -> int:
+    """Claim and run jobs until the queue is empty (``drain``) or forever."""
+
+    cli._setup_logging(verbose)
+    broker = get_broker(broker_url)
+    memo = SQLiteSeriesMemo(broker.path, ttl=memo_ttl)
+    done = 0
+    while True:
+        job = broker.claim(name)
+        if job is None:
+            if drain and broker.pending() == 0:
+                return done
+            time.sleep(POLL_SECONDS)
+            continue
+        spec = job.spec
+        reports_root = spec.reports_root(cli.PROJECT_ROOT / "reports")
+        LOGGER.info("[%s] job %s: %s/%s (attempt %d)", name, job.id, spec.pack, spec.month, job.attempts)
+        started = time.monotonic()
+        try:
+            with LeaseKeeper(broker, job.id, name, broker.lease / RENEWALS_PER_LEASE):
+                report = cli.run(
+                    spec.month,
+                    spec.markets,
+                    spec.outputs,
+                    spec.lookback,
+                    verbose=verbose,
+                    deadline=deadline,
+                    only=spec.only,
+                    skip=spec.skip,
+                    memo=memo,
+                    reports_root=reports_root,
+                )
+            run_metrics = json.loads((reports_root / spec.month / "run_metrics.json").read_text())
+            if broker.complete(job.id, name, _job_metrics(report, time.monotonic() - started, run_metrics)):
+                done += 1
+            else:
+                LOGGER.warning("[%s] job %s was re-claimed by another worker; result not recorded", name, job.id)
+        except Exception as exc:
+            LOGGER.exception("[%s] job %s failed", name, job.id)
+            if not broker.fail(job.id, name, f"{type(exc).__name__}: {exc}"):
+                LOGGER.warning("[%s] job %s was re-claimed by another worker; failure not recorded", name, job.id)
+
+
+def start_workers(broker_url: str, workers: int, drain: bool, deadline: float | None, memo_ttl: float, verbose: bool) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    host = socket.gethostname()
+    processes = [
+        ctx.Process(target=work, args=(broker_url, f"{host}:{os.getpid()}:{index}", drain, deadline, memo_ttl, verbose))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def summarize(jobs: list[dict]) -> dict:
+    counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    seconds = sorted(job["metrics"]["seconds"] for job in jobs if job["metrics"])
+    started = [job["started"] for job in jobs if job["started"]]
+    finished = [job["finished"] for job in jobs if job["finished"]]
+    series: dict[str, int] = {}
+    for job in jobs:
+        for status, count in ((job["metrics"] or {}).get("series") or {}).items():
+            series[status] = series.get(status, 0) + count
+    return {
+        "jobs": counts,
+        "retries": sum(max(0, job["attempts"] - 1) for job in jobs),
+        "job_seconds": {
+            "total": round(sum(seconds), 3),
+            "mean": round(statistics.fmean(seconds), 3) if seconds else None,
+            "p95": seconds[min(len(seconds) - 1, int(0.95 * len(seconds)))] if seconds else None,
+        },
+        "wall_seconds": round(max(finished) - min(started), 3) if started and finished else None,
+        "series": series,
+        "failed": [{"id": job["id"], "spec": job["spec"], "error": job["error"]} for job in jobs if job["status"] == FAILED],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch report job runner")
+    parser.add_argument("--broker", default=DEFAULT_BROKER, help="Broker URL (sqlite:///path)")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="Expand a spec and queue its jobs")
+    submit.add_argument("spec", type=Path)
+    submit.add_argument("--force", action="store_true", help="Requeue jobs that already ran")
+    for command in ("work", "run"):
+        sub = commands.add_parser(command, help="Run queued jobs" if command == "work" else "Submit a spec and run it to completion")
+        if command == "run":
+            sub.add_argument("spec", type=Path)
+            sub.add_argument("--force", action="store_true", help="Requeue jobs that already ran")
+        else:
+            sub.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+        sub.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Worker processes")
+        sub.add_argument("--deadline", type=float, default=None, help="Load deadline per job in seconds")
+        sub.add_argument("--cache-ttl", type=float, default=DEFAULT_MEMO_TTL, help="Seconds a loaded series is shared between jobs")
+    status = commands.add_parser("status", help="Aggregate job metrics")
+    status.add_argument("--json", action="store_true", help="Print every job as JSON")
+    args = parser.parse_args()
+    cli._setup_logging(args.verbose)
+
+    broker = get_broker(args.broker)
+    if args.command in ("submit", "run"):
+        jobs = load_spec(args.spec)
+        added = broker.enqueue(jobs, force=args.force)
+        LOGGER.info("Queued %d of %d jobs", added, len(jobs))
+    if args.command in ("work", "run"):
+        drain = args.command == "run" or args.drain
+        start_workers(args.broker, args.workers, drain, args.deadline, args.cache_ttl, args.verbose)
+    if args.command in ("status", "run"):
+        jobs = broker.jobs()
+        payload = jobs if getattr(args, "json", False) else summarize(jobs)
+        print(json.dumps(payload, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Expand a work spec into individual report jobs.
+
+A spec (YAML or JSON) names the months and the client packs to build::
+
+    months: {from: 2024-01, to: 2025-09}   # or a list, or "auto"
+    lookback: 24
+    packs:
+      - name: default                      # writes reports/<YYYY-MM>/
+        markets: us,au
+        outputs: md,xlsx
+      - name: au-only                      # writes reports/packs/au-only/<YYYY-MM>/
+        markets: au
+        outputs: md
+        skip: [llm]
+
+Job ids hash the job's parameters, so submitting the same spec twice does
+not create duplicate work.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from ..utils.dates import parse_month
+from ..utils.io import load_yaml
+
+DEFAULT_PACK = "default"
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    month: str
+    pack: str = DEFAULT_PACK
+    markets: str = "us,au"
+    outputs: str = "md,xlsx"
+    lookback: int = 24
+    only: tuple[str, ...] = ()
+    skip: tuple[str, ...] = ()
+
+    @property
+    def id(self) -> str:
+        key = json.dumps([self.month, self.pack, self.markets, self.outputs, self.lookback, self.only, self.skip])
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    @property
+    def scope(self) -> str:
+        """Jobs with the same scope load identical series."""
+
+        return f"{self.month}:{self.lookback}"
+
+    def reports_root(self, root: Path) -> Path:
+        return root if self.pack == DEFAULT_PACK else root / "packs" / self.pack
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: str) -> "JobSpec":
+        raw = json.loads(text)
+        raw["only"], raw["skip"] = tuple(raw.get("only", ())), tuple(raw.get("skip", ()))
+        return cls(**raw)
+
+
+def _months(raw) -> list[str]:
+    if raw in (None, "auto"):
+        return [parse_month("auto").label]
+    if isinstance(raw, dict):
+        start, end = parse_month(str(raw["from"])).start, parse_month(str(raw.get("to", "auto"))).start
+        return [stamp.strftime("%Y-%m") for stamp in pd.date_range(start, end, freq="MS")]
+    return [parse_month(str(month)).label for month in raw]
+
+
+def _stages(value) -> tuple[str, ...]:
+    if not value:
+        return ()
+    items = [value] if isinstance(value, str) else list(value)
+    return tuple(part.strip() for item in items for part in str(item).split(",") if part.strip())
+
+
+def expand(spec: dict) -> list[JobSpec]:
+    """Every (month, pack) job in ``spec``, ordered so jobs sharing a load scope are adjacent."""
+
+    lookback = int(spec.get("lookback", 24))
+    packs = spec.get("packs") or [{"name": DEFAULT_PACK}]
+    jobs = [
+        JobSpec(
+            month=month,
+            pack=str(pack.get("name", DEFAULT_PACK)),
+            markets=str(pack.get("markets", "us,au")),
+            outputs=str(pack.get("outputs", "md,xlsx")),
+            lookback=int(pack.get("lookback", lookback)),
+            only=_stages(pack.get("only")),
+            skip=_stages(pack.get("skip")),
+        )
+        for month in _months(spec.get("months"))
+        for pack in packs
+    ]
+    names = [pack.get("name", DEFAULT_PACK) for pack in packs]
+    if len(set(names)) != len(names):
+        raise ValueError("Pack names must be unique")
+    return sorted(jobs, key=lambda job: (job.scope, job.pack))
+
+
+def load_spec(path: Path) -> list[JobSpec]:
+    raw = json.loads(path.read_text()) if path.suffix == ".json" else load_yaml(path)
+    return expand(raw or {})
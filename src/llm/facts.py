@@ -0,0 +1,100 @@
+"""Compact, deterministic facts payloads for LLM prompts.
+
+Each prompt section gets only the numbers it needs, as ``label value`` pairs
+in a fixed order with fixed rounding, so identical inputs always produce the
+identical prompt. :func:`fit_budget` keeps a section inside a token budget,
+counted with the model's own tokenizer when one is available: it first drops
+a decimal place, then drops the lowest-priority facts.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_DECIMALS = 2
+DEFAULT_SECTION_BUDGET = 120
+# Rough characters-per-token for English/numeric text when no tokenizer exists.
+CHARS_PER_TOKEN = 3.0
+
+TokenCounter = Callable[[str], int]
+
+
+@dataclass(frozen=True)
+class Fact:
+    label: str
+    # Ints (counts such as months) render without decimals.
+    value: float | int | None
+    unit: str = "%"
+    # Lower numbers are kept longest when a section is over budget.
+    priority: int = 0
+
+    def render(self, decimals: int = DEFAULT_DECIMALS) -> str:
+        if self.value is None or (isinstance(self.value, float) and math.isnan(self.value)):
+            return f"{self.label} n/a"
+        if isinstance(self.value, int):
+            return f"{self.label} {self.value}{self.unit}"
+        return f"{self.label} {self.value:.{decimals}f}{self.unit}"
+
+
+def serialize(facts: Iterable[Fact], decimals: int = DEFAULT_DECIMALS) -> str:
+    return "; ".join(fact.render(decimals) for fact in facts) + "."
+
+
+def approx_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=4)
+def token_counter(model_path: str | None = None) -> TokenCounter:
+    """Return a token counter for ``model_path``'s vocabulary, or an estimate.
+
+    Only the vocabulary is loaded (``vocab_only``), which is fast even for
+    large GGUF files.
+    """
+
+    if model_path and Path(model_path).exists():
+        try:
+            from llama_cpp import Llama  # type: ignore
+
+            vocab = Llama(model_path=str(model_path), vocab_only=True, verbose=False)
+            return lambda text: len(vocab.tokenize(text.encode("utf-8"), add_bos=False))
+        except Exception as exc:  # pragma: no cover
+            LOGGER.debug("Tokenizer unavailable for %s: %s", model_path, exc)
+    return approx_tokens
+
+
+def fit_budget(
+    facts: list[Fact],
+    budget: int = DEFAULT_SECTION_BUDGET,
+    count_tokens: TokenCounter = approx_tokens,
+    decimals: int = DEFAULT_DECIMALS,
+) -> str:
+    """Serialise ``facts`` within ``budget`` tokens."""
+
+    for places in range(decimals, 0, -1):
+        text = serialize(facts, places)
+        if count_tokens(text) <= budget:
+            return text
+    kept = sorted(enumerate(facts), key=lambda item: (item[1].priority, item[0]))
+    while len(kept) > 1:
+        kept.pop()
+        ordered = [fact for _, fact in sorted(kept)]
+        text = serialize(ordered, 1)
+        if count_tokens(text) <= budget:
+            return text
+    LOGGER.warning("Facts exceed %d-token budget even after trimming", budget)
+    return serialize([fact for _, fact in kept], 1)
+
+
+def build_payloads(
+    sections: dict[str, list[Fact]],
+    budget: int = DEFAULT_SECTION_BUDGET,
+    count_tokens: TokenCounter = approx_tokens,
+) -> dict[str, str]:
+    return {name: fit_budget(facts, budget, count_tokens) for name, facts in sections.items()}
@@ -1,54 +1,68 @@
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
+import threading
 from pathlib import Path
 from typing import Optional
 
+from . import models
+
 LOGGER = logging.getLogger(__name__)
-DEFAULT_MODEL_URL = "https://huggingface.co/TheBloke/TinyLlama-1.1B-Chat-v0.6-GGUF/resolve/main/TinyLlama-1.1B-Chat-v0.6.Q2_K.gguf?download=true"
-DEFAULT_MODEL_PATH = Path("models") / "tinyllama-q2k.gguf"
+
+
+def ensure_model() -> None:
+    """Download the configured small model when no candidate is on disk and auto-download is on."""
+
+    registry = models.get_registry()
+    if registry.local():
+        return
+    if os.getenv("DOWNLOAD_TINY_LLM", "0") != "1" or not registry.download_name:
+        LOGGER.info("No local LLM model and auto-download disabled; using rule-based text.")
+        return
+    try:
+        models.download(registry.get(registry.download_name))
+    except Exception as exc:
+        LOGGER.warning("Failed to download LLM model: %s", exc)
+
+
+def default_model_path() -> Path | None:
+    return models.get_registry().default_path()
+
+
+def model_available(model_path: Path | None = None) -> bool:
+    """Whether a local model (downloaded if enabled) and ``llama_cpp`` are both present."""
+
+    ensure_model()
+    model_path = model_path or default_model_path()
+    if model_path is None or not Path(model_path).exists():
+        return False
+    return importlib.util.find_spec("llama_cpp") is not None
 
 
 class TinyLLM:
-    def __init__(self):
+    def __init__(self, n_threads: int | None = None, model_path: Path | None = None):
         self.model = None
         self._ensure_model()
-        if self.model_path.exists():
+        self.model_path = Path(model_path) if model_path else default_model_path()
+        if self.model_path is not None and self.model_path.exists():
             try:
                 from llama_cpp import Llama  # type: ignore
 
-                self.model = Llama(model_path=str(self.model_path), n_ctx=2048, logits_all=False)
+                self.model = Llama(model_path=str(self.model_path), n_ctx=2048, logits_all=False, n_threads=n_threads, verbose=False)
             except Exception as exc:  # pragma: no cover
                 LOGGER.warning("llama_cpp unavailable or failed to load: %s", exc)
                 self.model = None
 
-    @property
-    def model_path(self) -> Path:
-        return DEFAULT_MODEL_PATH
-
     def _ensure_model(self) -> None:
-        if self.model_path.exists():
-            return
-        if os.getenv("DOWNLOAD_TINY_LLM", "0") != "1":
-            LOGGER.info("Tiny LLM model not found and auto-download disabled; using rule-based text.")
-            return
-        try:
-            import requests
+        ensure_model()
 
-            self.model_path.parent.mkdir(parents=True, exist_ok=True)
-            LOGGER.info("Downloading tiny LLM model to %s", self.model_path)
-            resp = requests.get(DEFAULT_MODEL_URL, timeout=120)
-            resp.raise_for_status()
-            self.model_path.write_bytes(resp.content)
-        except Exception as exc:
-            LOGGER.warning("Failed to download tiny LLM model: %s", exc)
-
-    def generate(self, prompt: str) -> Optional[str]:
+    def generate(self, prompt: str, max_tokens: int = 256, stop: list[str] | None = None) -> Optional[str]:
         if not self.model:
             return None
         try:
-            completion = self.model.create_completion(prompt=prompt, max_tokens=256, temperature=0.7)
+            completion = self.model.create_completion(prompt=prompt, max_tokens=max_tokens, temperature=0.7, stop=stop or None)
             text = completion["choices"][0]["text"].strip()
             return text
         except Exception as exc:
@@ -56,6 +70,19 @@ class TinyLLM:
             return None
 
 
+_LLM: TinyLLM | None = None
+_LLM_LOCK = threading.Lock()
+
+
+def get_llm() -> TinyLLM:
+    """Return the process-wide model, loading it on first use."""
+
+    global _LLM
+    with _LLM_LOCK:
+        if _LLM is None:
+            _LLM = TinyLLM()
+        return _LLM
+
+
 def run_prompt(prompt: str) -> Optional[str]:
-    llm = TinyLLM()
-    return llm.generate(prompt)
+    return get_llm().generate(prompt)
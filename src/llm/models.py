@@ -0,0 +1,424 @@
+"""Local GGUF model registry, micro-benchmark and latency-aware selection.
+
+``config/models.yml`` lists candidate models, most preferred first. The first
+time a candidate is considered on a machine it is benchmarked in a separate
+process with the thread count a report worker would get: load time, prompt
+and generation tokens/sec on a real section prompt, and peak RSS. Results are
+kept in ``data/cache/model_benchmarks.json`` per CPU and are re-measured only
+when the model file changes. Inside a report a benchmark gets at most the
+section budget (a model that cannot decode the short benchmark in that time
+cannot fit a section either); one that runs out is remembered as too slow for
+that budget, so later runs do not pay for it again. ``python -m
+src.llm.models bench`` measures ahead of time with a longer limit.
+
+:meth:`ModelRegistry.select` returns the first candidate whose predicted
+time per section (prompt evaluation plus ``max_tokens`` of generation) fits
+within ``headroom`` of the section budget and whose memory fits ``workers``
+copies, so a slow CI runner drops to a smaller quantisation instead of timing
+every section out. Candidates after the chosen one are never benchmarked.
+
+Downloads stream to ``<path>.part`` and resume from its size with a ``Range``
+request, so an interrupted multi-gigabyte fetch continues where it stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+from . import prompts
+from ..utils.io import ensure_directory, file_lock, load_yaml, write_atomic
+from ..utils.memory import available_mb, peak_rss_mb
+
+LOGGER = logging.getLogger(__name__)
+ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = ROOT / "config" / "models.yml"
+BENCHMARKS_PATH = ROOT / "data" / "cache" / "model_benchmarks.json"
+DEFAULT_HEADROOM = 0.75
+BENCH_TOKENS = 32
+BENCH_TIMEOUT_SECONDS = 300.0
+BENCH_PROMPT = prompts.BOND_PROMPT.format(
+    facts="US 10y 4.15%; US 10y MoM -0.12%; AU 10y 4.32%; AU 10y MoM 0.05%; US 10y pct 62.00%; AU 10y pct 48.00%."
+)
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_TIMEOUT = 60
+CHUNK_BYTES = 1 << 20
+GGUF_MAGIC = b"GGUF"
+
+
+def worker_threads(workers: int) -> int:
+    """Threads each of ``workers`` model contexts gets."""
+
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def machine_id() -> str:
+    """Benchmarks only transfer between identical CPUs."""
+
+    model = platform.processor() or platform.machine()
+    try:
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            if line.startswith("model name"):
+                model = line.split(":", 1)[1].strip()
+                break
+    except OSError:
+        pass
+    return f"{model} x{os.cpu_count() or 1}"
+
+
+@dataclass(frozen=True)
+class Candidate:
+    name: str
+    path: Path
+    url: str | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.path.is_file()
+
+    @property
+    def size_mb(self) -> float:
+        return self.path.stat().st_size / (1024 * 1024)
+
+    def signature(self) -> list:
+        stat = self.path.stat()
+        return [stat.st_size, stat.st_mtime]
+
+
+@dataclass
+class Benchmark:
+    threads: int
+    load_s: float
+    prompt_tokens: int
+    prompt_tps: float
+    tokens_per_s: float
+    rss_mb: float | None
+    measured: float
+    signature: list
+
+    def section_seconds(self, max_tokens: int) -> float:
+        """Predicted decode time of a section prompt generating ``max_tokens``."""
+
+        return self.prompt_tokens / self.prompt_tps + max_tokens / self.tokens_per_s
+
+
+@dataclass
+class Selection:
+    candidate: Candidate | None
+    benchmark: Benchmark | None = None
+    predicted_s: float | None = None
+    reason: str | None = None
+
+    @property
+    def path(self) -> Path | None:
+        return None if self.candidate is None else self.candidate.path
+
+    def as_metrics(self) -> dict:
+        bench = self.benchmark
+        return {
+            "name": None if self.candidate is None else self.candidate.name,
+            "tokens_per_s": None if bench is None else round(bench.tokens_per_s, 1),
+            "load_s": None if bench is None else round(bench.load_s, 2),
+            "rss_mb": None if bench is None or bench.rss_mb is None else round(bench.rss_mb, 1),
+            "predicted_section_s": None if self.predicted_s is None else round(self.predicted_s, 2),
+            "reason": self.reason,
+        }
+
+
+def _measure(path: str, threads: int, prompt: str, tokens: int) -> dict:
+    """Runs in a fresh process so the load is cold and RSS is the model's own."""
+
+    from llama_cpp import Llama  # type: ignore
+
+    start = time.perf_counter()
+    llm = Llama(model_path=path, n_ctx=2048, n_threads=threads, verbose=False)
+    load_s = time.perf_counter() - start
+    prompt_tokens = len(llm.tokenize(prompt.encode("utf-8")))
+    start = time.perf_counter()
+    first = None
+    count = 0
+    # EOS is suppressed so every model decodes the same number of tokens.
+    for _ in llm.create_completion(
+        prompt, max_tokens=tokens, temperature=0.0, stream=True, logit_bias={llm.token_eos(): -1e9}
+    ):
+        count += 1
+        if first is None:
+            first = time.perf_counter()
+    end = time.perf_counter()
+    if first is None or count < 2:
+        raise RuntimeError("benchmark produced no tokens")
+    return {
+        "load_s": load_s,
+        "prompt_tokens": prompt_tokens,
+        # The first token arrives once the prompt is evaluated.
+        "prompt_tps": prompt_tokens / max(first - start, 1e-6),
+        "tokens_per_s": (count - 1) / max(end - first, 1e-6),
+        "rss_mb": peak_rss_mb(),
+    }
+
+
+class BenchmarkTimeout(RuntimeError):
+    pass
+
+
+def benchmark(candidate: Candidate, threads: int, timeout: float = BENCH_TIMEOUT_SECONDS) -> Benchmark:
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"))
+    LOGGER.info("Benchmarking %s with %d threads (limit %.0fs)", candidate.name, threads, timeout)
+    try:
+        future = executor.submit(_measure, str(candidate.path), threads, BENCH_PROMPT, BENCH_TOKENS)
+        result = future.result(timeout=timeout)
+    except FutureTimeout:
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        raise BenchmarkTimeout(f"benchmark exceeded {timeout:.0f}s") from None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return Benchmark(threads=threads, measured=time.time(), signature=candidate.signature(), **result)
+
+
+class ModelRegistry:
+    def __init__(self, config: dict | None = None, path: Path = BENCHMARKS_PATH):
+        config = load_yaml(CONFIG_PATH) if config is None else config
+        self.candidates = [
+            Candidate(item["name"], ROOT / item["path"], item.get("url")) for item in config.get("candidates") or []
+        ]
+        self.download_name = config.get("download")
+        self.headroom = float(config.get("headroom", DEFAULT_HEADROOM))
+        self.path = path
+        self.machine = machine_id()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Candidate:
+        for candidate in self.candidates:
+            if candidate.name == name:
+                return candidate
+        raise KeyError(f"Unknown model {name!r}; candidates: {', '.join(c.name for c in self.candidates)}")
+
+    def local(self) -> list[Candidate]:
+        return [candidate for candidate in self.candidates if candidate.available]
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _update(self, **entries) -> None:
+        # Job workers and the server share the file; merge under a cross-process lock.
+        with self._lock, file_lock(self.path):
+            state = self._read()
+            machine = state.setdefault(self.machine, {})
+            for key, value in entries.items():
+                if isinstance(value, dict) and isinstance(machine.get(key), dict):
+                    machine[key].update(value)
+                else:
+                    machine[key] = value
+            write_atomic(self.path, json.dumps(state, indent=2))
+
+    def cached(self, candidate: Candidate, threads: int) -> Benchmark | None:
+        if not candidate.available:
+            return None
+        entry = self._read().get(self.machine, {}).get("benchmarks", {}).get(f"{candidate.name}@{threads}")
+        if not entry or entry.get("signature") != candidate.signature():
+            return None
+        return Benchmark(**entry)
+
+    def too_slow(self, candidate: Candidate, threads: int, timeout: float) -> bool:
+        """Whether a benchmark of this model file already ran out of at least ``timeout`` seconds."""
+
+        entry = self._read().get(self.machine, {}).get("timeouts", {}).get(f"{candidate.name}@{threads}")
+        return bool(entry) and entry.get("signature") == candidate.signature() and entry["seconds"] >= timeout
+
+    def benchmark(
+        self, candidate: Candidate, threads: int, refresh: bool = False, timeout: float = BENCH_TIMEOUT_SECONDS
+    ) -> Benchmark | None:
+        """Cached or freshly measured benchmark; ``None`` if the model cannot run within ``timeout``."""
+
+        bench = None if refresh else self.cached(candidate, threads)
+        if bench is None:
+            if not refresh and self.too_slow(candidate, threads, timeout):
+                return None
+            key = f"{candidate.name}@{threads}"
+            try:
+                bench = benchmark(candidate, threads, timeout)
+            except BenchmarkTimeout as exc:
+                LOGGER.warning("Benchmark of %s failed: %s", candidate.name, exc)
+                self._update(timeouts={key: {"signature": candidate.signature(), "seconds": timeout}})
+                return None
+            except Exception as exc:
+                LOGGER.warning("Benchmark of %s failed: %s", candidate.name, exc)
+                return None
+            self._update(benchmarks={key: asdict(bench)})
+        return bench
+
+    def default_path(self) -> Path | None:
+        """The model last selected on this machine if still present, else the first local one."""
+
+        name = self._read().get(self.machine, {}).get("selected")
+        local = self.local()
+        for candidate in local:
+            if candidate.name == name:
+                return candidate.path
+        return local[0].path if local else None
+
+    def select(
+        self, budget_s: float, max_tokens: int, workers: int, name: str | None = None, deadline_s: float | None = None
+    ) -> Selection:
+        """Most preferred model that fits ``budget_s`` per section with ``workers`` contexts.
+
+        Benchmarking stops once ``deadline_s`` seconds have passed; later
+        candidates are then considered only if already benchmarked.
+        """
+
+        if importlib.util.find_spec("llama_cpp") is None:
+            return Selection(None, reason="llama_cpp not installed")
+        threads = worker_threads(workers)
+        if name:
+            candidate = self.get(name)
+            if not candidate.available:
+                return Selection(None, reason=f"{name} not downloaded")
+            bench = self.cached(candidate, threads)
+            return Selection(candidate, bench, bench and bench.section_seconds(max_tokens), "requested")
+        memory = available_mb()
+        # A model that cannot decode the short benchmark within a section's budget cannot fit one.
+        timeout = min(BENCH_TIMEOUT_SECONDS, budget_s)
+        stop = None if deadline_s is None else time.monotonic() + deadline_s
+        rejected = []
+        for candidate in self.local():
+            if memory is not None and candidate.size_mb * workers > memory:
+                rejected.append(f"{candidate.name} needs {candidate.size_mb * workers:.0f} MB")
+                continue
+            bench = self.cached(candidate, threads)
+            limit = timeout if stop is None else min(timeout, stop - time.monotonic())
+            if bench is None:
+                if limit <= 0:
+                    rejected.append(f"{candidate.name} not benchmarked before the LLM time cap")
+                    continue
+                bench = self.benchmark(candidate, threads, timeout=limit)
+            if bench is None:
+                rejected.append(f"{candidate.name} failed or exceeded the {limit:.0f}s benchmark limit")
+                continue
+            if memory is not None and bench.rss_mb is not None and bench.rss_mb * workers > memory:
+                rejected.append(f"{candidate.name} needs {bench.rss_mb * workers:.0f} MB resident")
+                continue
+            predicted = bench.section_seconds(max_tokens)
+            if predicted > budget_s * self.headroom:
+                rejected.append(f"{candidate.name} predicts {predicted:.1f}s")
+                continue
+            self._update(selected=candidate.name)
+            LOGGER.info(
+                "Selected %s: %.1f tok/s with %d threads, %.1fs per section (budget %.0fs)",
+                candidate.name, bench.tokens_per_s, threads, predicted, budget_s,
+            )
+            return Selection(candidate, bench, predicted)
+        if not rejected:
+            return Selection(None, reason="no local model")
+        return Selection(None, reason="no model fits the budget: " + "; ".join(rejected))
+
+
+_REGISTRY: ModelRegistry | None = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ModelRegistry()
+        return _REGISTRY
+
+
+def download(candidate: Candidate, timeout: float = DOWNLOAD_TIMEOUT) -> Path:
+    """Stream ``candidate`` to disk, resuming a previous partial download."""
+
+    import requests
+
+    if candidate.available:
+        return candidate.path
+    if not candidate.url:
+        raise ValueError(f"{candidate.name} has no download URL")
+    part = candidate.path.with_name(candidate.path.name + ".part")
+    ensure_directory(part.parent)
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with requests.get(candidate.url, headers=headers, stream=True, timeout=timeout) as resp:
+                if resp.status_code == 416:
+                    # The partial file already holds every byte.
+                    break
+                resp.raise_for_status()
+                if offset and resp.status_code != 206:
+                    LOGGER.info("Server ignored the range request; restarting %s", candidate.name)
+                    offset = 0
+                expected = int(resp.headers.get("Content-Length", 0)) + offset
+                LOGGER.info("Downloading %s to %s from byte %d", candidate.name, candidate.path, offset)
+                with part.open("ab" if offset else "wb") as fh:
+                    for chunk in resp.iter_content(CHUNK_BYTES):
+                        fh.write(chunk)
+            if expected > offset and part.stat().st_size < expected:
+                raise OSError(f"connection closed at {part.stat().st_size} of {expected} bytes")
+            break
+        except requests.HTTPError:
+            raise
+        except OSError as exc:
+            # requests' connection, timeout and truncated-body errors are all OSErrors.
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+            LOGGER.warning("Download of %s interrupted (%s); resuming", candidate.name, exc)
+            time.sleep(attempt)
+    with part.open("rb") as fh:
+        if fh.read(len(GGUF_MAGIC)) != GGUF_MAGIC:
+            part.unlink()
+            raise ValueError(f"{candidate.url} did not return a GGUF file")
+    part.replace(candidate.path)
+    return candidate.path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List, benchmark, select or download LLM models")
+    parser.add_argument("command", choices=["list", "bench", "select", "download"])
+    parser.add_argument("name", nargs="?", help="Model name (download, or bench a single model)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent model contexts the run will use")
+    parser.add_argument("--budget", type=float, default=60.0, help="Seconds per section (select)")
+    parser.add_argument("--max-tokens", type=int, default=max(prompts.SECTION_MAX_TOKENS.values()))
+    parser.add_argument("--refresh", action="store_true", help="Re-measure cached benchmarks")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    registry = get_registry()
+    threads = worker_threads(args.workers)
+    if args.command == "download":
+        if not args.name:
+            parser.error("download needs a model name")
+        print(download(registry.get(args.name)))
+    elif args.command == "select":
+        print(json.dumps(registry.select(args.budget, args.max_tokens, args.workers, args.name).as_metrics(), indent=2))
+    else:
+        candidates = [registry.get(args.name)] if args.name else registry.candidates
+        rows = {}
+        for candidate in candidates:
+            if args.command == "bench" and candidate.available:
+                bench = registry.benchmark(candidate, threads, refresh=args.refresh)
+            else:
+                bench = registry.cached(candidate, threads)
+            rows[candidate.name] = {
+                "path": str(candidate.path.relative_to(ROOT)),
+                "available": candidate.available,
+                "benchmark": None if bench is None else asdict(bench),
+                "predicted_section_s": None if bench is None else round(bench.section_seconds(args.max_tokens), 2),
+            }
+        print(json.dumps({"machine": registry.machine, "threads": threads, "models": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
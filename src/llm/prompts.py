@@ -27,3 +27,15 @@ CMDTY_PROMPT = """In 2–3 sentences, summarize gold, oil (WTI/Brent), and iron
 Facts:
 {facts}
 """
+
+# Token budgets per section: 2–3 sentences rarely need more than ~90 tokens.
+SECTION_MAX_TOKENS = {
+    "bond": 110,
+    "equities": 100,
+    "fx": 100,
+    "cpi": 90,
+    "policy": 90,
+    "cmdty": 110,
+}
+DEFAULT_MAX_TOKENS = 100
+STOP_SEQUENCES = ["\n\n", "Facts:", "In 2–3 sentences"]
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Optional
 
+from ..analytics.history import NOTABLE_MONTHS, NOTABLE_PERCENTILE
+
 
 def _format_change(value: float | None, precision: int = 2) -> str:
     if value is None:
@@ -9,18 +11,43 @@ def _format_change(value: float | None, precision: int = 2) -> str:
     return f"{value:.{precision}f}%"
 
 
-def bond_summary(us_end: float | None, us_mom: float | None, au_end: float | None, au_mom: float | None) -> str:
-    return (
-        "US 10-year yields {us_dir} to {us_end}, a {us_mom} move on the month, while Australian "
-        "10-year yields {au_dir} to {au_end} ({au_mom})."
-    ).format(
-        us_dir=_direction_phrase(us_mom),
-        us_end=_level_phrase(us_end),
-        us_mom=_format_change(us_mom),
-        au_dir=_direction_phrase(au_mom),
-        au_end=_level_phrase(au_end),
-        au_mom=_format_change(au_mom),
+def _join(parts: list[str]) -> str:
+    return parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+def bond_summary(markets: list[tuple[str, float | None, float | None]]) -> str:
+    """``markets`` holds ``(adjective, end, mom)`` per market, lead market first."""
+
+    if not markets:
+        return ""
+    (lead, lead_end, lead_mom), rest = markets[0], markets[1:]
+    text = "{lead} 10-year yields {dir} to {end}, a {mom} move on the month".format(
+        lead=lead, dir=_direction_phrase(lead_mom), end=_level_phrase(lead_end), mom=_format_change(lead_mom)
     )
+    if rest:
+        text += ", while " + _join([
+            f"{adjective} 10-year yields {_direction_phrase(mom)} to {_level_phrase(end)} ({_format_change(mom)})"
+            for adjective, end, mom in rest
+        ])
+    return text + "."
+
+
+def curve_summary(markets: list[tuple[str, float | None, float | None]]) -> str:
+    """``markets`` holds ``(adjective, 2s10s bp, 2s10s MoM bp)``; markets without a curve are skipped."""
+
+    parts = []
+    for adjective, slope, change in markets:
+        if slope is None:
+            continue
+        if change is None or round(change) == 0:
+            shape = "was little changed"
+        else:
+            shape = f"{'steepened' if change > 0 else 'flattened'} {abs(change):.0f} bp"
+        parts.append(f"the {adjective} curve {shape} to a 2s10s spread of {slope:.0f} bp")
+    if not parts:
+        return ""
+    text = "; ".join(parts) + "."
+    return text[0].upper() + text[1:]
 
 
 def cpi_summary(us_yoy: float | None, au_yoy: float | None) -> str:
@@ -35,10 +62,16 @@ def policy_summary(fed: float | None, rba: float | None) -> str:
     ).format(fed=_format_change(fed), rba=_format_change(rba))
 
 
-def equity_summary(spx_mom: float | None, axjo_mom: float | None) -> str:
-    return (
-        "The S&P 500 returned {spx} over the month, while the ASX 200 delivered {axjo}."
-    ).format(spx=_format_change(spx_mom), axjo=_format_change(axjo_mom))
+def equity_summary(markets: list[tuple[str, float | None]]) -> str:
+    """``markets`` holds ``(index name, mom)`` per market, lead market first."""
+
+    if not markets:
+        return ""
+    (lead, lead_mom), rest = markets[0], markets[1:]
+    text = f"The {lead} returned {_format_change(lead_mom)} over the month"
+    if rest:
+        text += ", while " + _join([f"the {name} delivered {_format_change(mom)}" for name, mom in rest])
+    return text + "."
 
 
 def fx_summary(audusd_mom: float | None, dxy_mom: float | None) -> str:
@@ -59,6 +92,37 @@ def commodity_summary(gold_mom: float | None, wti_mom: float | None, brent_mom:
     )
 
 
+def history_note(
+    label: str,
+    percentile: float | None = None,
+    largest_since: str | None = None,
+    record: bool = False,
+    high_months: int = 0,
+    low_months: int = 0,
+) -> str:
+    """One sentence of historical context, or ``""`` when nothing stands out."""
+
+    parts = []
+    if record:
+        parts.append(f"{label} posted its largest monthly move on record")
+    elif percentile is not None and percentile >= NOTABLE_PERCENTILE:
+        since = f"the largest since {largest_since}, " if largest_since else ""
+        parts.append(f"the {label} move was {since}in the {_ordinal(round(percentile))} percentile of the past decade")
+    if high_months >= NOTABLE_MONTHS:
+        parts.append(f"{label} closed at a {high_months}-month high")
+    elif low_months >= NOTABLE_MONTHS:
+        parts.append(f"{label} closed at a {low_months}-month low")
+    if not parts:
+        return ""
+    text = "; ".join(parts) + "."
+    return text[0].upper() + text[1:]
+
+
+def _ordinal(value: int) -> str:
+    suffix = "th" if 10 <= value % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(value % 10, "th")
+    return f"{value}{suffix}"
+
+
 def _direction_phrase(change: float | None) -> str:
     if change is None:
         return "was little changed"
@@ -0,0 +1,307 @@
+"""Concurrent section generation across several llama contexts.
+
+The report's paragraphs are independent, so each one is a job for a pool of
+worker processes that each hold their own model context with
+``cpu_count // workers`` threads. Jobs carry their own token budget and stop
+sequences. Every completion is checked against the facts in its prompt
+(:mod:`src.llm.verify`); a paragraph with unsupported figures or contradicted
+directions is regenerated up to ``attempts`` times. A section that is not
+accepted within its time budget (measured from when a worker first started
+decoding it, as reported by the worker, across attempts), or that fails, gets its rule-based paragraph instead, so LLM
+wall time is bounded by the slowest section rather than the sum. An optional
+per-report cap falls back every section still pending when it runs out.
+
+Long-running callers can call :func:`keep_warm` so the pool, and the model
+each worker has loaded, survives between reports. Which model the workers load
+is chosen per run by :mod:`src.llm.models`; a warm pool is reused only for the
+same model. Reports share the warm pool, so a section that runs out of time
+there is abandoned rather than killed: its decode finishes in the background
+(bounded by its token cap) and is discarded, and other reports' sections are
+unaffected.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import generator, models, prompts, verify
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_SECTION_SECONDS = 60.0
+DEFAULT_REPORT_SECONDS = 180.0
+DEFAULT_ATTEMPTS = 3
+POLL_SECONDS = 0.1
+# Start stamps of abandoned calls are dropped after this long.
+START_STAMP_TTL = 3600.0
+
+LLM = "llm"
+RULES = "rules"
+
+_WORKER_LLM: generator.TinyLLM | None = None
+_WORKER_STARTS: "multiprocessing.Queue | None" = None
+
+# Workers put (call id, wall-clock start) on their pool's queue when a decode
+# begins; a future counts as running as soon as it is queued to a busy worker.
+_START_QUEUES: dict[ProcessPoolExecutor, "multiprocessing.Queue"] = {}
+_STARTED: dict[int, float] = {}
+_STARTS_LOCK = threading.Lock()
+_CALL_IDS = itertools.count()
+
+_WARM_POOL: ProcessPoolExecutor | None = None
+_WARM_WORKERS = 0
+_WARM_MODEL: Path | None = None
+_WARM_LOCK = threading.Lock()
+
+
+@dataclass
+class SectionJob:
+    name: str
+    prompt: str
+    fallback: str
+    max_tokens: int = prompts.DEFAULT_MAX_TOKENS
+    stop: list[str] = field(default_factory=lambda: list(prompts.STOP_SEQUENCES))
+    budget_s: float = DEFAULT_SECTION_SECONDS
+    attempts: int = DEFAULT_ATTEMPTS
+
+
+@dataclass
+class SectionResult:
+    name: str
+    text: str
+    source: str
+    seconds: float | None = None
+    reason: str | None = None
+    attempts: int = 0
+
+
+def default_workers(sections: int) -> int:
+    # Each worker holds a full model copy; keep at least two threads per context.
+    cpus = os.cpu_count() or 1
+    return max(1, min(sections, cpus // 2))
+
+
+def _init_worker(n_threads: int, model_path: Path | None, starts: "multiprocessing.Queue | None" = None) -> None:
+    global _WORKER_LLM, _WORKER_STARTS
+    _WORKER_LLM = generator.TinyLLM(n_threads=n_threads, model_path=model_path)
+    _WORKER_STARTS = starts
+
+
+def _noop() -> None:
+    return None
+
+
+def _new_pool(workers: int, model_path: Path | None) -> ProcessPoolExecutor:
+    n_threads = models.worker_threads(workers)
+    LOGGER.info("Starting %d LLM workers x %d threads (%s)", workers, n_threads, model_path)
+    context = multiprocessing.get_context("spawn")
+    starts = context.Queue()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(n_threads, model_path, starts),
+    )
+    with _STARTS_LOCK:
+        _START_QUEUES[pool] = starts
+    return pool
+
+
+def _forget_pool(pool: ProcessPoolExecutor) -> None:
+    with _STARTS_LOCK:
+        starts = _START_QUEUES.pop(pool, None)
+    if starts is not None:
+        starts.close()
+
+
+def _started_at(pool: ProcessPoolExecutor, call: int) -> float | None:
+    """Wall-clock time a worker began decoding ``call``, or ``None`` if it has not yet."""
+
+    with _STARTS_LOCK:
+        starts = _START_QUEUES.get(pool)
+        while starts is not None:
+            try:
+                stamp_call, stamp = starts.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            _STARTED[stamp_call] = stamp
+        if len(_STARTED) > 1000:
+            cutoff = time.time() - START_STAMP_TTL
+            for stale in [key for key, stamp in _STARTED.items() if stamp < cutoff]:
+                del _STARTED[stale]
+        return _STARTED.get(call)
+
+
+def keep_warm(workers: int | None = None, model_path: Path | None = None) -> bool:
+    """Start a persistent pool and load the model in every worker now.
+
+    Returns ``False`` (and does nothing) when no model is available.
+    """
+
+    global _WARM_POOL, _WARM_WORKERS, _WARM_MODEL
+    model_path = model_path or generator.default_model_path()
+    if not generator.model_available(model_path):
+        return False
+    workers = workers or default_workers(len(prompts.SECTION_MAX_TOKENS))
+    with _WARM_LOCK:
+        if _WARM_POOL is None:
+            _WARM_POOL, _WARM_WORKERS, _WARM_MODEL = _new_pool(workers, model_path), workers, model_path
+            # Workers start lazily; one trivial task each loads every model up front.
+            wait([_WARM_POOL.submit(_noop) for _ in range(workers)])
+    return True
+
+
+def _acquire(workers: int | None, sections: int, model_path: Path | None) -> tuple[ProcessPoolExecutor, bool]:
+    global _WARM_POOL
+    with _WARM_LOCK:
+        if _WARM_WORKERS and workers in (None, _WARM_WORKERS) and model_path == _WARM_MODEL:
+            if _WARM_POOL is None:
+                _WARM_POOL = _new_pool(_WARM_WORKERS, _WARM_MODEL)
+            return _WARM_POOL, True
+    return _new_pool(workers or default_workers(sections), model_path), False
+
+
+def _discard_warm(pool: ProcessPoolExecutor) -> None:
+    global _WARM_POOL
+    with _WARM_LOCK:
+        if _WARM_POOL is pool:
+            _WARM_POOL = None
+    _forget_pool(pool)
+
+
+def _generate(call: int, prompt: str, max_tokens: int, stop: list[str]) -> tuple[str | None, float]:
+    if _WORKER_STARTS is not None:
+        _WORKER_STARTS.put((call, time.time()))
+    start = time.monotonic()
+    text = _WORKER_LLM.generate(prompt, max_tokens=max_tokens, stop=stop) if _WORKER_LLM else None
+    return text, time.monotonic() - start
+
+
+def _fallback(job: SectionJob, reason: str, seconds: float | None = None, attempts: int = 0) -> SectionResult:
+    LOGGER.info("Section %s uses rule-based text (%s)", job.name, reason)
+    return SectionResult(job.name, job.fallback, RULES, seconds, reason, attempts)
+
+
+def _close(executor: ProcessPoolExecutor, busy: bool) -> None:
+    """Shut down a pool private to one call, terminating decodes that are still running."""
+
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=not busy, cancel_futures=True)
+    _forget_pool(executor)
+    if busy:
+        # Late sections have already fallen back; stop their decodes now.
+        for process in processes:
+            process.terminate()
+
+
+def _submit(executor: ProcessPoolExecutor, job: SectionJob) -> tuple[Future, int]:
+    call = next(_CALL_IDS)
+    return executor.submit(_generate, call, job.prompt, job.max_tokens, job.stop), call
+
+
+def _rejection(text: str | None, job: SectionJob) -> str | None:
+    if not text:
+        return "empty output"
+    issues = verify.problems(text, job.prompt)
+    return "unverified: " + "; ".join(issues) if issues else None
+
+
+def generate_sections(
+    jobs: list[SectionJob],
+    workers: int | None = None,
+    model_path: Path | None = None,
+    deadline_s: float | None = None,
+) -> dict[str, SectionResult]:
+    """Generate every section, falling back per section to its rule text.
+
+    ``model_path`` defaults to the model last selected on this machine;
+    ``deadline_s`` caps the whole call, including starting the workers.
+    """
+
+    if not jobs:
+        return {}
+    deadline = None if deadline_s is None else time.monotonic() + deadline_s
+    model_path = model_path or generator.default_model_path()
+    if not generator.model_available(model_path):
+        return {job.name: SectionResult(job.name, job.fallback, RULES, reason="model unavailable") for job in jobs}
+
+    executor, warm = _acquire(workers, len(jobs), model_path)
+    calls: dict[Future, int] = {}
+    try:
+        calls = dict(_submit(executor, job) for job in jobs)
+    except (BrokenProcessPool, RuntimeError):
+        # A worker of the shared pool died; start afresh.
+        _discard_warm(executor)
+        executor, warm = _acquire(workers, len(jobs), model_path)
+        calls = dict(_submit(executor, job) for job in jobs)
+    futures = dict(zip(calls, jobs))
+    started: dict[Future, float] = {}
+    # Per section, across attempts: when its first attempt started, attempts made and decode seconds.
+    clock: dict[str, float] = {}
+    tries = {job.name: 1 for job in jobs}
+    spent = {job.name: 0.0 for job in jobs}
+    results: dict[str, SectionResult] = {}
+    try:
+        while futures:
+            done, _ = wait(list(futures), timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in done:
+                job = futures.pop(future)
+                attempts = tries[job.name]
+                try:
+                    text, seconds = future.result()
+                except Exception as exc:
+                    results[job.name] = _fallback(job, f"error: {exc}", attempts=attempts)
+                    continue
+                clock.setdefault(job.name, now - seconds)
+                spent[job.name] += seconds
+                text = (text or "").strip()
+                rejection = _rejection(text, job)
+                if rejection is None:
+                    results[job.name] = SectionResult(job.name, text, LLM, spent[job.name], attempts=attempts)
+                elif (
+                    attempts < job.attempts
+                    and now - clock[job.name] < job.budget_s
+                    and (deadline is None or now < deadline)
+                ):
+                    LOGGER.info("Regenerating section %s (%s)", job.name, rejection)
+                    tries[job.name] += 1
+                    retry, calls[retry] = _submit(executor, job)
+                    futures[retry] = job
+                else:
+                    results[job.name] = _fallback(job, rejection, spent[job.name], attempts)
+            for future, job in list(futures.items()):
+                began = None if future in started else _started_at(executor, calls[future])
+                if began is not None:
+                    started[future] = now - max(0.0, time.time() - began)
+                    clock.setdefault(job.name, started[future])
+                if deadline is not None and now > deadline:
+                    reason = "report LLM time cap reached"
+                elif job.name in clock and now - clock[job.name] > job.budget_s:
+                    reason = "time budget exceeded"
+                else:
+                    continue
+                futures.pop(future)
+                future.cancel()
+                elapsed = now - clock[job.name] if job.name in clock else None
+                results[job.name] = _fallback(job, reason, elapsed, tries[job.name])
+    finally:
+        if warm:
+            # Other reports share these workers: drop this call's queued attempts only.
+            for future in futures:
+                future.cancel()
+        else:
+            _close(executor, any(not future.done() for future in started))
+        with _STARTS_LOCK:
+            for call in calls.values():
+                _STARTED.pop(call, None)
+    return {job.name: results[job.name] for job in jobs}
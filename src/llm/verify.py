@@ -0,0 +1,156 @@
+"""Check a generated paragraph against the facts in its prompt.
+
+Every figure in the paragraph must be a number the prompt contains (a fact
+value, its magnitude, or a number from the prompt text and fact labels such as
+"S&P 500", "US 10y" or "2s10s"), allowing for the paragraph rounding to fewer decimals. Figures
+with a unit attached are checked in that unit: "12 bp" against a 0.12
+percentage-point fact (or a 12 bp one), "1.2pp" as 1.2, "6.7k" as 6,700. A figure
+that matches only month-on-month facts must not sit next to a direction word
+that contradicts their sign ("rose 6.46%" for ``S&P 500 MoM -6.46%``).
+Years and tenors ("10-year", "30 yr") are not treated as figures.
+
+This is a few regular expressions per paragraph, cheap enough to run on every
+completion before it is accepted.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+FACTS_MARKER = "Facts:"
+NUMBER = re.compile(
+    r"(?<![\w.])(?P<sign>[-+−]?)(?P<digits>\d+(?:,\d{3})*(?:\.\d+)?)"
+    r"(?:st|nd|rd|th|(?P<unit>\s?(?:bps?|pp)|x|k|m|bn))?(?!\w)"
+)
+# Digits fused to a label token: "10y", "2s10s", "3m".
+LABEL_DIGITS = re.compile(r"(?<![\d.])\d+(?=[A-Za-z])")
+TENOR = re.compile(r"\d+[-\s](?:year|yr)s?\b", re.IGNORECASE)
+FACT_ITEM = re.compile(r"^(?P<label>.*?)\s(?P<value>-?\d+(?:\.\d+)?)(?P<unit>\D*)$")
+CLAUSE_BREAK = re.compile(r"[,;:()]|\.\s|\d")
+WORD = re.compile(r"[a-z]+")
+CHANGE_MARKERS = ("MoM",)
+BASIS_POINTS = "bp"
+# Unit of numbers taken from label tokens; they support names ("the 10-year"), not percentages.
+LABEL = "label"
+# Figures written in thousands, millions or billions.
+SCALES = {"k": 1e3, "m": 1e6, "bn": 1e9}
+# Words looked at before a figure for its direction.
+DIRECTION_WINDOW = 6
+YEARS = range(1900, 2101)
+
+UP = frozenset(
+    "rose rise rises rising risen gained gain gains climbed climb climbing advanced increased increase increasing up "
+    "higher jumped rallied strengthened appreciated steepened steepening firmed added surged".split()
+)
+DOWN = frozenset(
+    "fell fall falls falling fallen declined decline declining dropped drop lost down lower decreased decrease slipped "
+    "eased weakened depreciated flattened flattening slid retreated tumbled shed".split()
+)
+
+
+@dataclass(frozen=True)
+class PromptNumber:
+    value: float
+    label: str | None = None  # the fact it belongs to, if any
+    unit: str = ""
+
+    @property
+    def is_change(self) -> bool:
+        return self.label is not None and any(marker in self.label for marker in CHANGE_MARKERS)
+
+
+def _to_float(sign: str, digits: str) -> float:
+    value = float(digits.replace(",", ""))
+    return -value if sign in ("-", "−") else value
+
+
+def _decimals(digits: str) -> int:
+    return len(digits.split(".", 1)[1]) if "." in digits else 0
+
+
+def _unit(text: str | None) -> str:
+    unit = (text or "").strip()
+    return BASIS_POINTS if unit in ("bp", "bps") else unit
+
+
+def prompt_numbers(prompt: str) -> list[PromptNumber]:
+    """Fact values from the prompt's ``Facts:`` block, plus the numbers in its wording and fact labels."""
+
+    head, marker, block = prompt.rpartition(FACTS_MARKER)
+    if not marker:
+        head, block = prompt, ""
+    numbers, wording = [], [head]
+    for item in filter(None, (item.strip() for item in block.strip().rstrip(".").split("; "))):
+        match = FACT_ITEM.match(item)
+        if match:
+            numbers.append(PromptNumber(float(match["value"]), match["label"], _unit(match["unit"])))
+        wording.append(match["label"] if match else item)
+    numbers += [
+        PromptNumber(_to_float(number["sign"], number["digits"]), unit=_unit(number["unit"]))
+        for text in wording
+        for number in NUMBER.finditer(text)
+    ]
+    numbers += [PromptNumber(float(digits), unit=LABEL) for text in wording for digits in LABEL_DIGITS.findall(text)]
+    return numbers
+
+
+def _targets(unit: str, number: PromptNumber) -> list[float]:
+    """Values ``number`` may be written as in ``unit``."""
+
+    if number.unit == LABEL:
+        return [] if unit else [number.value]
+    if unit == BASIS_POINTS:
+        return [number.value if number.unit == BASIS_POINTS else number.value * 100]
+    if unit in SCALES:
+        return [number.value / SCALES[unit]]
+    if number.unit == BASIS_POINTS:
+        # "0.12pp" or "12 basis points" for a 12 bp fact.
+        return [number.value, number.value / 100]
+    return [number.value]
+
+
+def _matches(sign: str, digits: str, unit: str, candidate: PromptNumber) -> bool:
+    value = _to_float(sign, digits)
+    # A figure rounded to fewer decimals still matches ("3.4%" for 3.38).
+    tolerance = 0.5 * 10 ** -_decimals(digits) + 1e-9
+    return any(abs(value - (target if sign else abs(target))) <= tolerance for target in _targets(unit, candidate))
+
+
+def _direction(text: str, start: int) -> int:
+    """+1/-1 for an up/down word shortly before ``start`` in the same clause, else 0."""
+
+    clause = CLAUSE_BREAK.split(text[:start])[-1].lower()
+    words = WORD.findall(clause)[-DIRECTION_WINDOW:]
+    if words and words[-1] == "to":
+        # "rose to 4.2%" describes the new level, not the move.
+        return 0
+    up, down = any(word in UP for word in words), any(word in DOWN for word in words)
+    return 0 if up == down else (1 if up else -1)
+
+
+def problems(text: str, prompt: str) -> list[str]:
+    """Figures in ``text`` that the prompt does not support; empty when the paragraph checks out."""
+
+    numbers = prompt_numbers(prompt)
+    found = []
+    for match in NUMBER.finditer(text):
+        sign, digits, unit = match["sign"], match["digits"], _unit(match["unit"])
+        if not sign and not unit and "." not in digits:
+            if int(digits.replace(",", "")) in YEARS or TENOR.match(text, match.start("digits")):
+                continue
+        percent = text.startswith("%", match.end())
+        candidates = [
+            number
+            for number in numbers
+            if not (percent and number.unit == LABEL) and _matches(sign, digits, unit, number)
+        ]
+        if not candidates:
+            found.append(f"unsupported figure {match.group(0).strip()}")
+            continue
+        if sign or not all(number.is_change for number in candidates):
+            continue
+        direction = _direction(text, match.start())
+        if direction and all(direction * number.value < 0 for number in candidates):
+            found.append(f"direction of {match.group(0)} contradicts {candidates[0].label} {candidates[0].value:g}")
+    return found
@@ -0,0 +1,246 @@
+"""Run-wide load deadline with stale-while-revalidate fallback.
+
+Every series loader is submitted to a thread pool at the start of the load
+phase. Whatever has not finished when the deadline passes (or finished empty
+or with an error) is served from the last good copy cached by a previous run
+and flagged ``stale``: the copy loaded for the same window if there is one,
+otherwise (say, on the first run of a month) the newest copy loaded for any
+window, cut at the run's end. Loaders run on daemon threads: in a long-lived process
+(the server, ``--watch``) those still in flight keep running after the report
+has been written and refresh the last-good cache for the next run, while a
+one-shot CLI run exits without waiting for them. A
+:class:`SeriesMemo` lets a long-running process skip reloading series it
+fetched recently.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from ..utils.io import CACHE_DIR, cache_series, read_cached_series
+from ..utils.series import to_series
+from .vintage import record_vintage
+
+LOGGER = logging.getLogger(__name__)
+LAST_GOOD_PREFIX = "last_good_"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MEMO_TTL = 900.0
+
+FRESH = "fresh"
+STALE = "stale"
+MISSING = "missing"
+# Not due for refresh per the release calendar; last good copy reused on purpose.
+CACHED = "cached"
+# Rebuilt from the vintage store as known at an earlier time (``--as-of``).
+VINTAGE = "vintage"
+
+
+@dataclass
+class LoadResult:
+    key: str
+    series: pd.Series | None
+    status: str
+    seconds: float | None
+    cached_at: str | None = None
+    reason: str | None = None
+
+    def as_metrics(self) -> dict:
+        return {
+            "status": self.status,
+            "seconds": None if self.seconds is None else round(self.seconds, 3),
+            "rows": 0 if self.series is None else int(self.series.shape[0]),
+            "cached_at": self.cached_at,
+            "reason": self.reason,
+        }
+
+
+class SeriesMemo:
+    """In-process cache of fresh loads, for long-running callers such as the server."""
+
+    def __init__(self, ttl: float = DEFAULT_MEMO_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items: dict[str, tuple[pd.Series, float]] = {}
+
+    def get(self, key: str) -> pd.Series | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or time.monotonic() - item[1] > self.ttl:
+                self._items.pop(key, None)
+                return None
+            return item[0]
+
+    def put(self, key: str, series: pd.Series) -> None:
+        with self._lock:
+            self._items[key] = (series, time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _DaemonPool:
+    """Thread pool whose workers are daemons, so the interpreter never waits for a hung loader at exit.
+
+    (``ThreadPoolExecutor`` joins its workers at exit even after ``shutdown(wait=False)``.)
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.name = name
+        self._tasks: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        self._tasks.put((future, fn, args))
+        if len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._work, name=f"{self.name}_{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return future
+
+    def _work(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, fn, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    def shutdown(self) -> None:
+        """Let workers exit once the queued tasks are done; does not wait for them."""
+
+        for _ in self._threads:
+            self._tasks.put(None)
+
+
+class DeadlineLoader:
+    def __init__(
+        self,
+        deadline: float | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        memo: SeriesMemo | None = None,
+        scope: str = "",
+        until: pd.Timestamp | None = None,
+    ):
+        self.deadline = deadline
+        self.memo = memo
+        # Loads depend on the run window, so memo keys and last good copies are scoped by it.
+        self.scope = scope
+        # Last observation the run window can use; copies from other windows are cut here.
+        self.until = until
+        self._executor = _DaemonPool(max_workers, "load")
+        self._futures: dict[str, Future] = {}
+        self._memoised: dict[str, pd.Series] = {}
+        self._reused: dict[str, LoadResult] = {}
+        self._started = time.monotonic()
+
+    def reuse(self, key: str) -> bool:
+        """Serve ``key`` from its last good copy without fetching; ``False`` if none exists."""
+
+        cached, cached_at = read_cached_series(self._last_good(key))
+        if cached is None or cached.empty:
+            return False
+        self._reused[key] = LoadResult(key, cached, CACHED, 0.0, cached_at=cached_at, reason="not due")
+        return True
+
+    def _memo_key(self, key: str) -> str:
+        return f"{self.scope}|{key}"
+
+    def _last_good(self, key: str) -> str:
+        scope = re.sub(r"[^\w.-]+", "_", self.scope)
+        return f"{LAST_GOOD_PREFIX}{key}@{scope}" if scope else f"{LAST_GOOD_PREFIX}{key}"
+
+    def _fallback_copy(self, key: str) -> tuple[pd.Series | None, str | None]:
+        cached, cached_at = read_cached_series(self._last_good(key))
+        if cached is not None and not cached.empty:
+            return cached, cached_at
+        # Nothing for this window yet: serve the newest copy loaded for any window.
+        names = [path.stem for path in CACHE_DIR.glob(f"{LAST_GOOD_PREFIX}{key}@*.csv")]
+        best: tuple[pd.Series | None, str | None] = (None, None)
+        for name in names + [f"{LAST_GOOD_PREFIX}{key}"]:
+            cached, cached_at = read_cached_series(name)
+            if cached is None:
+                continue
+            if self.until is not None:
+                cached = cached.loc[: self.until]
+            if not cached.empty and (best[0] is None or (cached_at or "") > (best[1] or "")):
+                best = (cached, cached_at)
+        return best
+
+    def submit(self, key: str, fn: Callable[..., pd.Series | None], *args) -> None:
+        if self.memo is not None:
+            cached = self.memo.get(self._memo_key(key))
+            if cached is not None:
+                self._memoised[key] = cached
+                return
+        self._futures[key] = self._executor.submit(self._run, key, fn, *args)
+
+    def _run(self, key: str, fn: Callable[..., pd.Series | None], *args) -> tuple[pd.Series | None, float]:
+        start = time.monotonic()
+        raw = fn(*args)
+        series = to_series(raw) if raw is not None else None
+        if series is not None and not series.empty:
+            cache_series(series, self._last_good(key))
+            record_vintage(key, series)
+        return series, time.monotonic() - start
+
+    def _remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - self._started))
+
+    def _stale(self, key: str, reason: str, seconds: float | None) -> LoadResult:
+        cached, cached_at = self._fallback_copy(key)
+        if cached is None or cached.empty:
+            LOGGER.warning("%s unavailable (%s) and no cached copy exists", key, reason)
+            return LoadResult(key, None, MISSING, seconds, reason=reason)
+        LOGGER.warning("%s unavailable (%s); serving cached copy from %s", key, reason, cached_at)
+        return LoadResult(key, cached, STALE, seconds, cached_at=cached_at, reason=reason)
+
+    def collect(self) -> dict[str, LoadResult]:
+        """Wait until every loader finishes or the deadline passes."""
+
+        done, _ = wait(list(self._futures.values()), timeout=self._remaining())
+        results = {key: LoadResult(key, series, FRESH, 0.0, reason="memory") for key, series in self._memoised.items()}
+        results.update(self._reused)
+        for key, future in self._futures.items():
+            if future not in done:
+                elapsed = time.monotonic() - self._started
+                results[key] = self._stale(key, "deadline exceeded", elapsed)
+                continue
+            exc = future.exception()
+            if exc is not None:
+                results[key] = self._stale(key, f"error: {exc}", None)
+                continue
+            series, seconds = future.result()
+            if series is None or series.empty:
+                results[key] = self._stale(key, "empty", seconds)
+                continue
+            results[key] = LoadResult(key, series, FRESH, seconds)
+            if self.memo is not None:
+                self.memo.put(self._memo_key(key), series)
+        pending = [key for key, future in self._futures.items() if not future.done()]
+        if pending:
+            LOGGER.info("Continuing refresh in background for: %s", ", ".join(pending))
+        # Unfinished loaders keep running (while the process does) and update the last-good cache.
+        self._executor.shutdown()
+        return results
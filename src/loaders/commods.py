@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import os
 import logging
+from functools import partial
 
 import pandas as pd
 import requests
 
+from .health import first_available
 from .yahoo import fetch_series
 from ..utils.io import cache_series
 from ..transforms.fill import month_last, mom_pct
@@ -28,30 +30,30 @@ def load_brent(month, lookback):
     return month_last(s)
 
 
+def _yahoo_iron_ore(ticker: str, month, lookback):
+    s = month_last(fetch_series(ticker, month, lookback))
+    s.name = "IRONORE"
+    return s
+
+
+def _te_iron_ore(te_series: str, key: str):
+    url = f"https://api.tradingeconomics.com/commodities/{te_series}?c=guest:{key}&format=json"
+    resp = requests.get(url, timeout=45)
+    resp.raise_for_status()
+    js = resp.json()
+    df = pd.DataFrame(js)
+    if "Date" not in df.columns or "Value" not in df.columns:
+        return None
+    series = pd.Series(df["Value"].values, index=pd.to_datetime(df["Date"]), name="IRONORE")
+    series = series.sort_index()
+    series = month_last(series)
+    cache_series(series, "te_ironore")
+    return series
+
+
 def load_iron_ore(month, lookback, candidates: list[str], te_series: str | None):
-    for ticker in candidates:
-        try:
-            s = fetch_series(ticker, month, lookback)
-            s = month_last(s)
-            if not s.dropna().empty:
-                s.name = "IRONORE"
-                return s
-        except Exception:
-            continue
+    sources = [(f"yahoo:{ticker}", partial(_yahoo_iron_ore, ticker, month, lookback)) for ticker in candidates]
     key = os.getenv("TE_API_KEY")
     if key and te_series:
-        try:
-            url = f"https://api.tradingeconomics.com/commodities/{te_series}?c=guest:{key}&format=json"
-            resp = requests.get(url, timeout=45)
-            resp.raise_for_status()
-            js = resp.json()
-            df = pd.DataFrame(js)
-            if "Date" in df.columns and "Value" in df.columns:
-                series = pd.Series(df["Value"].values, index=pd.to_datetime(df["Date"]), name="IRONORE")
-                series = series.sort_index()
-                series = month_last(series)
-                cache_series(series, "te_ironore")
-                return series
-        except Exception as exc:
-            LOGGER.warning("TradingEconomics iron ore fetch failed: %s", exc)
-    return None
+        sources.append((f"tradingeconomics:{te_series}", partial(_te_iron_ore, te_series, key)))
+    return first_available("iron_ore", sources)
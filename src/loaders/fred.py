@@ -1,38 +1,152 @@
+"""FRED series, fetched together.
+
+:func:`fred_many` downloads every requested series in one
+``fredgraph.csv?id=A,B,...`` request. Any series missing from that response
+falls back on its own to ``pandas_datareader`` and then to the single-series
+CSV endpoints, so one bad id never costs the others. Results are memoised
+briefly per series and start date, and a series already being fetched by
+another thread is waited for (on that thread's whole batch, fallbacks
+included) rather than requested again; :func:`fred_prefetch` starts the batch
+for a run before the individual loaders ask for their series.
+"""
+
+import io
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
 import pandas as pd
-from pandas_datareader import data as pdr
 import requests
-import io
+from pandas_datareader import data as pdr
 
+from ..transforms import derived
 from ..utils.io import cache_series
 
+LOGGER = logging.getLogger(__name__)
+FRED_GRAPH_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+FRED_DATA_URL = "https://fred.stlouisfed.org/data/{series}.csv"
+DEFAULT_START = "2000-01-01"
+REQUEST_TIMEOUT = 30
+MEMO_TTL = 600.0
+
+_LOCK = threading.Lock()
+_MEMO: dict[tuple[str, str], tuple[float, pd.Series]] = {}
+_INFLIGHT: dict[tuple[str, str], Future] = {}
+
+
+def _empty(series: str) -> pd.Series:
+    return pd.Series(dtype=float, index=pd.DatetimeIndex([]), name=series)
+
+
+def _parse_csv(text: str) -> pd.DataFrame:
+    df = pd.read_csv(io.StringIO(text))
+    # FRED has used both "DATE" and "observation_date" for the date column.
+    date_col = df.columns[0]
+    df[date_col] = pd.to_datetime(df[date_col])
+    df = df.set_index(date_col)
+    # Missing observations are published as ".".
+    return df.apply(pd.to_numeric, errors="coerce")
+
+
+def _fetch_batch(ids: list[str], start: str) -> dict[str, pd.Series]:
+    try:
+        r = requests.get(FRED_GRAPH_URL, params={"id": ",".join(ids), "cosd": start}, timeout=REQUEST_TIMEOUT)
+        r.raise_for_status()
+        frame = _parse_csv(r.text)
+    except Exception as exc:
+        LOGGER.warning("[FRED] Batch request for %s failed: %s", ",".join(ids), exc)
+        return {}
+    return {sid: frame[sid].dropna().rename(sid) for sid in ids if sid in frame.columns and frame[sid].notna().any()}
+
 
-def fred_series(series: str, start="2000-01-01"):
+def _fetch_single(series: str, start: str) -> pd.Series:
     try:
-        s = pdr.DataReader(series, "fred", start=start)
-        s = s.dropna()
-        s.name = series
-        cache_series(s, f"fred_{series}")
-        return s[series] if hasattr(s, "columns") else s
+        s = pdr.DataReader(series, "fred", start=start).dropna()
+        return (s[series] if hasattr(s, "columns") else s).rename(series)
     except Exception as exc:
-        # CSV fallback for CPIAUCSL
-        if series == "CPIAUCSL":
-            url = "https://fred.stlouisfed.org/data/" + series + ".csv"
-            try:
-                r = requests.get(url, timeout=30)
-                r.raise_for_status()
-                df = pd.read_csv(io.StringIO(r.text))
-                df["DATE"] = pd.to_datetime(df["DATE"])
-                s = pd.Series(df[series].values, index=df["DATE"], name=series)
-                s = s.dropna()
-                cache_series(s, f"fred_{series}_csv")
-                return s
-            except Exception as exc2:
-                print(f"[FRED Fallback] Failed to fetch {series} from CSV: {exc2}")
-                return pd.Series(dtype=float, name=series)
-        print(f"[FRED] Failed to fetch {series}: {exc}")
-        return pd.Series(dtype=float, name=series)
+        LOGGER.info("[FRED] DataReader failed for %s: %s; trying CSV", series, exc)
+    for url in (f"{FRED_GRAPH_URL}?id={series}&cosd={start}", FRED_DATA_URL.format(series=series)):
+        try:
+            r = requests.get(url, timeout=REQUEST_TIMEOUT)
+            r.raise_for_status()
+            frame = _parse_csv(r.text)
+            s = frame[series].dropna().rename(series)
+            cache_series(s, f"fred_{series}_csv")
+            return s
+        except Exception as exc:
+            LOGGER.info("[FRED] CSV fallback %s failed for %s: %s", url, series, exc)
+    LOGGER.warning("[FRED] Failed to fetch %s", series)
+    return _empty(series)
+
+
+def _claim(ids: list[str], start: str) -> tuple[dict[str, pd.Series], dict[str, Future], list[str], Future]:
+    """Split ``ids`` into memoised results, fetches in flight and ids to fetch now.
+
+    The ids to fetch now are registered under the returned batch future, which
+    the caller must complete with :func:`_fetch`.
+    """
+
+    ready, waiting, fetch = {}, {}, []
+    batch: Future = Future()
+    now = time.monotonic()
+    with _LOCK:
+        for sid in ids:
+            memo = _MEMO.get((sid, start))
+            if memo is not None and now - memo[0] < MEMO_TTL:
+                ready[sid] = memo[1]
+            elif (sid, start) in _INFLIGHT:
+                waiting[sid] = _INFLIGHT[sid, start]
+            else:
+                _INFLIGHT[sid, start] = batch
+                fetch.append(sid)
+    return ready, waiting, fetch, batch
+
+
+def _fetch(ids: list[str], start: str, batch: Future) -> dict[str, pd.Series]:
+    fetched: dict[str, pd.Series] = {}
+    try:
+        fetched = _fetch_batch(ids, start) if ids else {}
+        for sid in ids:
+            if sid not in fetched:
+                fetched[sid] = _fetch_single(sid, start)
+            if not fetched[sid].empty:
+                cache_series(fetched[sid], f"fred_{sid}")
+    finally:
+        with _LOCK:
+            now = time.monotonic()
+            for sid in ids:
+                if sid in fetched and not fetched[sid].empty:
+                    _MEMO[sid, start] = (now, fetched[sid])
+                _INFLIGHT.pop((sid, start))
+        batch.set_result(fetched)
+    return fetched
+
+
+def fred_many(ids: list[str], start: str = DEFAULT_START) -> dict[str, pd.Series]:
+    """Fetch several FRED series in (usually) one request; failures are per series."""
+
+    ids = list(dict.fromkeys(ids))
+    ready, waiting, fetch, batch = _claim(ids, start)
+    ready.update(_fetch(fetch, start, batch))
+    for sid, future in waiting.items():
+        # No timeout of its own: the batch ends once its requests time out, and
+        # the run's load deadline bounds how long a loader waits on it.
+        ready[sid] = future.result().get(sid, _empty(sid))
+    return {sid: ready.get(sid, _empty(sid)).loc[start:] for sid in ids}
+
+
+def fred_prefetch(ids: list[str], start: str = DEFAULT_START) -> None:
+    """Start fetching ``ids`` in the background; later calls wait for this batch."""
+
+    _, _, fetch, batch = _claim(list(dict.fromkeys(ids)), start)
+    if fetch:
+        threading.Thread(target=_fetch, args=(fetch, start, batch), name="fred-prefetch", daemon=True).start()
+
+
+def fred_series(series: str, start=DEFAULT_START):
+    return fred_many([series], start)[series]
 
 
 def yoy(series: pd.Series):
-    m = series.resample("M").last()
-    return ((m / m.shift(12) - 1.0) * 100.0).rename(series.name + "_YoY%")
+    return derived.yoy(series).rename(series.name + "_YoY%")
@@ -0,0 +1,161 @@
+"""Persistent provider health tracking and circuit breaking.
+
+Loaders describe each series as an ordered list of ``(provider, fetch)``
+candidates. :func:`first_available` tries them in that order, consulting the
+health store in ``data/cache/provider_health.json``, which records successes,
+failures, empty responses and latency per (provider, series). A provider that
+fails ``FAILURE_THRESHOLD`` times in a row has its circuit opened and is
+skipped; after ``PROBE_EVERY`` skipped attempts (counted
+in the store, so across runs) it is probed once more, and a success closes the
+circuit again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from ..utils.io import CACHE_DIR, file_lock, write_atomic
+from .yahoo import LoaderEmptyError
+
+LOGGER = logging.getLogger(__name__)
+HEALTH_PATH = CACHE_DIR / "provider_health.json"
+FAILURE_THRESHOLD = 3
+PROBE_EVERY = 3
+LATENCY_ALPHA = 0.3
+
+Candidate = tuple[str, Callable[[], "pd.Series | None"]]
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class ProviderHealth:
+    def __init__(self, path: Path = HEALTH_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        self._reload()
+
+    def _reload(self) -> None:
+        """Pick up what other processes (job workers, the server) have recorded."""
+
+        if self.path.exists():
+            try:
+                self._stats.update(json.loads(self.path.read_text()))
+            except Exception as exc:
+                LOGGER.warning("Ignoring unreadable provider health file %s: %s", self.path, exc)
+
+    @staticmethod
+    def _key(provider: str, series: str) -> str:
+        return f"{provider}|{series}"
+
+    def stats(self, provider: str, series: str) -> dict:
+        return self._stats.get(self._key(provider, series), {})
+
+    def is_open(self, provider: str, series: str) -> bool:
+        return self.stats(provider, series).get("consecutive_failures", 0) >= FAILURE_THRESHOLD
+
+    def allow(self, provider: str, series: str) -> bool:
+        """Return whether to call ``provider`` now; counts skips while open."""
+
+        if not self.is_open(provider, series):
+            return True
+        with self._lock, file_lock(self.path):
+            self._reload()
+            st = self._stats.setdefault(self._key(provider, series), {})
+            if st.get("consecutive_failures", 0) < FAILURE_THRESHOLD:
+                return True
+            st["skipped"] = st.get("skipped", 0) + 1
+            probe = st["skipped"] > PROBE_EVERY
+            if probe:
+                st["skipped"] = 0
+                LOGGER.info("Probing %s for %s (circuit half-open)", provider, series)
+            self._save()
+            return probe
+
+    def record(self, provider: str, series: str, ok: bool, latency: float, empty: bool = False) -> None:
+        with self._lock, file_lock(self.path):
+            self._reload()
+            st = self._stats.setdefault(self._key(provider, series), {})
+            previous = st.get("latency_s")
+            st["latency_s"] = latency if previous is None else (1 - LATENCY_ALPHA) * previous + LATENCY_ALPHA * latency
+            if ok:
+                st["successes"] = st.get("successes", 0) + 1
+                st["consecutive_failures"] = 0
+                st["skipped"] = 0
+                st["last_success"] = _now()
+            else:
+                st["failures"] = st.get("failures", 0) + 1
+                st["empties"] = st.get("empties", 0) + int(empty)
+                st["consecutive_failures"] = st.get("consecutive_failures", 0) + 1
+                st["last_failure"] = _now()
+                if st["consecutive_failures"] == FAILURE_THRESHOLD:
+                    LOGGER.warning("Opening circuit for %s on %s after %d failures", provider, series, FAILURE_THRESHOLD)
+            self._save()
+
+    def _save(self) -> None:
+        try:
+            write_atomic(self.path, json.dumps(self._stats, indent=1, sort_keys=True))
+        except Exception as exc:
+            LOGGER.warning("Failed to persist provider health: %s", exc)
+
+
+_HEALTH: ProviderHealth | None = None
+
+
+def get_health() -> ProviderHealth:
+    global _HEALTH
+    if _HEALTH is None:
+        _HEALTH = ProviderHealth()
+    return _HEALTH
+
+
+def _is_empty(series: pd.Series | None) -> bool:
+    return series is None or pd.Series(series).dropna().empty
+
+
+def first_available(series: str, candidates: list[Candidate], health: ProviderHealth | None = None) -> pd.Series | None:
+    """Return the first non-empty result from ``candidates``, skipping open circuits."""
+
+    health = health or get_health()
+    allowed: list[Candidate] = []
+    skipped: list[Candidate] = []
+    # Ask about every candidate up front so open circuits count a skip on each
+    # call, even when an earlier provider answers, and are probed in their turn.
+    for provider, fetch in candidates:
+        (allowed if health.allow(provider, series) else skipped).append((provider, fetch))
+    for provider, fetch in allowed:
+        result = _attempt(health, series, provider, fetch)
+        if result is not None:
+            return result
+    if not allowed and skipped:
+        # Every circuit is open; probing the best one beats returning nothing.
+        provider, fetch = skipped[0]
+        LOGGER.info("All providers for %s are open; probing %s", series, provider)
+        return _attempt(health, series, provider, fetch)
+    return None
+
+
+def _attempt(health: ProviderHealth, series: str, provider: str, fetch: Callable[[], pd.Series | None]) -> pd.Series | None:
+    start = time.monotonic()
+    try:
+        result = fetch()
+    except LoaderEmptyError:
+        health.record(provider, series, False, time.monotonic() - start, empty=True)
+        return None
+    except Exception as exc:
+        LOGGER.warning("%s failed for %s: %s", provider, series, exc)
+        health.record(provider, series, False, time.monotonic() - start)
+        return None
+    empty = _is_empty(result)
+    health.record(provider, series, not empty, time.monotonic() - start, empty=empty)
+    return None if empty else result
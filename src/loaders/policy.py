@@ -1,9 +1,9 @@
-from .fred import fred_series
+from .fred import fred_many
 from .rba import au_cash_rate_series
 
 
 def fed_funds():
-    return fred_series("FEDFUNDS")
+    return fred_many(["FEDFUNDS"])["FEDFUNDS"]
 
 
 def rba_cash():
@@ -1,5 +1,8 @@
 import io
 import logging
+import re
+import threading
+import time
 
 import pandas as pd
 import requests
@@ -10,6 +13,11 @@ from ..transforms.fill import ensure_datetime_index, month_last
 RBA_CASH_URL = "https://www.rba.gov.au/statistics/cash-rate.csv"
 RBA_10Y_URL = "https://www.rba.gov.au/statistics/tables/csv/f16.1-data.csv"
 LOGGER = logging.getLogger(__name__)
+TENOR_PATTERN = re.compile(r"(\d+(?:\.\d+)?)[ -]?year", re.IGNORECASE)
+F16_TTL = 600.0
+
+_F16_LOCK = threading.Lock()
+_F16: tuple[float, bytes | None] | None = None
 
 
 def au_cash_rate_series():
@@ -64,33 +72,63 @@ def au_government_10y_series():
             return s
         except Exception as exc:
             LOGGER.warning("Manual AU 10y CSV failed: %s", exc)
-    try:
-        r = requests.get(RBA_10Y_URL, timeout=45)
-        r.raise_for_status()
-        raw_df = pd.read_csv(io.BytesIO(r.content))
-    except Exception as exc:
-        LOGGER.warning("Failed to download RBA 10y yields: %s", exc)
+    frame = rba_curve_frame()
+    if frame is None:
         return None
+    if 10.0 not in frame.columns:
+        LOGGER.warning("No 10-year column detected in RBA data: %s", list(frame.columns))
+        return None
+    series = frame[10.0].dropna().rename("AU10Y")
+    monthly = month_last(series)
+    cache_series(monthly, "rba_au10y_monthly")
+    return monthly
+
+
+def _f16_csv() -> bytes | None:
+    """The f16.1 CSV, downloaded at most once per ``F16_TTL`` seconds.
+
+    The lock is held during the download, so concurrent callers (the 10y
+    fallback and every curve tenor) wait for one request. Returns ``None``
+    if the download failed.
+    """
+
+    global _F16
+    with _F16_LOCK:
+        if _F16 is not None and time.monotonic() - _F16[0] < F16_TTL:
+            return _F16[1]
+        content = None
+        try:
+            r = requests.get(RBA_10Y_URL, timeout=45)
+            r.raise_for_status()
+            content = r.content
+        except Exception as exc:
+            LOGGER.warning("Failed to download RBA f16.1 yields: %s", exc)
+        # A failure is remembered too, so the other tenors do not retry it.
+        _F16 = (time.monotonic(), content)
+        return content
 
+
+def rba_curve_frame() -> pd.DataFrame | None:
+    """Every government bond tenor in f16.1 as a (date x tenor years) frame."""
+
+    content = _f16_csv()
+    if content is None:
+        return None
     try:
-        df = raw_df.copy()
-        df = df.dropna(how="all")
-        first_col = df.columns[0]
-        df = df[df[first_col].notna()]
-        df[first_col] = pd.to_datetime(df[first_col], errors="coerce")
-        df = df.dropna(subset=[first_col])
-        value_cols = [
-            c for c in df.columns if "10" in str(c) and "year" in str(c).lower()
-        ]
-        if not value_cols:
-            LOGGER.warning("No 10-year column detected in RBA data: %s", df.columns)
-            return None
-        series = pd.Series(df[value_cols[0]].values, index=df[first_col], name="AU10Y")
-        series = series.astype(float).dropna()
-        series = ensure_datetime_index(series)
-        monthly = month_last(series)
-        cache_series(monthly, "rba_au10y_monthly")
-        return monthly
+        raw = pd.read_csv(io.BytesIO(content), header=None, dtype=str, skip_blank_lines=False)
+        # Column titles sit in the first row naming "<n> year" tenors; metadata rows may precede it.
+        titles = next(row for _, row in raw.iterrows() if any(TENOR_PATTERN.search(str(cell)) for cell in row))
+        tenors = {}
+        for position, title in enumerate(titles.astype(str)):
+            match = TENOR_PATTERN.search(title)
+            if match and "index" not in title.lower() and float(match.group(1)) not in tenors.values():
+                tenors[position] = float(match.group(1))
+        dates = pd.to_datetime(raw.iloc[:, 0], errors="coerce", dayfirst=True, format="mixed")
+        body = raw[dates.notna()]
+        frame = body.iloc[:, list(tenors)].apply(pd.to_numeric, errors="coerce")
+        frame.columns = list(tenors.values())
+        frame.index = pd.DatetimeIndex(dates[dates.notna()])
+        return ensure_datetime_index(frame.sort_index().sort_index(axis=1).dropna(how="all").rename_axis(None))
     except Exception as exc:
-        LOGGER.warning("Failed to parse RBA 10y yields: %s", exc)
+        LOGGER.warning("Failed to parse RBA f16.1 yields: %s", exc)
         return None
@@ -0,0 +1,219 @@
+"""Release-calendar-aware refresh scheduling.
+
+Each series has a release cadence configured under ``refresh`` in
+``config/markets.yml``:
+
+* ``daily``: every weekday at ``hour`` UTC (market closes);
+* ``monthly``: on ``release_day`` of every month;
+* ``quarterly``: on ``release_day`` of each month listed in ``months``;
+* ``meetings``: on each of the listed ``dates`` (policy decisions).
+
+A series is *due* when a scheduled release has passed since it was last
+fetched for the same run window. For :data:`LATE_GRACE` after a release it
+also stays due until that release's data has arrived: an observation dated
+on or after the release day (or the newest day the run window can load, if
+earlier), or for series dated to their reference period, like CPI, a newer
+observation than the series held before the release. A release landing a
+little late is therefore picked up by the next poll, while a release that
+adds nothing (a holiday, an unchanged policy rate) stops being polled once
+the grace period ends. :class:`RefreshState` keeps fetch times and the
+newest observation per series in ``data/cache/refresh_state.json``.
+"""
+
+from __future__ import annotations
+
+import calendar
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from ..utils.io import CACHE_DIR, file_lock, write_atomic
+
+LOGGER = logging.getLogger(__name__)
+STATE_PATH = CACHE_DIR / "refresh_state.json"
+
+DAILY = "daily"
+MONTHLY = "monthly"
+QUARTERLY = "quarterly"
+MEETINGS = "meetings"
+CADENCES = (DAILY, MONTHLY, QUARTERLY, MEETINGS)
+# How long after a release a series is re-fetched while its data has not shown up.
+LATE_GRACE = timedelta(hours=6)
+
+
+@dataclass(frozen=True)
+class ReleaseSpec:
+    cadence: str = DAILY
+    release_day: int = 1
+    hour: int = 0
+    months: tuple[int, ...] = tuple(range(1, 13))
+    dates: tuple[datetime, ...] = ()
+
+    @classmethod
+    def parse(cls, raw: str | dict) -> "ReleaseSpec":
+        if isinstance(raw, str):
+            raw = {"cadence": raw}
+        cadence = raw.get("cadence", DAILY)
+        if cadence not in CADENCES:
+            raise ValueError(f"Unknown release cadence {cadence!r}; expected one of {', '.join(CADENCES)}")
+        hour = int(raw.get("hour", 0))
+        months = tuple(int(m) for m in raw.get("months", range(1, 13)))
+        dates = tuple(sorted(datetime.fromisoformat(str(d)).replace(hour=hour) for d in raw.get("dates", [])))
+        return cls(cadence, int(raw.get("release_day", 1)), hour, months, dates)
+
+    def _on(self, year: int, month: int) -> datetime:
+        day = min(self.release_day, calendar.monthrange(year, month)[1])
+        return datetime(year, month, day, self.hour)
+
+    def last_release(self, now: datetime) -> datetime | None:
+        """Most recent scheduled release at or before ``now``."""
+
+        if self.cadence == DAILY:
+            moment = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+            if moment > now:
+                moment -= timedelta(days=1)
+            while moment.weekday() >= 5:
+                moment -= timedelta(days=1)
+            return moment
+        if self.cadence == MEETINGS:
+            past = [d for d in self.dates if d <= now]
+            return past[-1] if past else None
+        year, month = now.year, now.month
+        for _ in range(13):
+            if month in self.months and self._on(year, month) <= now:
+                return self._on(year, month)
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return None
+
+    def next_release(self, now: datetime) -> datetime | None:
+        """First scheduled release strictly after ``now``."""
+
+        if self.cadence == DAILY:
+            moment = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+            if moment <= now:
+                moment += timedelta(days=1)
+            while moment.weekday() >= 5:
+                moment += timedelta(days=1)
+            return moment
+        if self.cadence == MEETINGS:
+            upcoming = [d for d in self.dates if d > now]
+            return upcoming[0] if upcoming else None
+        year, month = now.year, now.month
+        for _ in range(13):
+            if month in self.months and self._on(year, month) > now:
+                return self._on(year, month)
+            year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+        return None
+
+
+class ReleaseCalendar:
+    def __init__(self, config: dict | None = None):
+        config = config or {}
+        self.default = ReleaseSpec.parse(config.get("default", DAILY))
+        self.specs = {key: ReleaseSpec.parse(raw) for key, raw in (config.get("series") or {}).items()}
+
+    def spec(self, key: str) -> ReleaseSpec:
+        return self.specs.get(key, self.default)
+
+    def next_release(self, keys: list[str], now: datetime) -> datetime | None:
+        upcoming = [moment for key in keys if (moment := self.spec(key).next_release(now)) is not None]
+        return min(upcoming, default=None)
+
+
+@dataclass(frozen=True)
+class Fetch:
+    """Last successful fetch of a series and the newest observation it held."""
+
+    fetched_at: datetime
+    latest: datetime | None = None
+    # When ``latest`` last moved forward, i.e. when new data last arrived.
+    changed_at: datetime | None = None
+
+
+def _parse(stamp: str | None) -> datetime | None:
+    return datetime.fromisoformat(stamp.rstrip("Z")) if stamp else None
+
+
+class RefreshState:
+    """Last successful fetch per series and the run scope it was fetched for."""
+
+    def __init__(self, path: Path = STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state: dict[str, dict] = {}
+        self._reload()
+
+    def _reload(self) -> None:
+        if self.path.exists():
+            try:
+                self._state.update(json.loads(self.path.read_text()))
+            except Exception as exc:
+                LOGGER.warning("Ignoring unreadable refresh state %s: %s", self.path, exc)
+
+    def last_fetch(self, key: str, scope: str) -> Fetch | None:
+        entry = self._state.get(key)
+        if not entry or entry.get("scope") != scope:
+            return None
+        return Fetch(_parse(entry["fetched_at"]), _parse(entry.get("latest")), _parse(entry.get("changed_at")))
+
+    def record(self, latest: dict[str, datetime | None], scope: str, when: datetime | None = None) -> None:
+        """Record a fetch of each key in ``latest``, mapped to its newest observation date."""
+
+        stamp = (when or datetime.utcnow()).isoformat() + "Z"
+        with self._lock, file_lock(self.path):
+            # Merge with what other processes recorded since this state was read.
+            self._reload()
+            for key, observed in latest.items():
+                entry = {"fetched_at": stamp, "scope": scope, "latest": None, "changed_at": stamp}
+                if observed is not None:
+                    entry["latest"] = observed.isoformat()
+                previous = self._state.get(key) or {}
+                if previous.get("scope") == scope and previous.get("latest") == entry["latest"]:
+                    entry["changed_at"] = previous.get("changed_at", stamp)
+                self._state[key] = entry
+            try:
+                write_atomic(self.path, json.dumps(self._state, indent=1, sort_keys=True))
+            except Exception as exc:
+                LOGGER.warning("Failed to persist refresh state: %s", exc)
+
+
+def _business_day(moment: datetime) -> date:
+    day = moment.date()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def is_due(spec: ReleaseSpec, last: Fetch | None, now: datetime, newest: datetime | None = None) -> bool:
+    """Whether a series needs fetching; ``newest`` is the latest date the run window can load."""
+
+    if last is None:
+        return True
+    released = spec.last_release(now)
+    if released is None:
+        return False
+    expected = _business_day(min(released, newest) if newest is not None else released)
+    if newest is not None and newest < released and last.latest is not None and last.latest.date() >= expected:
+        # Already holds everything the run window can load; later releases add nothing to it.
+        return False
+    if released > last.fetched_at:
+        return True
+    if last.latest is None or last.changed_at is None or now - released >= LATE_GRACE:
+        return False
+    # Fetched since the release, but keep polling for a while until its data shows up.
+    return last.latest.date() < expected and last.changed_at < released
+
+
+def due_series(
+    keys: list[str],
+    scope: str,
+    release_calendar: ReleaseCalendar,
+    state: RefreshState,
+    now: datetime | None = None,
+    newest: datetime | None = None,
+) -> set[str]:
+    now = now or datetime.utcnow()
+    return {key for key in keys if is_due(release_calendar.spec(key), state.last_fetch(key, scope), now, newest)}
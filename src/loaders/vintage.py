@@ -0,0 +1,192 @@
+"""Point-in-time (vintage) store of every loaded series.
+
+``cache_series`` keeps only the latest download, so revised data (FRED and ABS
+CPI, RBA tables) silently changes old reports. :class:`VintageStore` keeps
+every observation with the time it was first fetched, in SQLite
+(``data/vintages.db``). A fetch stores only the observations that are new or
+whose value changed since the previous vintage; an observation missing from
+a fetch is not a deletion, because loaders download lookback windows.
+
+:meth:`VintageStore.as_of` rebuilds a series as it was known at a given time:
+for each date, the value from the latest fetch at or before it. That is one
+indexed ``GROUP BY`` over the ``(series, date, known_from)`` primary key, so
+reproducing a report needs no download and no full copy per vintage.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..utils.io import ensure_directory
+from ..utils.series import to_series
+
+LOGGER = logging.getLogger(__name__)
+ROOT = Path(__file__).resolve().parents[2]
+VINTAGE_DB = ROOT / "data" / "vintages.db"
+# Values closer than this (relative) are the same observation re-downloaded.
+REVISION_RTOL = 1e-12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    series_id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    known_from REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, date, known_from)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vintages (
+    series_id INTEGER NOT NULL,
+    fetched REAL NOT NULL,
+    changed INTEGER NOT NULL,
+    PRIMARY KEY (series_id, fetched)
+) WITHOUT ROWID;
+"""
+
+
+def _epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.values.astype("datetime64[s]").astype(np.int64)
+
+
+def parse_as_of(value: str) -> float:
+    """Unix time for ``value``; a bare date means the end of that day (UTC)."""
+
+    stamp = pd.Timestamp(value)
+    if stamp.tz is not None:
+        stamp = stamp.tz_convert(None)
+    if len(value.strip()) == 10:
+        stamp += pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    return stamp.tz_localize(timezone.utc).timestamp()
+
+
+def format_time(when: float) -> str:
+    return datetime.fromtimestamp(when, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    ensure_directory(path.parent)
+    conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class VintageStore:
+    def __init__(self, path: Path = VINTAGE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not cross threads; loaders record from a pool.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def _series_id(self, key: str) -> int | None:
+        row = self._conn().execute("SELECT id FROM series WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _view(self, series_id: int, when: float) -> pd.Series:
+        # SQLite takes the bare ``value`` column from the row holding MAX(known_from).
+        rows = self._conn().execute(
+            "SELECT date, value, MAX(known_from) FROM observations"
+            " WHERE series_id = ? AND known_from <= ? GROUP BY date ORDER BY date",
+            (series_id, when),
+        ).fetchall()
+        if not rows:
+            return pd.Series(dtype=float)
+        dates, values, _ = zip(*rows)
+        return pd.Series(values, index=np.array(dates, dtype=np.int64), dtype=float)
+
+    def record(self, key: str, series: pd.Series | None, fetched: float | None = None) -> int:
+        """Store the observations of ``series`` that differ from the latest vintage; returns how many."""
+
+        series = to_series(series)
+        if series.empty:
+            return 0
+        fetched = time.time() if fetched is None else fetched
+        new = pd.Series(series.to_numpy(dtype=float), index=_epoch_seconds(series.index))
+        new = new[~new.index.duplicated(keep="last")]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR IGNORE INTO series (key) VALUES (?)", (key,))
+            conn.execute("UPDATE series SET name = ? WHERE key = ?", (None if series.name is None else str(series.name), key))
+            series_id = self._series_id(key)
+            old = self._view(series_id, fetched).reindex(new.index)
+            changed = new[old.isna().to_numpy() | ~np.isclose(new.to_numpy(), old.to_numpy(), rtol=REVISION_RTOL, atol=0.0)]
+            conn.executemany(
+                "INSERT OR REPLACE INTO observations (series_id, date, known_from, value) VALUES (?, ?, ?, ?)",
+                [(series_id, int(date), fetched, float(value)) for date, value in changed.items()],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO vintages (series_id, fetched, changed) VALUES (?, ?, ?)",
+                (series_id, fetched, len(changed)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(changed)
+
+    def as_of(self, key: str, when: float) -> tuple[pd.Series | None, float | None]:
+        """``key`` as known at unix time ``when`` and the time of that vintage, or ``(None, None)``."""
+
+        row = self._conn().execute(
+            "SELECT s.id, s.name, MAX(v.fetched) FROM series s JOIN vintages v ON v.series_id = s.id"
+            " WHERE s.key = ? AND v.fetched <= ?",
+            (key, when),
+        ).fetchone()
+        if row is None or row[2] is None:
+            return None, None
+        series_id, name, fetched = row
+        view = self._view(series_id, when)
+        view.index = pd.to_datetime(view.index, unit="s")
+        return view.rename(name or key), fetched
+
+    def vintages(self, key: str) -> list[tuple[float, int]]:
+        """``(fetched, changed observations)`` per stored fetch of ``key``, oldest first."""
+
+        series_id = self._series_id(key)
+        if series_id is None:
+            return []
+        return self._conn().execute(
+            "SELECT fetched, changed FROM vintages WHERE series_id = ? ORDER BY fetched", (series_id,)
+        ).fetchall()
+
+
+_STORE: VintageStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> VintageStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = VintageStore()
+        return _STORE
+
+
+def record_vintage(key: str, series: pd.Series | None) -> None:
+    """Record a fresh load; failures are logged, never raised into the loader."""
+
+    try:
+        get_store().record(key, series)
+    except Exception as exc:
+        LOGGER.warning("Failed to record vintage of %s: %s", key, exc)
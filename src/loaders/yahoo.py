@@ -25,12 +25,18 @@ def _resolve_window(month: MonthWindow | str) -> MonthWindow:
     return parse_month(month)
 
 
+# Days past the window end fetched so month-end values are settled; the end is exclusive.
+WINDOW_TAIL = timedelta(days=7)
+
+
 def fetch_series(ticker: str, month: MonthWindow | str, lookback_months: int = 24) -> pd.Series:
     window = _resolve_window(month)
     start = month_lookback_start(window, lookback_months)
-    end = window.end + timedelta(days=7)
+    end = window.end + WINDOW_TAIL
     try:
-        df = yf.download(ticker, start=start.to_pydatetime(), end=end.to_pydatetime(), progress=False, auto_adjust=False)
+        # Ticker.history keeps its state per ticker; yf.download resets module globals
+        # on every call, so concurrent loader threads could not share it.
+        df = yf.Ticker(ticker).history(start=start.to_pydatetime(), end=end.to_pydatetime(), auto_adjust=False)
         if df.empty:
             raise LoaderEmptyError(f"Yahoo loader: empty frame for {ticker}")
         series = df["Adj Close" if "Adj Close" in df.columns else "Close"]
@@ -0,0 +1,402 @@
+"""Report distribution by email over pooled SMTP connections.
+
+Recipients and pack variants are configured in ``config/distribution.yml``.
+Each variant (the body plus the files it attaches) is rendered to MIME bytes
+once per run; a recipient's message is that payload behind its own ``To`` and
+``Message-ID`` headers, so sending to hundreds of clients renders a handful
+of packs.
+
+Messages go out over at most ``connections`` persistent SMTP sessions, one per
+worker thread, each reused for every message it sends. When the server
+advertises PIPELINING, ``MAIL FROM``, ``RCPT TO`` and ``DATA`` go out in one
+write and their replies are read together. Temporary failures (4xx replies,
+dropped connections) are retried with backoff on a fresh session; permanent
+ones are reported. Every delivery is appended to a per-month ledger
+(``data/mail_ledger/<YYYY-MM>.jsonl``), and a re-run skips recipients the
+ledger already lists, so an interrupted distribution can simply be run again.
+
+SMTP settings come from the environment (the workflow's secrets):
+``SMTP_SERVER``, ``SMTP_PORT``, ``SMTP_USERNAME``, ``SMTP_PASSWORD``,
+``FROM_EMAIL`` and optionally ``RECIPIENT_EMAIL`` (comma separated, added to
+the configured recipients). A local stand-in such as
+``python -m aiosmtpd -n -l localhost:1025`` with ``SMTP_SERVER=localhost
+SMTP_PORT=1025`` is enough to try a distribution end to end.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email import policy
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid, parseaddr
+from pathlib import Path
+
+from .utils.dates import parse_month
+from .utils.io import ensure_directory, load_yaml
+
+LOGGER = logging.getLogger(__name__)
+ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = ROOT / "config" / "distribution.yml"
+LEDGER_DIR = ROOT / "data" / "mail_ledger"
+DEFAULT_REPORTS = ROOT / "reports"
+DEFAULT_SUBJECT = "Monthly Commentary {month}"
+DEFAULT_VARIANT = "full"
+DEFAULT_CONNECTIONS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 1.0
+SMTP_TIMEOUT = 30.0
+
+SENT = "sent"
+ALREADY_SENT = "already sent"
+DRY_RUN = "dry run"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class Recipient:
+    email: str
+    name: str = ""
+    variant: str = DEFAULT_VARIANT
+
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    host: str
+    port: int = 25
+    username: str | None = None
+    password: str | None = None
+    sender: str = ""
+
+    @classmethod
+    def from_env(cls, environ=os.environ) -> SMTPSettings | None:
+        host = environ.get("SMTP_SERVER")
+        if not host:
+            return None
+        return cls(
+            host=host,
+            port=int(environ.get("SMTP_PORT") or 25),
+            username=environ.get("SMTP_USERNAME") or None,
+            password=environ.get("SMTP_PASSWORD") or None,
+            sender=environ.get("FROM_EMAIL", ""),
+        )
+
+
+@dataclass
+class Distribution:
+    month: str
+    variants: dict[str, int] = field(default_factory=dict)  # recipients per rendered variant
+    outcomes: dict[str, str] = field(default_factory=dict)  # email -> status or error
+    seconds: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for outcome in self.outcomes.values() if outcome == status)
+
+    def as_metrics(self) -> dict:
+        failed = {email: outcome for email, outcome in self.outcomes.items() if outcome not in (SENT, ALREADY_SENT, DRY_RUN)}
+        return {
+            "month": self.month,
+            "variants": self.variants,
+            "sent": self.count(SENT),
+            "already_sent": self.count(ALREADY_SENT),
+            "dry_run": self.count(DRY_RUN),
+            "failed": failed,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def load_recipients(config: dict, environ=os.environ) -> list[Recipient]:
+    """Configured recipients, the optional CSV and ``RECIPIENT_EMAIL``; one entry per address."""
+
+    entries = list(config.get("recipients") or [])
+    recipients_file = config.get("recipients_file")
+    if recipients_file:
+        path = Path(recipients_file)
+        path = path if path.is_absolute() else ROOT / path
+        with path.open(newline="") as handle:
+            entries += list(csv.DictReader(handle))
+    entries += [{"email": email.strip()} for email in (environ.get("RECIPIENT_EMAIL") or "").split(",") if email.strip()]
+    recipients: dict[str, Recipient] = {}
+    for entry in entries:
+        email = (entry.get("email") or "").strip()
+        if not email:
+            continue
+        recipients.setdefault(
+            email.lower(), Recipient(email, (entry.get("name") or "").strip(), entry.get("variant") or DEFAULT_VARIANT)
+        )
+    return list(recipients.values())
+
+
+def render_variant(report_dir: Path, month: str, variant: dict, sender: str, subject: str) -> bytes:
+    """MIME bytes of one pack variant, without the per-recipient headers."""
+
+    msg = EmailMessage(policy=policy.SMTP)
+    msg["From"] = sender
+    msg["Subject"] = subject.format(month=month)
+    msg["Date"] = formatdate(usegmt=True)
+    body = report_dir / variant.get("body", "monthly_commentary.md")
+    msg.set_content(body.read_text(encoding="utf-8") if body.exists() else f"Monthly commentary for {month}.")
+    for pattern in variant.get("attach", []):
+        for path in sorted(p for p in report_dir.glob(pattern) if p.is_file()):
+            ctype = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            maintype, subtype = ctype.split("/", 1)
+            msg.add_attachment(path.read_bytes(), maintype=maintype, subtype=subtype, filename=path.name)
+    return msg.as_bytes()
+
+
+def recipient_headers(recipient: Recipient, domain: str | None = None) -> tuple[bytes, str]:
+    """The ``To`` and ``Message-ID`` lines put in front of a variant's payload."""
+
+    message_id = make_msgid(domain=domain)
+    to = formataddr((recipient.name, recipient.email), charset="utf-8")
+    return f"To: {to}\r\nMessage-ID: {message_id}\r\n".encode("ascii"), message_id
+
+
+class SendLedger:
+    """Append-only JSON lines of the deliveries made for one month."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def delivered(self) -> set[tuple[str, str]]:
+        if not self.path.exists():
+            return set()
+        done = set()
+        for line in self.path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            done.add((entry["email"].lower(), entry["variant"]))
+        return done
+
+    def record(self, recipient: Recipient, message_id: str, digest: str) -> None:
+        entry = {"email": recipient.email, "variant": recipient.variant, "message_id": message_id, "digest": digest, "sent_at": time.time()}
+        with self._lock:
+            ensure_directory(self.path.parent)
+            with self.path.open("a") as handle:
+                handle.write(json.dumps(entry) + "\n")
+
+
+class SMTPPool:
+    """One persistent SMTP session per worker thread."""
+
+    def __init__(self, settings: SMTPSettings):
+        self.settings = settings
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: list[smtplib.SMTP] = []
+
+    def _open(self) -> smtplib.SMTP:
+        s = self.settings
+        if s.port == 465:
+            conn = smtplib.SMTP_SSL(s.host, s.port, timeout=SMTP_TIMEOUT, context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(s.host, s.port, timeout=SMTP_TIMEOUT)
+            # Envelope and message are separate writes; don't let Nagle hold the second.
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn.ehlo()
+            if conn.has_extn("starttls"):
+                conn.starttls(context=ssl.create_default_context())
+                conn.ehlo()
+        if s.username:
+            conn.login(s.username, s.password or "")
+        with self._lock:
+            self._sessions.append(conn)
+        return conn
+
+    def session(self) -> smtplib.SMTP:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def discard(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            with self._lock:
+                if conn in self._sessions:
+                    self._sessions.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for conn in sessions:
+            try:
+                conn.quit()
+            except Exception:
+                conn.close()
+
+
+def quote_data(payload: bytes) -> bytes:
+    """Dot-stuffed DATA section as smtplib.SMTP.data sends it, with the closing "."."""
+
+    quoted = re.sub(rb"(?m)^\.", b"..", re.sub(rb"\r?\n", b"\r\n", payload))
+    if not quoted.endswith(b"\r\n"):
+        quoted += b"\r\n"
+    return quoted + b".\r\n"
+
+
+def send_message(conn: smtplib.SMTP, sender: str, to: str, headers: bytes, payload: bytes, quoted: bytes) -> None:
+    """Send ``headers + payload``, pipelining the envelope when the server allows it.
+
+    ``quoted`` is :func:`quote_data` of ``payload``, computed once per variant;
+    the header lines never start with a dot, so they need no quoting.
+    """
+
+    if not conn.has_extn("pipelining"):
+        conn.sendmail(sender, [to], headers + payload)
+        return
+    conn.send(f"MAIL FROM:<{sender}>\r\nRCPT TO:<{to}>\r\nDATA\r\n".encode("ascii"))
+    (mail_code, mail_msg), (rcpt_code, rcpt_msg), (data_code, data_msg) = (conn.getreply() for _ in range(3))
+    if mail_code != 250 or rcpt_code not in (250, 251) or data_code != 354:
+        if mail_code != 250:
+            error = smtplib.SMTPSenderRefused(mail_code, mail_msg, sender)
+        elif rcpt_code not in (250, 251):
+            error = smtplib.SMTPRecipientsRefused({to: (rcpt_code, rcpt_msg)})
+        else:
+            error = smtplib.SMTPDataError(data_code, data_msg)
+        if data_code == 354:
+            # The server is waiting for a message it should not get; drop the session.
+            conn.close()
+        else:
+            conn.rset()
+        raise error
+    conn.send(headers + quoted)
+    code, msg = conn.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, msg)
+
+
+def _temporary(exc: Exception) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, OSError))
+
+
+def distribute(
+    report_dir: Path,
+    month: str,
+    config: dict | None = None,
+    settings: SMTPSettings | None = None,
+    ledger_dir: Path = LEDGER_DIR,
+    dry_run: bool = False,
+) -> Distribution:
+    """Send the report in ``report_dir`` to every configured recipient not yet in the ledger."""
+
+    started = time.monotonic()
+    config = load_yaml(CONFIG_PATH) if config is None else config
+    settings = settings or SMTPSettings.from_env()
+    result = Distribution(month)
+    recipients = load_recipients(config)
+    if not recipients:
+        LOGGER.info("No recipients configured; nothing to send")
+        return result
+    if settings is None and not dry_run:
+        raise ValueError("SMTP_SERVER is not set; set the SMTP_* environment variables or use a dry run")
+    sender = (settings.sender if settings else "") or config.get("from") or "reports@localhost"
+    sender_address = parseaddr(sender)[1]
+    variants = config.get("variants") or {DEFAULT_VARIANT: {"attach": ["dashboard.xlsx", "charts/*"]}}
+    unknown = sorted({r.variant for r in recipients} - set(variants))
+    if unknown:
+        raise ValueError(f"Recipients use unknown variants: {', '.join(unknown)}")
+
+    ledger = SendLedger(ledger_dir / f"{month}.jsonl")
+    delivered = ledger.delivered()
+    pending = []
+    for recipient in recipients:
+        if (recipient.email.lower(), recipient.variant) in delivered:
+            result.outcomes[recipient.email] = ALREADY_SENT
+        else:
+            pending.append(recipient)
+    # Render each variant once, for however many recipients share it.
+    payloads = {}
+    for name in sorted({r.variant for r in pending}):
+        payloads[name] = render_variant(report_dir, month, variants[name], sender, config.get("subject", DEFAULT_SUBJECT))
+        result.variants[name] = sum(1 for r in pending if r.variant == name)
+    if dry_run or not pending:
+        for recipient in pending:
+            result.outcomes[recipient.email] = DRY_RUN
+        result.seconds = time.monotonic() - started
+        return result
+
+    digests = {name: hashlib.sha256(payload).hexdigest()[:16] for name, payload in payloads.items()}
+    quoted = {name: quote_data(payload) for name, payload in payloads.items()}
+    domain = sender_address.rpartition("@")[2] or None
+    max_attempts = int(config.get("max_attempts", DEFAULT_MAX_ATTEMPTS))
+    pool = SMTPPool(settings)
+
+    def deliver(recipient: Recipient) -> str:
+        headers, message_id = recipient_headers(recipient, domain)
+        for attempt in range(1, max_attempts + 1):
+            conn = None
+            try:
+                conn = pool.session()
+                send_message(conn, sender_address, recipient.email, headers, payloads[recipient.variant], quoted[recipient.variant])
+            except Exception as exc:
+                if conn is None or conn.sock is None or not isinstance(exc, smtplib.SMTPException):
+                    pool.discard()  # the session is gone; the next attempt opens a new one
+                if not _temporary(exc) or attempt == max_attempts:
+                    LOGGER.warning("Failed to send %s to %s: %s", month, recipient.email, exc)
+                    return f"{FAILED}: {exc}"
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                continue
+            ledger.record(recipient, message_id, digests[recipient.variant])
+            return SENT
+        return FAILED
+
+    connections = max(1, min(int(config.get("connections", DEFAULT_CONNECTIONS)), len(pending)))
+    try:
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="smtp") as executor:
+            for recipient, outcome in zip(pending, executor.map(deliver, pending)):
+                result.outcomes[recipient.email] = outcome
+    finally:
+        pool.close()
+    result.seconds = time.monotonic() - started
+    LOGGER.info(
+        "Distributed %s: %d sent, %d already sent, %d failed in %.2fs over %d connection(s)",
+        month, result.count(SENT), result.count(ALREADY_SENT), len(result.as_metrics()["failed"]), result.seconds, connections,
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Email a generated monthly report to the configured recipients")
+    parser.add_argument("--month", default="auto", help="Report month in YYYY-MM or 'auto'")
+    parser.add_argument("--reports", default=str(DEFAULT_REPORTS), help="Reports archive directory")
+    parser.add_argument("--dry-run", action="store_true", help="Render the variants and list recipients without sending")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    month = parse_month(args.month).label
+    report_dir = Path(args.reports) / month
+    if not report_dir.exists():
+        raise SystemExit(f"No report at {report_dir}")
+    result = distribute(report_dir, month, dry_run=args.dry_run)
+    print(json.dumps(result.as_metrics(), indent=2))
+    if result.as_metrics()["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
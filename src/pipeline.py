@@ -0,0 +1,249 @@
+"""Dependency-aware stage executor for the report build.
+
+A report is a set of named :class:`Stage` objects that declare which context
+keys they read (``inputs``) and write (``outputs``). :class:`Pipeline` derives
+the dependency graph from those declarations, runs every stage whose inputs
+are ready concurrently on a thread pool, and records timings so the critical
+path of the build can be reported.
+
+Stages that touch shared non-thread-safe state (matplotlib's pyplot) name a
+``resource``; stages sharing a resource never run at the same time, including
+across pipelines running concurrently in one process (the report server).
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_MAX_WORKERS = 4
+
+RAN = "ran"
+SKIPPED = "skipped"
+FALLBACK = "fallback"
+FAILED = "failed"
+
+
+_RESOURCE_LOCKS: dict[str, threading.Lock] = {}
+_RESOURCE_LOCKS_GUARD = threading.Lock()
+
+
+def _resource_lock(name: str) -> threading.Lock:
+    with _RESOURCE_LOCKS_GUARD:
+        return _RESOURCE_LOCKS.setdefault(name, threading.Lock())
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[dict], dict | None]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    # Run instead of ``func`` when the stage is skipped, so dependents still get outputs.
+    fallback: Callable[[dict], dict | None] | None = None
+    resource: str | None = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    start: float = 0.0
+    end: float = 0.0
+    error: str | None = None
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class PipelineReport:
+    results: dict[str, StageResult]
+    critical_path: list[str]
+    critical_seconds: float
+    wall_seconds: float
+
+    def as_metrics(self) -> dict:
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "critical_path": self.critical_path,
+            "critical_seconds": round(self.critical_seconds, 3),
+            "stages": {
+                name: {"status": r.status, "seconds": round(r.seconds, 3), "error": r.error, **r.extra}
+                for name, r in self.results.items()
+            },
+        }
+
+
+def _matches(name: str, patterns: Iterable[str]) -> bool:
+    # "charts" selects "charts" and every "charts.*" stage.
+    return any(name == p or name.startswith(p + ".") or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        self.producers: dict[str, str] = {}
+        for stage in stages:
+            for key in stage.outputs:
+                if key in self.producers:
+                    raise ValueError(f"{key!r} is produced by both {self.producers[key]} and {stage.name}")
+                self.producers[key] = stage.name
+        self.deps = {
+            stage.name: {self.producers[key] for key in stage.inputs if key in self.producers}
+            for stage in stages
+        }
+        self._check_acyclic()
+        # Hooks called before and after each stage in its worker thread (e.g. for memory tracking).
+        self.before_stage: list[Callable[[StageResult], None]] = []
+        self.after_stage: list[Callable[[StageResult], None]] = []
+
+    def _check_acyclic(self) -> None:
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through {name}")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _ancestors(self, names: set[str]) -> set[str]:
+        result, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name in result:
+                continue
+            result.add(name)
+            stack.extend(self.deps[name])
+        return result
+
+    def plan(self, only: Iterable[str] = (), skip: Iterable[str] = ()) -> tuple[set[str], set[str]]:
+        """Return ``(selected, skipped)`` stage names for ``--only``/``--skip``."""
+
+        only, skip = list(only), list(skip)
+        for pattern in only + skip:
+            if not any(_matches(name, [pattern]) for name in self.stages):
+                raise ValueError(f"No stage matches {pattern!r}; stages: {', '.join(self.stages)}")
+        selected = set(self.stages)
+        if only:
+            selected = self._ancestors({name for name in self.stages if _matches(name, only)})
+        skipped = {name for name in selected if _matches(name, skip)}
+        return selected, skipped
+
+    def _execute(self, stage: Stage, context: dict, use_fallback: bool) -> tuple[dict, StageResult]:
+        func = stage.fallback if use_fallback else stage.func
+        result = StageResult(stage.name, FALLBACK if use_fallback else RAN)
+        # Uncontended within a run (the scheduler already serialises resources);
+        # only another pipeline in the same process can hold it.
+        lock = _resource_lock(stage.resource) if stage.resource else None
+        if lock:
+            lock.acquire()
+        try:
+            for hook in self.before_stage:
+                hook(result)
+            result.start = time.monotonic()
+            outputs = func(context) or {}
+            result.end = time.monotonic()
+        finally:
+            if lock:
+                lock.release()
+        for hook in self.after_stage:
+            hook(result)
+        return outputs, result
+
+    def run(self, context: dict, only: Iterable[str] = (), skip: Iterable[str] = (), max_workers: int = DEFAULT_MAX_WORKERS) -> PipelineReport:
+        selected, skipped = self.plan(only, skip)
+        results: dict[str, StageResult] = {}
+        pending = set(selected)
+        running: dict[Future, str] = {}
+        busy: set[str] = set()
+        started = time.monotonic()
+
+        def blocked(name: str) -> bool:
+            return any(results.get(dep) and results[dep].status in (SKIPPED, FAILED) for dep in self.deps[name])
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                for name in sorted(pending):
+                    stage = self.stages[name]
+                    use_fallback = name in skipped
+                    if use_fallback and stage.fallback is None:
+                        results[name] = StageResult(name, SKIPPED)
+                        pending.discard(name)
+                        continue
+                    if blocked(name):
+                        results[name] = StageResult(name, SKIPPED, error="upstream stage skipped or failed")
+                        pending.discard(name)
+                        continue
+                    if stage.resource in busy:
+                        continue
+                    if all(dep in results for dep in self.deps[name] & selected):
+                        snapshot = dict(context)
+                        running[executor.submit(self._execute, stage, snapshot, use_fallback)] = name
+                        pending.discard(name)
+                        if stage.resource:
+                            busy.add(stage.resource)
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    busy.discard(self.stages[name].resource)
+                    try:
+                        outputs, result = future.result()
+                    except Exception as exc:
+                        LOGGER.exception("Stage %s failed", name)
+                        results[name] = StageResult(name, FAILED, error=str(exc))
+                        continue
+                    missing = set(self.stages[name].outputs) - set(outputs)
+                    if missing:
+                        LOGGER.debug("Stage %s did not produce %s", name, ", ".join(sorted(missing)))
+                    context.update(outputs)
+                    results[name] = result
+                    LOGGER.debug("Stage %s %s in %.2fs", name, result.status, result.seconds)
+
+        path, seconds = self._critical_path(results)
+        report = PipelineReport(results, path, seconds, time.monotonic() - started)
+        LOGGER.info("Critical path (%.2fs): %s", seconds, " -> ".join(path))
+        failed = [name for name, r in results.items() if r.status == FAILED]
+        if failed:
+            raise PipelineError(f"Stages failed: {', '.join(sorted(failed))}")
+        return report
+
+    def _critical_path(self, results: dict[str, StageResult]) -> tuple[list[str], float]:
+        """Longest chain of executed stages by measured duration."""
+
+        best: dict[str, tuple[float, list[str]]] = {}
+
+        def longest(name: str) -> tuple[float, list[str]]:
+            if name in best:
+                return best[name]
+            own = results[name].seconds if results[name].status in (RAN, FALLBACK) else 0.0
+            upstream = [longest(dep) for dep in self.deps[name] if dep in results]
+            base = max(upstream, key=lambda item: item[0], default=(0.0, []))
+            best[name] = (base[0] + own, base[1] + [name])
+            return best[name]
+
+        candidates = [longest(name) for name in results]
+        seconds, path = max(candidates, key=lambda item: item[0], default=(0.0, []))
+        return path, seconds
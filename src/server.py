@@ -0,0 +1,309 @@
+"""Resident report server.
+
+Keeps the interpreter, the heavy imports (pandas, matplotlib, yfinance,
+jinja), an in-memory series cache and, when a model is present, the LLM
+workers warm between reports, and accepts report jobs over local HTTP::
+
+    POST /jobs[?wait=1]  {"month": "2025-09", "markets": "us,au", "outputs": "md,xlsx",
+                          "only": ["charts"], "skip": [], "lookback": 24}
+    GET  /jobs           recent jobs, newest first
+    GET  /jobs/<id>      one job
+    GET  /health
+
+Jobs wait in a bounded queue and run on a fixed number of worker threads.
+Jobs for the same month never run at the same time because they write the
+same report directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import cli
+from .llm import models as llm_models, prompts as llm_prompts, scheduler as llm_scheduler
+from .loaders.budget import DEFAULT_MEMO_TTL, SeriesMemo
+from .pipeline import DEFAULT_MAX_WORKERS
+from .utils.dates import parse_month
+
+LOGGER = logging.getLogger(__name__)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 2
+DEFAULT_QUEUE_SIZE = 32
+MAX_JOBS_KEPT = 200
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    month: str
+    markets: str = "us,au"
+    outputs: str = "md,xlsx"
+    lookback: int = cli.DEFAULT_LOOKBACK_MONTHS
+    only: list[str] = field(default_factory=list)
+    skip: list[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    error: str | None = None
+    report_dir: str | None = None
+    pipeline: dict | None = None
+
+    def __post_init__(self) -> None:
+        self._done = threading.Event()
+
+    @staticmethod
+    def _stages(value) -> list[str]:
+        return cli._split_stages([value] if isinstance(value, str) else list(value))
+
+    @classmethod
+    def from_request(cls, payload: dict) -> "Job":
+        if not isinstance(payload, dict):
+            raise TypeError("request body must be a JSON object")
+        window = parse_month(str(payload.get("month", "auto")))
+        return cls(
+            month=window.label,
+            markets=str(payload.get("markets", "us,au")),
+            outputs=str(payload.get("outputs", "md,xlsx")),
+            lookback=int(payload.get("lookback", cli.DEFAULT_LOOKBACK_MONTHS)),
+            only=cls._stages(payload.get("only", [])),
+            skip=cls._stages(payload.get("skip", [])),
+        )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class ReportServer:
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        memo_ttl: float = DEFAULT_MEMO_TTL,
+        deadline: float | None = None,
+        stage_workers: int = DEFAULT_MAX_WORKERS,
+        chart_format: str = "png",
+        chart_max_kb: int | None = None,
+        llm_workers: int | None = None,
+    ):
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self.stage_workers = stage_workers
+        self.chart_format = chart_format
+        self.chart_max_kb = chart_max_kb
+        self.llm_workers = llm_workers
+        self.memo = SeriesMemo(memo_ttl)
+        self._queue: queue.Queue[Job] = queue.Queue(maxsize=queue_size)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._month_locks: dict[str, threading.Lock] = {}
+        self._threads: list[threading.Thread] = []
+        self.llm_warm = False
+
+    def start(self) -> None:
+        # Warm the model jobs will select: they run with the default section budget.
+        workers = self.llm_workers or llm_scheduler.default_workers(len(llm_prompts.SECTION_MAX_TOKENS))
+        selection = llm_models.get_registry().select(
+            llm_scheduler.DEFAULT_SECTION_SECONDS, max(llm_prompts.SECTION_MAX_TOKENS.values()), workers
+        )
+        self.llm_warm = selection.candidate is not None and llm_scheduler.keep_warm(self.llm_workers, selection.path)
+        LOGGER.info("LLM workers %s", "warm" if self.llm_warm else "unavailable; rule-based text will be used")
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._worker, name=f"report-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job: Job) -> Job:
+        """Queue ``job``; raises :class:`queue.Full` when the queue is at capacity."""
+
+        self._queue.put_nowait(job)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                self._jobs.popitem(last=False)
+        LOGGER.info("Queued job %s for %s", job.id, job.month)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._jobs_lock:
+            return list(reversed(self._jobs.values()))
+
+    def health(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "running": sum(job.status == RUNNING for job in self.jobs()),
+            "concurrency": self.concurrency,
+            "cached_series": len(self.memo),
+            "llm_warm": self.llm_warm,
+        }
+
+    def _month_lock(self, month: str) -> threading.Lock:
+        with self._jobs_lock:
+            return self._month_locks.setdefault(month, threading.Lock())
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                with self._month_lock(job.month):
+                    self._run(job)
+            finally:
+                job._done.set()
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> None:
+        job.status, job.started = RUNNING, time.time()
+        try:
+            report = cli.run(
+                job.month,
+                job.markets,
+                job.outputs,
+                job.lookback,
+                chart_format=self.chart_format,
+                chart_max_kb=self.chart_max_kb,
+                deadline=self.deadline,
+                only=job.only,
+                skip=job.skip,
+                workers=self.stage_workers,
+                llm_workers=self.llm_workers,
+                memo=self.memo,
+            )
+        except Exception as exc:
+            LOGGER.exception("Job %s failed", job.id)
+            job.status, job.error = FAILED, str(exc)
+        else:
+            job.status = DONE
+            job.pipeline = report.as_metrics()
+            job.report_dir = str(cli.PROJECT_ROOT / "reports" / job.month)
+        job.finished = time.time()
+        LOGGER.info("Job %s %s in %.2fs", job.id, job.status, job.finished - job.started)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_HTTPServer"
+
+    def _send(self, status: HTTPStatus, payload: dict | list) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = urlparse(self.path).path.rstrip("/")
+        reports = self.server.reports
+        if path == "/health":
+            self._send(HTTPStatus.OK, reports.health())
+        elif path == "/jobs":
+            self._send(HTTPStatus.OK, [job.as_dict() for job in reports.jobs()])
+        elif path.startswith("/jobs/"):
+            job = reports.get(path.rsplit("/", 1)[-1])
+            if job is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": "unknown job"})
+            else:
+                self._send(HTTPStatus.OK, job.as_dict())
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            job = Job.from_request(payload)
+        except (ValueError, TypeError) as exc:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+        try:
+            self.server.reports.submit(job)
+        except queue.Full:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "job queue is full"})
+            return
+        if parse_qs(url.query).get("wait", ["0"])[0] not in ("0", ""):
+            job.wait()
+            self._send(HTTPStatus.OK, job.as_dict())
+        else:
+            self._send(HTTPStatus.ACCEPTED, job.as_dict())
+
+    def log_message(self, format: str, *args) -> None:
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], reports: ReportServer):
+        super().__init__(address, _Handler)
+        self.reports = reports
+
+
+def serve(host: str, port: int, reports: ReportServer) -> None:
+    reports.start()
+    httpd = _HTTPServer((host, port), reports)
+    LOGGER.info("Report server listening on http://%s:%d", host, port)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resident monthly commentary server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind (local only by default)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Reports built at the same time")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Jobs allowed to wait before new ones are refused")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_MEMO_TTL, help="Seconds loaded series stay in memory")
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds allowed for each load phase")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Stages run concurrently per report")
+    parser.add_argument("--chart-format", default="png", choices=cli.chart_output.SUPPORTED_FORMATS, help="Chart file format")
+    parser.add_argument("--chart-max-kb", type=int, default=None, help="Size budget per raster chart in KiB")
+    parser.add_argument("--llm-workers", type=int, default=None, help="LLM worker processes kept warm")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+    cli._setup_logging(args.verbose)
+    reports = ReportServer(
+        concurrency=args.concurrency,
+        queue_size=args.queue_size,
+        memo_ttl=args.cache_ttl,
+        deadline=args.deadline,
+        stage_workers=args.workers,
+        chart_format=args.chart_format,
+        chart_max_kb=args.chart_max_kb,
+        llm_workers=args.llm_workers,
+    )
+    serve(args.host, args.port, reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Incremental static site build for the ``reports/`` archive.
+
+Each month folder is fingerprinted from the content hashes of its files. Only
+months whose fingerprint changed since the last build get their page, assets
+and series JSON rewritten; the index is regenerated from the manifest, which
+is one small file however many months exist. Charts, workbooks and series
+JSON are stored once under ``assets/`` by content hash, so a chart that did
+not change between months is published a single time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import re
+import shutil
+from pathlib import Path
+
+from .utils.hashing import tree_hashes
+from .utils.io import ensure_directory
+
+LOGGER = logging.getLogger(__name__)
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_REPORTS = ROOT / "reports"
+DEFAULT_SITE = ROOT / "site"
+MANIFEST_NAME = "manifest.json"
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+SITE_VERSION = 1
+
+PAGE_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="{root}assets/site.css">
+</head>
+<body>
+<nav><a href="{root}index.html">All reports</a></nav>
+<main>
+{body}
+</main>
+<script src="{root}assets/site.js" defer></script>
+</body>
+</html>
+"""
+
+SITE_CSS = """body{font-family:system-ui,sans-serif;max-width:60rem;margin:2rem auto;padding:0 1rem;color:#222}
+img{max-width:100%;height:auto}
+.series{display:grid;grid-template-columns:repeat(auto-fill,minmax(14rem,1fr));gap:1rem}
+.series figure{margin:0}
+.series svg{width:100%;height:4rem;stroke:#1f77b4;fill:none}
+"""
+
+SITE_JS = """document.querySelectorAll('[data-series]').forEach(function (el) {
+  fetch(el.dataset.series).then(function (r) { return r.json(); }).then(function (s) {
+    var v = s.v.filter(function (x) { return x !== null; });
+    if (!v.length) { return; }
+    var lo = Math.min.apply(null, v), hi = Math.max.apply(null, v), span = (hi - lo) || 1;
+    var pts = s.v.map(function (x, i) {
+      return x === null ? null : (i / Math.max(s.v.length - 1, 1) * 100).toFixed(2) + ',' + (40 - (x - lo) / span * 40).toFixed(2);
+    }).filter(Boolean).join(' ');
+    el.innerHTML = '<svg viewBox="0 0 100 40" preserveAspectRatio="none"><polyline points="' + pts + '"/></svg>';
+  });
+});
+"""
+
+
+def _fingerprint(files: dict[str, dict]) -> str:
+    digest = hashlib.sha256(f"v{SITE_VERSION}".encode())
+    for rel, meta in sorted(files.items()):
+        digest.update(rel.encode())
+        digest.update(meta["sha256"].encode())
+    return digest.hexdigest()
+
+
+def _store_asset(site_dir: Path, data: bytes | None, source: Path | None, sha: str, suffix: str) -> str:
+    name = f"{sha[:16]}{suffix}"
+    target = site_dir / "assets" / name
+    if not target.exists():
+        ensure_directory(target.parent)
+        if source is not None:
+            shutil.copyfile(source, target)
+        else:
+            target.write_bytes(data or b"")
+    return f"assets/{name}"
+
+
+def compact_series(records: list[dict]) -> dict:
+    """Convert snapshot records into columnar ``{"d": [...], "v": [...]}`` form."""
+
+    dates, values = [], []
+    for row in records:
+        dates.append(str(row.get("date", ""))[:10])
+        value = row.get("value")
+        values.append(None if value is None else round(float(value), 4))
+    return {"d": dates, "v": values}
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", r'<img alt="\1" src="\2">', text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+
+
+def markdown_to_html(text: str) -> str:
+    """Render the small markdown subset used by the commentary template."""
+
+    out: list[str] = []
+    paragraph: list[str] = []
+    in_list = False
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            out.append("<p>" + " ".join(_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        heading = re.match(r"^(#{1,6})\s+(.*)$", line)
+        if heading or line.startswith("- ") or not line.strip():
+            flush_paragraph()
+        if in_list and not line.startswith("- "):
+            out.append("</ul>")
+            in_list = False
+        if heading:
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif line.startswith("- "):
+            if not in_list:
+                out.append("<ul>")
+                in_list = True
+            out.append(f"<li>{_inline(line[2:])}</li>")
+        elif line.strip():
+            paragraph.append(line.strip())
+    flush_paragraph()
+    if in_list:
+        out.append("</ul>")
+    return "\n".join(out)
+
+
+def _title(month_dir: Path) -> str:
+    md_path = month_dir / "monthly_commentary.md"
+    if md_path.exists():
+        for line in md_path.read_text(encoding="utf-8").splitlines():
+            if line.startswith("# "):
+                return line[2:].strip()
+    return f"Monthly Commentary — {month_dir.name}"
+
+
+def _build_month(month_dir: Path, site_dir: Path, files: dict[str, dict]) -> dict:
+    label = month_dir.name
+    assets: dict[str, str] = {}
+    for rel, meta in files.items():
+        path = month_dir / rel
+        if rel.startswith("snapshots/") and path.suffix == ".json":
+            try:
+                records = json.loads(path.read_text(encoding="utf-8") or "[]")
+            except json.JSONDecodeError:
+                LOGGER.warning("Skipping unreadable snapshot %s", path)
+                continue
+            if not records:
+                continue
+            payload = json.dumps(compact_series(records), separators=(",", ":")).encode()
+            sha = hashlib.sha256(payload).hexdigest()
+            assets[rel] = _store_asset(site_dir, payload, None, sha, ".json")
+        elif path.suffix in {".png", ".svg", ".webp", ".xlsx"}:
+            assets[rel] = _store_asset(site_dir, None, path, meta["sha256"], path.suffix)
+
+    body: list[str] = []
+    md_path = month_dir / "monthly_commentary.md"
+    if md_path.exists():
+        body.append(markdown_to_html(md_path.read_text(encoding="utf-8")))
+    else:
+        body.append(f"<h1>{html.escape(_title(month_dir))}</h1>")
+    charts = [rel for rel in assets if rel.startswith("charts/")]
+    if charts:
+        body.append("<h2>Charts</h2>")
+        body.extend(f'<img loading="lazy" alt="{html.escape(Path(rel).stem)}" src="../{assets[rel]}">' for rel in charts)
+    series = [rel for rel in assets if rel.startswith("snapshots/")]
+    if series:
+        body.append('<h2>Series</h2>\n<div class="series">')
+        for rel in series:
+            name = html.escape(Path(rel).stem)
+            body.append(f'<figure><figcaption>{name}</figcaption><div data-series="../{assets[rel]}"></div></figure>')
+        body.append("</div>")
+    if "dashboard.xlsx" in assets:
+        body.append(f'<p><a href="../{assets["dashboard.xlsx"]}" download="dashboard-{label}.xlsx">Download Excel dashboard</a></p>')
+
+    page_dir = site_dir / label
+    ensure_directory(page_dir)
+    title = _title(month_dir)
+    page = PAGE_TEMPLATE.format(title=html.escape(title), root="../", body="\n".join(body))
+    (page_dir / "index.html").write_text(page, encoding="utf-8")
+    return {"title": title, "assets": assets}
+
+
+def _write_index(site_dir: Path, months: dict[str, dict]) -> None:
+    items = [
+        f'<li><a href="{label}/index.html">{html.escape(entry["title"])}</a></li>'
+        for label, entry in sorted(months.items(), reverse=True)
+    ]
+    body = "<h1>Monthly Commentary</h1>\n<ul>\n" + "\n".join(items) + "\n</ul>"
+    page = PAGE_TEMPLATE.format(title="Monthly Commentary", root="", body=body)
+    (site_dir / "index.html").write_text(page, encoding="utf-8")
+
+
+def _prune_assets(site_dir: Path, months: dict[str, dict]) -> None:
+    referenced = {Path(a).name for entry in months.values() for a in entry["assets"].values()}
+    referenced.update({"site.css", "site.js"})
+    for path in (site_dir / "assets").glob("*"):
+        if path.name not in referenced:
+            path.unlink()
+
+
+def build_site(reports_dir: Path = DEFAULT_REPORTS, site_dir: Path = DEFAULT_SITE, force: bool = False) -> list[str]:
+    """Build or update the site; returns the month labels that were rebuilt."""
+
+    ensure_directory(site_dir / "assets")
+    manifest_path = site_dir / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists() and not force:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    previous_months: dict[str, dict] = manifest.get("months", {})
+    months: dict[str, dict] = {}
+    rebuilt: list[str] = []
+
+    month_dirs = sorted(p for p in reports_dir.iterdir() if p.is_dir() and MONTH_PATTERN.match(p.name))
+    for month_dir in month_dirs:
+        label = month_dir.name
+        previous = previous_months.get(label, {})
+        files = tree_hashes(month_dir, previous.get("files", {}))
+        fingerprint = _fingerprint(files)
+        page_exists = (site_dir / label / "index.html").exists()
+        if previous.get("fingerprint") == fingerprint and page_exists:
+            months[label] = {**previous, "files": files}
+            continue
+        LOGGER.info("Building site page for %s", label)
+        months[label] = {"fingerprint": fingerprint, "files": files, **_build_month(month_dir, site_dir, files)}
+        rebuilt.append(label)
+
+    for label in set(previous_months) - set(months):
+        LOGGER.info("Removing site page for deleted month %s", label)
+        shutil.rmtree(site_dir / label, ignore_errors=True)
+
+    (site_dir / "assets" / "site.css").write_text(SITE_CSS, encoding="utf-8")
+    (site_dir / "assets" / "site.js").write_text(SITE_JS, encoding="utf-8")
+    if rebuilt or set(previous_months) != set(months) or not (site_dir / "index.html").exists():
+        _write_index(site_dir, months)
+        _prune_assets(site_dir, months)
+    manifest_path.write_text(json.dumps({"version": SITE_VERSION, "months": months}, indent=1), encoding="utf-8")
+    return rebuilt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the static reports site")
+    parser.add_argument("--reports", default=str(DEFAULT_REPORTS), help="Reports archive directory")
+    parser.add_argument("--out", default=str(DEFAULT_SITE), help="Site output directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild every month")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    rebuilt = build_site(Path(args.reports), Path(args.out), args.force)
+    LOGGER.info("Site updated; rebuilt %d month(s)", len(rebuilt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Derived series declared as expressions over loaded series.
+
+``config/markets.yml`` lists them under ``derived``::
+
+    derived:
+      us_cpi_yoy: yoy(us_cpi)
+      us_au_10y_spread: us_ten_year - au_ten_year
+      us_equity_aud_mom: mom(us_equity / audusd)
+
+An expression may use ``+ - * /``, numbers, the functions in
+:data:`FUNCTIONS` and the names of loaded series or other derived series.
+:class:`DerivedSeries` parses every expression up front (rejecting unknown
+names and cycles) and evaluates a series only when it is first asked for,
+once per run. Arithmetic between two series aligns them as of each date, so
+a daily yield minus monthly CPI uses the latest CPI print on every day.
+"""
+
+from __future__ import annotations
+
+import ast
+import operator
+import threading
+
+import pandas as pd
+
+from ..utils.series import monthly_last, to_series
+
+
+def change_pct(series: pd.Series, periods: int) -> pd.Series:
+    """Percentage change over ``periods`` observations."""
+
+    return (series / series.shift(periods) - 1.0) * 100.0
+
+
+def month_end(series: pd.Series) -> pd.Series:
+    return monthly_last(series)
+
+
+def yoy(series: pd.Series) -> pd.Series:
+    return change_pct(monthly_last(series), 12)
+
+
+def mom(series: pd.Series) -> pd.Series:
+    return change_pct(monthly_last(series), 1)
+
+
+def diff(series: pd.Series) -> pd.Series:
+    return monthly_last(series).diff()
+
+
+FUNCTIONS = {"month_end": month_end, "yoy": yoy, "mom": mom, "diff": diff}
+OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def _align(left, right):
+    if not isinstance(left, pd.Series) or not isinstance(right, pd.Series):
+        return left, right
+    frame = pd.concat([to_series(left).rename(0), to_series(right).rename(1)], axis=1).ffill().dropna()
+    return frame[0], frame[1]
+
+
+def _names(node: ast.AST, expression: str) -> set[str]:
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if not isinstance(child.func, ast.Name) or child.func.id not in FUNCTIONS or child.keywords:
+                raise ValueError(f"Unsupported call in derived series {expression!r}")
+        elif isinstance(child, ast.Name):
+            if child.id not in FUNCTIONS:
+                names.add(child.id)
+        elif isinstance(child, ast.BinOp):
+            if type(child.op) not in OPERATORS:
+                raise ValueError(f"Unsupported operator in derived series {expression!r}")
+        elif isinstance(child, ast.Constant):
+            if not isinstance(child.value, (int, float)):
+                raise ValueError(f"Unsupported constant in derived series {expression!r}")
+        elif not isinstance(child, (ast.Expression, ast.UnaryOp, ast.USub, ast.Load) + tuple(OPERATORS)):
+            raise ValueError(f"Unsupported syntax in derived series {expression!r}")
+    return names
+
+
+class DerivedSeries:
+    """Lazily evaluated, memoised derived series over ``base``."""
+
+    def __init__(self, definitions: dict[str, str] | None, base: dict[str, pd.Series | None]):
+        self.base = base
+        self.trees = {name: ast.parse(str(expression), mode="eval") for name, expression in (definitions or {}).items()}
+        self.depends = {name: _names(tree, str(definitions[name])) for name, tree in self.trees.items()}
+        self._values: dict[str, pd.Series] = {}
+        self._by_tree = {ast.dump(tree): name for name, tree in self.trees.items()}
+        self._lock = threading.RLock()
+        for name, names in self.depends.items():
+            unknown = names - set(self.trees) - set(base)
+            if unknown:
+                raise ValueError(f"Derived series {name!r} uses unknown series: {', '.join(sorted(unknown))}")
+        self.order()
+
+    def order(self) -> list[str]:
+        """Derived names in dependency order; raises on a cycle."""
+
+        ordered: list[str] = []
+        state: dict[str, int] = {}
+
+        def visit(name: str, path: tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Derived series cycle: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dependency in sorted(self.depends[name] & set(self.trees)):
+                visit(dependency, path + (name,))
+            state[name] = 2
+            ordered.append(name)
+
+        for name in self.trees:
+            visit(name, ())
+        return ordered
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.trees
+
+    def __iter__(self):
+        return iter(self.trees)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        with self._lock:
+            if name not in self._values:
+                if name not in self.trees:
+                    raise KeyError(name)
+                self._values[name] = to_series(self._eval(self.trees[name].body)).rename(name)
+            return self._values[name]
+
+    def expression(self, text: str) -> pd.Series:
+        """Evaluate an ad-hoc expression, sharing the memo with the declared series."""
+
+        tree = ast.parse(text, mode="eval")
+        key = ast.dump(tree)
+        if key in self._by_tree:
+            return self[self._by_tree[key]]
+        unknown = _names(tree, text) - set(self.trees) - set(self.base)
+        if unknown:
+            raise ValueError(f"Expression {text!r} uses unknown series: {', '.join(sorted(unknown))}")
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = to_series(self._eval(tree.body))
+            return self._values[key]
+
+    def _series(self, name: str) -> pd.Series:
+        if name in self.trees:
+            return self[name]
+        series = self.base.get(name)
+        return to_series(series)
+
+    def _eval(self, node: ast.AST):
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return self._series(node.id)
+        if isinstance(node, ast.UnaryOp):
+            return -self._eval(node.operand)
+        if isinstance(node, ast.Call):
+            return FUNCTIONS[node.func.id](*(self._eval(arg) for arg in node.args))
+        left, right = _align(self._eval(node.left), self._eval(node.right))
+        return OPERATORS[type(node.op)](left, right)
+
+    def evaluate(self, names=None) -> dict[str, pd.Series]:
+        return {name: self[name] for name in (names if names is not None else self.order())}
@@ -0,0 +1,94 @@
+"""As-of lookups ("last observation at or before t") over a series.
+
+:class:`AsOfIndex` keeps the dates and values of a series' non-NaN
+observations as sorted numpy arrays, so each lookup is a ``searchsorted``
+with no filtered copy of the series. :meth:`AsOfIndex.lookup` takes any
+number of timestamps at once, so a daily series is read at month ends without
+resampling it first.
+
+:func:`asof_index` memoises the index per series object, so repeated lookups
+cost a dictionary hit and a binary search. The memo is dropped with the
+series and rebuilt if its index is replaced, but checking the values would
+cost a pass over them on every lookup, so series must not be edited in place
+once they have been looked up (loaders and transforms always return new ones).
+"""
+
+from __future__ import annotations
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+_CACHE: dict[int, tuple[weakref.ref, int, "AsOfIndex"]] = {}
+
+
+def _datetime64(values) -> np.ndarray:
+    index = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(values)))
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.values.astype("datetime64[ns]")
+
+
+def _stamp(timestamp) -> np.datetime64:
+    stamp = pd.Timestamp(timestamp)
+    if stamp.tz is not None:
+        stamp = stamp.tz_convert(None)
+    return stamp.to_datetime64()
+
+
+class AsOfIndex:
+    def __init__(self, series: pd.Series | None):
+        if series is None or series.empty:
+            self.dates = np.array([], dtype="datetime64[ns]")
+            self.values = np.array([], dtype=float)
+            return
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        dates = _datetime64(series.index)
+        if not np.all(dates[1:] >= dates[:-1]):
+            order = np.argsort(dates, kind="stable")
+            dates, values = dates[order], values[order]
+        mask = ~np.isnan(values)
+        self.dates, self.values = dates[mask], values[mask]
+
+    def __len__(self) -> int:
+        return self.values.size
+
+    def positions(self, timestamps) -> np.ndarray:
+        """Position of the last observation at or before each timestamp (-1 if none)."""
+
+        return np.searchsorted(self.dates, _datetime64(timestamps), side="right") - 1
+
+    def _take(self, positions: np.ndarray) -> np.ndarray:
+        out = np.full(positions.shape, np.nan)
+        valid = positions >= 0
+        out[valid] = self.values[positions[valid]]
+        return out
+
+    def lookup(self, timestamps) -> list[float | None]:
+        """Value as of each timestamp, ``None`` where the series had not started."""
+
+        return [None if np.isnan(value) else float(value) for value in self._take(self.positions(timestamps))]
+
+    def last(self, timestamp: pd.Timestamp) -> float | None:
+        position = int(np.searchsorted(self.dates, _stamp(timestamp), side="right")) - 1
+        return float(self.values[position]) if position >= 0 else None
+
+    def previous(self, timestamp: pd.Timestamp) -> float | None:
+        position = int(np.searchsorted(self.dates, _stamp(timestamp), side="right")) - 2
+        return float(self.values[position]) if position >= 0 else None
+
+
+def asof_index(series: pd.Series | None) -> AsOfIndex:
+    """Memoised :class:`AsOfIndex` for ``series`` (dropped with the series)."""
+
+    if series is None:
+        return AsOfIndex(None)
+    key = id(series)
+    hit = _CACHE.get(key)
+    # Indexes are immutable, so reassigning ``series.index`` means a new object.
+    if hit is not None and hit[0]() is series and hit[1] == id(series.index):
+        return hit[2]
+    index = AsOfIndex(series)
+    _CACHE[key] = (weakref.ref(series, lambda _, key=key: _CACHE.pop(key, None)), id(series.index), index)
+    return index
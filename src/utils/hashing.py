@@ -0,0 +1,49 @@
+"""Content hashes of report files, reused while size and mtime are unchanged."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_hash(path: Path, rel: str, previous: dict) -> dict:
+    """Hash ``path``, reusing the previous digest when size and mtime match."""
+
+    stat = path.stat()
+    cached = previous.get(rel)
+    if cached and cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+        return cached
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256_file(path)}
+
+
+def tree_hashes(directory: Path, previous: dict) -> dict[str, dict]:
+    """``file_hash`` of every file under ``directory``, keyed by relative POSIX path."""
+
+    files = {}
+    for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+        rel = path.relative_to(directory).as_posix()
+        files[rel] = file_hash(path, rel, previous)
+    return files
+
+
+def unchanged(directory: Path, previous: dict) -> bool:
+    """Whether ``directory`` holds exactly the files in ``previous`` with the same size and mtime."""
+
+    seen = 0
+    for path in directory.rglob("*"):
+        if not path.is_file():
+            continue
+        cached = previous.get(path.relative_to(directory).as_posix())
+        stat = path.stat()
+        if not cached or cached.get("size") != stat.st_size or cached.get("mtime_ns") != stat.st_mtime_ns:
+            return False
+        seen += 1
+    return seen == len(previous)
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
+from .asof import asof_index
 
 ROOT = Path(__file__).resolve().parents[2]
 CACHE_DIR = ROOT / "data" / "cache"
@@ -24,17 +29,35 @@ def cache_series(series: pd.Series, name: str) -> None:
     csv_path = CACHE_DIR / f"{name}.csv"
     json_path = CACHE_DIR / f"{name}.json"
     try:
-        series.to_csv(csv_path, header=True)
+        # Loader threads may be abandoned mid-write at exit; never leave a truncated cache.
+        write_atomic(csv_path, series.to_csv(header=True))
         meta = {
             "name": name,
             "rows": int(series.dropna().shape[0]),
             "cached_at": datetime.utcnow().isoformat() + "Z",
         }
-        json_path.write_text(json.dumps(meta, indent=2))
+        write_atomic(json_path, json.dumps(meta, indent=2))
     except Exception as exc:
         logging.getLogger(__name__).warning("Failed to cache %s: %s", name, exc)
 
 
+def read_cached_series(name: str) -> tuple[pd.Series | None, str | None]:
+    """Return a series written by ``cache_series`` and its ``cached_at`` stamp."""
+
+    csv_path = CACHE_DIR / f"{name}.csv"
+    json_path = CACHE_DIR / f"{name}.json"
+    if not csv_path.exists():
+        return None, None
+    try:
+        frame = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        series = frame.iloc[:, 0].rename(frame.columns[0])
+        cached_at = json.loads(json_path.read_text()).get("cached_at") if json_path.exists() else None
+        return series, cached_at
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Failed to read cached %s: %s", name, exc)
+        return None, None
+
+
 def cache_frame(frame: pd.DataFrame, name: str) -> None:
     ensure_directory(CACHE_DIR)
     csv_path = CACHE_DIR / f"{name}.csv"
@@ -51,16 +74,31 @@ def cache_frame(frame: pd.DataFrame, name: str) -> None:
         logging.getLogger(__name__).warning("Failed to cache frame %s: %s", name, exc)
 
 
+def _json_value(value, single: bool = False) -> float | None:
+    if pd.isna(value):
+        return None
+    # The shortest float32 repr keeps single-precision data from gaining spurious
+    # digits when widened to a Python float.
+    return float(str(np.float32(value))) if single else float(value)
+
+
 def write_snapshot(series: pd.Series, path: Path) -> None:
+    """Write ``[{"date": ..., "value": ...}, ...]`` one record at a time."""
+
     ensure_directory(path.parent)
-    data = [
-        {
-            "date": (idx.isoformat() if isinstance(idx, pd.Timestamp) else str(idx)),
-            "value": (None if pd.isna(val) else float(val)),
-        }
-        for idx, val in series.items()
-    ]
-    path.write_text(json.dumps(data, indent=2))
+    with path.open("w") as fh:
+        if series.empty:
+            fh.write("[]")
+            return
+        single = series.dtype == np.float32
+        fh.write("[")
+        for position, (idx, val) in enumerate(series.items()):
+            record = {
+                "date": (idx.isoformat() if isinstance(idx, pd.Timestamp) else str(idx)),
+                "value": _json_value(val, single),
+            }
+            fh.write(("," if position else "") + "\n  " + json.dumps(record, indent=2).replace("\n", "\n  "))
+        fh.write("\n]")
 
 
 def write_text(path: Path, text: str) -> None:
@@ -68,7 +106,47 @@ def write_text(path: Path, text: str) -> None:
     path.write_text(text)
 
 
-def write_excel(path: Path, sheets: dict[str, pd.DataFrame], commentary: str) -> None:
+def write_atomic(path: Path, text: str) -> None:
+    """Replace ``path`` with ``text`` through a temporary file no other writer shares."""
+
+    ensure_directory(path.parent)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as fh:
+        fh.write(text)
+    try:
+        os.replace(fh.name, path)
+    except BaseException:
+        os.unlink(fh.name)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on ``<path>.lock``, held across processes for a read-modify-write of ``path``."""
+
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - not POSIX; fall back to last writer wins
+        yield
+        return
+    ensure_directory(path.parent)
+    with open(path.with_name(path.name + ".lock"), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def write_json(path: Path, payload: dict) -> None:
+    ensure_directory(path.parent)
+    path.write_text(json.dumps(payload, indent=2))
+
+
+def write_excel(path: Path, sheets: dict[str, pd.DataFrame], commentary: str, streaming: bool = False) -> None:
+    if streaming:
+        _write_excel_streaming(path, sheets, commentary)
+        return
+
     def safe_df(df):
         # Replace NaNs with 'n/a', keep number formatting for numeric columns
         return df.copy().where(df.notna(), other="n/a")
@@ -82,6 +160,26 @@ def write_excel(path: Path, sheets: dict[str, pd.DataFrame], commentary: str) ->
         comment_df.to_excel(writer, sheet_name="Commentary", index=False)
 
 
+def _write_excel_streaming(path: Path, sheets: dict[str, pd.DataFrame], commentary: str) -> None:
+    """Row-by-row write-only workbook; avoids an object-dtype copy of each sheet."""
+
+    from openpyxl import Workbook
+
+    ensure_directory(path.parent)
+    workbook = Workbook(write_only=True)
+    for sheet, df in sheets.items():
+        ws = workbook.create_sheet(sheet)
+        ws.append([df.index.name or ""] + [str(col) for col in df.columns])
+        single = [dtype == np.float32 for dtype in df.dtypes]
+        for row in df.itertuples(name=None):
+            ws.append([row[0]] + ["n/a" if pd.isna(v) else _json_value(v, s) for v, s in zip(row[1:], single)])
+    ws = workbook.create_sheet("Commentary")
+    ws.append(["Commentary"])
+    for line in commentary.splitlines():
+        ws.append([line])
+    workbook.save(path)
+
+
 def load_yaml(path: Path) -> dict:
     import yaml
 
@@ -108,23 +206,13 @@ def direction_from_change(change: float | None) -> str:
 def safe_last(series: pd.Series, upto: pd.Timestamp) -> float | None:
     if series is None:
         return None
-    trimmed = series.dropna()
-    trimmed = trimmed.loc[:upto]
-    if trimmed.empty:
-        return None
-    return float(trimmed.iloc[-1])
+    return asof_index(series).last(upto)
 
 
 def safe_previous(series: pd.Series, upto: pd.Timestamp) -> float | None:
     if series is None:
         return None
-    trimmed = series.dropna()
-    trimmed = trimmed.loc[:upto]
-    if trimmed.empty:
-        return None
-    if trimmed.size == 1:
-        return None
-    return float(trimmed.iloc[-2])
+    return asof_index(series).previous(upto)
 
 
 def percent_change(new: float | None, old: float | None) -> float | None:
@@ -0,0 +1,70 @@
+"""Process memory readings for run metrics."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_STATM = Path("/proc/self/statm")
+_MEMINFO = Path("/proc/meminfo")
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far."""
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb() -> float | None:
+    """Current resident set size (Linux only)."""
+
+    try:
+        pages = int(_STATM.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024) if resource else None
+
+
+def start_stage_memory(result) -> None:
+    """``Pipeline.before_stage`` hook noting the readings :func:`record_stage_memory` compares against."""
+
+    result.extra["_memory_start"] = (rss_mb(), peak_rss_mb())
+
+
+def record_stage_memory(result) -> None:
+    """``Pipeline.after_stage`` hook adding a stage's memory growth to its metrics.
+
+    ``rss_delta_mb`` is the change in resident memory over the stage and
+    ``peak_rise_mb`` how far it raised the process high-water mark. Stages run
+    concurrently, so both include whatever overlapping stages allocated.
+    """
+
+    start_rss, start_peak = result.extra.pop("_memory_start", (None, None))
+    current, peak = rss_mb(), peak_rss_mb()
+    if current is not None:
+        result.extra["rss_mb"] = round(current, 1)
+        if start_rss is not None:
+            result.extra["rss_delta_mb"] = round(current - start_rss, 1)
+    if peak is not None and start_peak is not None:
+        result.extra["peak_rise_mb"] = round(peak - start_peak, 1)
+
+
+def available_mb() -> float | None:
+    """Memory the kernel can hand out without swapping (Linux only)."""
+
+    try:
+        for line in _MEMINFO.read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) / 1024
+    except (OSError, IndexError, ValueError):
+        return None
+    return None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from .asof import asof_index
+
 
 def to_series(series: pd.Series | None) -> pd.Series:
     if series is None:
@@ -21,10 +24,15 @@ def monthly_last(series: pd.Series | None) -> pd.Series:
     return s.resample("M").last()
 
 
+def compact(series: pd.Series | None) -> pd.Series | None:
+    """Month-end float32 copy of ``series``, so the daily data can be released."""
+
+    if series is None:
+        return None
+    return monthly_last(series).astype(np.float32)
+
+
 def last_value(series: pd.Series, timestamp: pd.Timestamp) -> float | None:
     if series is None or series.empty:
         return None
-    filtered = series.loc[:timestamp].dropna()
-    if filtered.empty:
-        return None
-    return float(filtered.iloc[-1])
+    return asof_index(series).last(timestamp)